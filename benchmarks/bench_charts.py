@@ -0,0 +1,87 @@
+"""
+Chart rendering benchmark.
+
+Compares the old pyplot pipeline with the object-oriented Figure/Agg
+renderer in counter.services.charts, one chart at a time and under
+concurrency. Run with:  python -m benchmarks.bench_charts
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import matplotlib
+
+matplotlib.use("Agg")  # Forces matplotlib to use no GUI or Tkinter.
+import matplotlib.pyplot as plt
+
+from counter.services.charts import render_frequency_chart
+
+FREQ = [(f"word{i}", 40 - i * 3) for i in range(10)]
+
+
+def render_with_pyplot(freq) -> bytes:
+    """The previous exporters pipeline, through pyplot's global state."""
+
+    plt.figure(figsize=(8, 4))
+    plt.bar([w for w, _ in freq], [c for _, c in freq], color="#2D2D35FF")
+    plt.title("Top 10 Most Common Words")
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    buffer = BytesIO()
+    plt.savefig(buffer, format="png")
+    plt.close()
+    return buffer.getvalue()
+
+
+def time_sequential(render, repeat: int) -> list[float]:
+    """Per-chart latency in milliseconds."""
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(FREQ)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def time_concurrent(render, repeat: int, threads: int):
+    """Charts per second with a thread pool, and whether every chart matched."""
+
+    expected = render(FREQ)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(render, [FREQ] * repeat))
+    elapsed = time.perf_counter() - start
+    return repeat / elapsed, all(r == expected for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    # Warm up font caches so the first chart does not skew the numbers.
+    render_with_pyplot(FREQ)
+    render_frequency_chart(FREQ)
+
+    for name, render in [("pyplot", render_with_pyplot), ("figure", render_frequency_chart)]:
+        timings = sorted(time_sequential(render, args.repeat))
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(
+            f"{name:>7}: p50 {statistics.median(timings):7.1f} ms"
+            f"  p95 {p95:7.1f} ms"
+        )
+
+    # pyplot is not thread-safe, so only the Figure renderer is run concurrently.
+    rate, consistent = time_concurrent(render_frequency_chart, args.repeat, args.threads)
+    print(
+        f" figure: {rate:7.1f} charts/s with {args.threads} threads,"
+        f" identical output: {consistent}"
+    )
+
+
+if __name__ == "__main__":
+    main()
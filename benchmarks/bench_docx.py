@@ -0,0 +1,78 @@
+"""
+DOCX extraction benchmark.
+
+Builds a synthetic Word document and compares the streaming XML extractor
+with the python-docx Document path, for time and peak Python memory.
+Run with:  python -m benchmarks.bench_docx --paragraphs 20000
+"""
+import argparse
+import os
+import time
+import tracemalloc
+from io import BytesIO
+
+import django
+from docx import Document
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "wordcounterapp.settings")
+django.setup()
+
+from counter.services.text_extractors import (
+    extract_text_from_docx,
+    extract_text_from_docx_document,
+)
+
+SENTENCE = "The quarterly filing was reviewed by the audit committee and approved. "
+
+
+def build_docx(paragraphs: int, tables: int) -> bytes:
+    """A document with many paragraphs and a few small tables."""
+
+    document = Document()
+    for i in range(paragraphs):
+        document.add_paragraph(SENTENCE * 3)
+        if tables and i % max(1, paragraphs // tables) == 0:
+            table = document.add_table(rows=3, cols=3)
+            for cell in table._cells:
+                cell.text = "Cell value"
+    buffer = BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def measure(extract, data: bytes, repeat: int):
+    """Best wall time in seconds and peak traced memory in MB."""
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extract(BytesIO(data))
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    text = extract(BytesIO(data))
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return best, peak, len(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=5000)
+    parser.add_argument("--tables", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    data = build_docx(args.paragraphs, args.tables)
+    print(f"document: {len(data) / 1024:.0f} KB, {args.paragraphs} paragraphs")
+
+    for name, extract in [
+        ("python-docx", extract_text_from_docx_document),
+        ("streaming", extract_text_from_docx),
+    ]:
+        seconds, peak, chars = measure(extract, data, args.repeat)
+        print(f"{name:>11}: {seconds * 1000:8.1f} ms  peak {peak:7.1f} MB  {chars} chars")
+
+
+if __name__ == "__main__":
+    main()
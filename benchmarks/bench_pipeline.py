@@ -0,0 +1,242 @@
+"""
+Analysis and export pipeline benchmark.
+
+Runs every stage (metrics, quality, summary, vault lookups, the full and
+streaming analyses, PDF/DOCX exports) over synthetic corpora from 1 KB to
+50 MB and reports p50/p95/p99 latency, throughput and peak Python memory.
+Results can be saved as a baseline and later runs compared against it:
+
+    python -m benchmarks.bench_pipeline --save benchmarks/baselines/pipeline.json
+    python -m benchmarks.bench_pipeline --compare benchmarks/baselines/pipeline.json
+
+A comparison exits with status 1 if any stage got slower (p50) or hungrier
+(peak memory) than the baseline by more than --threshold.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import UTC, datetime
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "wordcounterapp.settings")
+django.setup()
+
+from counter.services import exporters
+from counter.services.analysis_cache import analyze_text
+from counter.services.origins import get_value_matches
+from counter.services.quality_insights import (
+    analyze_quality,
+    get_basic_metrics,
+)
+from counter.services.streaming_analysis import analyze_chunks
+from counter.services.summarizer import generate_summary
+from counter.services.text_profile import TextProfile
+
+SIZES = {
+    "1KB": 1024,
+    "10KB": 10 * 1024,
+    "100KB": 100 * 1024,
+    "1MB": 1024 * 1024,
+    "10MB": 10 * 1024 * 1024,
+    "50MB": 50 * 1024 * 1024,
+}
+DEFAULT_SIZES = "1KB,10KB,100KB,1MB,10MB,50MB"
+
+# A mix of origin words, stop words and plain vocabulary, so every stage has work.
+VOCABULARY = [
+    "algebra", "alcohol", "coffee", "tea", "ketchup", "robot", "safari", "tsunami", "yoga", "zero",
+    "the", "a", "of", "and", "to", "in", "is", "was", "were", "be", "by", "with", "for", "on",
+    "that", "this", "report", "analysis", "budget", "quarterly", "review", "committee", "market",
+    "customer", "growth", "revenue", "strategy", "product", "delivery", "team", "project",
+    "schedule", "risk",
+]
+PASSIVE = ["was reviewed", "were approved", "is managed", "was written"]
+
+
+def build_corpus(size: int, seed: int = 42) -> str:
+    """Deterministic English-like text of about `size` characters."""
+
+    rng = random.Random(seed)
+    paragraphs, length = [], 0
+    while length < size:
+        sentences = []
+        for _ in range(rng.randint(3, 7)):
+            words = rng.choices(VOCABULARY, k=rng.randint(6, 22))
+            if rng.random() < 0.2:
+                words.insert(rng.randint(1, len(words)), rng.choice(PASSIVE))
+            sentences.append(" ".join(words).capitalize() + rng.choice(".!?"))
+        paragraph = " ".join(sentences)
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 1
+    return "\n".join(paragraphs)[:size]
+
+
+def _chunks(text: str, chunk_size: int = 1024 * 1024):
+    for start in range(0, len(text), chunk_size):
+        yield text[start : start + chunk_size]
+
+
+def _export_context(text: str) -> dict:
+    results = analyze_text(text)
+    return {**results, "text": text}
+
+
+# name -> (setup(text) -> argument, run(argument), largest size it runs on by default)
+STAGES = {
+    "basic_metrics": (lambda text: text, lambda text: get_basic_metrics(TextProfile(text)), None),
+    "quality": (lambda text: text, lambda text: analyze_quality(TextProfile(text)), None),
+    "summary": (lambda text: text, lambda text: generate_summary(TextProfile(text)), None),
+    "vault_matches": (
+        lambda text: list(TextProfile(text).unique_words),
+        get_value_matches,
+        None,
+    ),
+    "analyze_text": (lambda text: text, analyze_text, None),
+    "streaming": (lambda text: text, lambda text: analyze_chunks(_chunks(text)), None),
+    "export_docx": (_export_context, exporters.generate_docx_report, SIZES["1MB"]),
+    "export_pdf": (
+        lambda text: {**_export_context(text), "logo_url": ""},
+        exporters.generate_pdf_report,
+        SIZES["1MB"],
+    ),
+}
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def runs_for(size: int, repeat: int) -> int:
+    """Fewer runs on big corpora, so the full suite stays within minutes."""
+
+    if size >= SIZES["10MB"]:
+        return min(repeat, 3)
+    if size >= SIZES["1MB"]:
+        return min(repeat, 10)
+    return repeat
+
+
+def bench_stage(run, argument, size: int, runs: int) -> dict:
+    """Latency percentiles over `runs` calls, then one traced call for memory."""
+
+    run(argument)  # Warm up caches, imports and compiled regexes.
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run(argument)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    run(argument)
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+
+    p50 = percentile(latencies, 50)
+    return {
+        "runs": runs,
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mb_per_s": round(size / 1024 / 1024 / (p50 / 1000), 3) if p50 else None,
+        "peak_mb": round(peak, 3),
+    }
+
+
+def run_suite(sizes: list[str], stages: list[str], repeat: int, export_all: bool) -> dict:
+    results = {}
+    for size_name in sizes:
+        size = SIZES[size_name]
+        text = build_corpus(size)
+        for stage in stages:
+            setup, run, max_size = STAGES[stage]
+            if max_size and size > max_size and not export_all:
+                continue
+            key = f"{stage}@{size_name}"
+            results[key] = bench_stage(run, setup(text), size, runs_for(size, repeat))
+            row = results[key]
+            print(
+                f"{key:>22}: p50 {row['p50_ms']:10.2f} ms  p95 {row['p95_ms']:10.2f} ms  "
+                f"p99 {row['p99_ms']:10.2f} ms  {row['mb_per_s'] or 0:8.2f} MB/s  "
+                f"peak {row['peak_mb']:8.2f} MB",
+                flush=True,
+            )
+    return {
+        "meta": {
+            "created": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Descriptions of every stage that regressed past the threshold."""
+
+    regressions = []
+    for key, row in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        for metric in ("p50_ms", "peak_mb"):
+            # Ignore noise on measurements too small to mean anything.
+            floor = 1.0 if metric == "p50_ms" else 0.5
+            if row[metric] > max(base[metric], floor) * (1 + threshold):
+                change = (row[metric] / base[metric] - 1) * 100 if base[metric] else math.inf
+                regressions.append(
+                    f"{key} {metric}: {base[metric]} -> {row[metric]} (+{change:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Comma separated, from {', '.join(SIZES)}.")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma separated stage names.")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per stage on small corpora.")
+    parser.add_argument("--export-all-sizes", action="store_true", help="Also export corpora over 1 MB.")
+    parser.add_argument("--save", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="Compare against a baseline JSON file.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown, 0.2 = 20%%.")
+    args = parser.parse_args()
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES] + [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"unknown sizes/stages: {', '.join(unknown)}")
+
+    report = run_suite(sizes, stages, args.repeat, args.export_all_sizes)
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+        with open(args.save, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nno regressions over {args.threshold:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
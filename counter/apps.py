@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CounterConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "counter"
+
+    def ready(self):
+        """Connect the AnalysisRecord signal handlers."""
+
+        from . import signals  # noqa: F401
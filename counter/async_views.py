@@ -0,0 +1,159 @@
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import render
+from django.templatetags.static import static
+from django.utils.http import content_disposition_header
+from django.views.decorators.http import condition
+
+from . import views
+from .services import (
+    analysis_jobs,
+    chart_cache,
+    charts,
+    export_jobs,
+    exporters,
+    report_cache,
+    timing,
+    word_selectors,
+)
+from .services.analysis_cache import get_top_words
+from .services.executors import run_cpu
+
+# Async versions of the heavy views, used instead of views.py when
+# USE_ASYNC_VIEWS is set and the site runs under ASGI. Extraction, analysis,
+# rendering and anything that writes the vault run on the CPU executor;
+# lookups go through the async ORM, so the event loop is never blocked.
+
+_render = timing.stage("render")(render)
+
+
+@login_required
+async def counter(request):
+    """Main view."""
+
+    if request.method == "POST":
+        # Reading the upload, the analysis and the save (whose signals index
+        # and hash the text) are all CPU work.
+        return await run_cpu(views._counter_post, request)
+
+    user = await request.auser()
+    record = await word_selectors.aget_session_record(user, request.session)
+    digest = await request.session.aget("analysis_digest")
+    context = await run_cpu(views._counter_context, record, digest)
+    return await run_cpu(_render, request, "counter/counter.html", context)
+
+
+@login_required
+async def bulk_upload_view(request):
+    """Bulk uploads are CPU work from unzipping to the batched inserts."""
+
+    return await run_cpu(views.bulk_upload_view, request)
+
+
+async def export_docx(request, pk=None):
+    """Export the WORD document for the user."""
+
+    record = await _export_record(request, pk)
+    if record is None:
+        # Nothing analyzed yet: the sync view builds the empty report.
+        return await run_cpu(views.export_docx, request, pk)
+
+    return await _report_response(
+        record,
+        "docx",
+        lambda: exporters.generate_docx_report(exporters.get_record_export_data(record)),
+    )
+
+
+async def export_pdf(request, pk=None):
+    """Export the PDF document for the user."""
+
+    record = await _export_record(request, pk)
+    if record is None:
+        return await run_cpu(views.export_pdf, request, pk)
+
+    logo_url = request.build_absolute_uri(static("counter/img/python_developer.png"))
+    return await _report_response(
+        record,
+        "pdf",
+        lambda: exporters.generate_pdf_report(
+            {**exporters.get_record_export_data(record), "logo_url": logo_url}
+        ),
+    )
+
+
+async def _export_record(request, pk=None):
+    """The vault record to export: the one asked for, else the current analysis."""
+
+    user = await request.auser()
+    if pk:
+        return await word_selectors.aget_record_for_user(user, pk)
+    return await word_selectors.aget_session_record(user, request.session)
+
+
+def _read_report(record, export_format, render) -> bytes:
+    with report_cache.open_report(record, export_format, render) as report:
+        return report.read()
+
+
+async def _report_response(record, export_format, render):
+    """
+    Serve a record's report from the cache (render() on a miss) as a download.
+    The file is read on the executor: FileResponse would iterate it on
+    Django's sync thread.
+    """
+
+    _, content_type, filename = export_jobs.EXPORT_FORMATS[export_format]
+    content = await run_cpu(_read_report, record, export_format, render)
+    response = HttpResponse(content, content_type=content_type)
+    response["Content-Disposition"] = content_disposition_header(True, filename)
+    return response
+
+
+@login_required
+async def export_job_status(request, job_id):
+    """
+    Report an export job's status. Pass ?wait=<seconds> (max 30)
+    to wait until the job finishes; waiting holds no thread.
+    """
+
+    try:
+        wait = min(float(request.GET.get("wait", 0)), 30)
+    except ValueError:
+        wait = 0
+
+    job = await export_jobs.await_job(job_id, await request.auser(), timeout=wait)
+    if job is None:
+        raise Http404("Unknown export job")
+    return JsonResponse(views._job_payload(job))
+
+
+@login_required
+async def analysis_job_events(request, job_id):
+    """Stream an analysis job's progress; waiting between polls holds no thread."""
+
+    user = await request.auser()
+    return views._event_stream(analysis_jobs.aiter_events(job_id, user))
+
+
+@login_required
+async def word_frequency_chart(request, digest):
+    """Charts in the cache are served straight from the event loop."""
+
+    if not await word_selectors.auser_has_analysis(await request.auser(), digest):
+        return HttpResponse("Unknown analysis", status=404)
+    return await _owned_chart(request, digest)
+
+
+@condition(etag_func=lambda request, digest: chart_cache.chart_etag(digest))
+async def _owned_chart(request, digest):
+    chart_bytes = chart_cache.get_chart(digest)
+    if chart_bytes is None:
+        top_words = await run_cpu(get_top_words, digest, await request.auser())
+        if top_words is None:
+            return HttpResponse("Unknown analysis", status=404)
+
+        chart_bytes = await run_cpu(charts.render_frequency_chart, top_words)
+        chart_cache.store_chart(digest, chart_bytes)
+
+    return views._chart_response(chart_bytes)
@@ -0,0 +1,57 @@
+import zlib
+
+from django.db import models
+
+# The first byte of a stored value says how the rest is encoded,
+# so other codecs can be added later without rewriting old rows.
+CODEC_RAW = b"\x00"
+CODEC_ZLIB = b"\x01"
+
+# Below this size compression rarely pays for its header.
+MIN_COMPRESS_BYTES = 64
+
+
+def compress_text(text: str) -> bytes:
+    """Encode text for storage, zlib-compressed when that makes it smaller."""
+
+    raw = text.encode("utf-8")
+    if len(raw) >= MIN_COMPRESS_BYTES:
+        packed = zlib.compress(raw, 6)
+        if len(packed) < len(raw):
+            return CODEC_ZLIB + packed
+    return CODEC_RAW + raw
+
+
+def decompress_text(data) -> str:
+    """Decode a value written by compress_text."""
+
+    data = bytes(data)
+    codec, payload = data[:1], data[1:]
+    if codec == CODEC_ZLIB:
+        payload = zlib.decompress(payload)
+    elif codec != CODEC_RAW:
+        raise ValueError(f"Unknown text codec {codec!r}")
+    return payload.decode("utf-8")
+
+
+class CompressedTextField(models.TextField):
+    """
+    A TextField stored as a compressed binary column.
+    Python code sees plain strings; only the database sees the blob.
+    Database text lookups (icontains, ...) do not work on it.
+    """
+
+    def get_internal_type(self):
+        # Gives the column the binary type of the current database.
+        return "BinaryField"
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = super().get_db_prep_value(value, connection, prepared)
+        if value is None:
+            return None
+        return connection.Database.Binary(compress_text(value))
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return decompress_text(value)
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from counter.services import corpus_analytics
+
+
+class Command(BaseCommand):
+    help = (
+        "Incrementally mirror AnalysisRecord metrics and word frequencies "
+        "into the DuckDB analytics file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500,
+            help="Records read from the database per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        result = corpus_analytics.sync_corpus(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Synced {corpus_analytics.get_corpus_db_path()}: "
+            f"{result['added']} records added, {result['deleted']} removed "
+            f"in {time.perf_counter() - start:.2f}s."
+        ))
@@ -0,0 +1,167 @@
+import cProfile
+import json
+import logging
+import random
+import re
+import time
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.exceptions import MiddlewareNotUsed
+
+from .services import timing
+
+logger = logging.getLogger("counter.timing")
+
+
+class ServerTimingMiddleware:
+    """
+    Collects the stage timings of each request (see services.timing) and
+    reports them in a Server-Timing header and one JSON log line.
+    Keep it first in MIDDLEWARE so every other stage runs inside it.
+
+    It runs natively in both modes, so under ASGI it doesn't push async
+    views onto Django's sync thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = timing.start_request()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            stages = timing.end_request(token)
+        return self._report(request, response, stages, start)
+
+    async def __acall__(self, request):
+        token = timing.start_request()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stages = timing.end_request(token)
+        return self._report(request, response, stages, start)
+
+    def _report(self, request, response, stages, start):
+        total = (time.perf_counter() - start) * 1000
+
+        if getattr(settings, "SERVER_TIMING_HEADER", True):
+            metrics = [f"{name};dur={ms:.1f}" for name, (ms, _) in stages.items()]
+            metrics.append(f"total;dur={total:.1f}")
+            response["Server-Timing"] = ", ".join(metrics)
+
+        logger.info(
+            json.dumps(
+                {
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "total_ms": round(total, 2),
+                    "stages": {
+                        name: {"ms": round(ms, 2), "calls": calls}
+                        for name, (ms, calls) in stages.items()
+                    },
+                }
+            )
+        )
+        return response
+
+
+class TimedSessionMiddleware(SessionMiddleware):
+    """SessionMiddleware, with the session save timed as the "session" stage."""
+
+    def process_response(self, request, response):
+        with timing.stage("session"):
+            return super().process_response(request, response)
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in sampling profiler. With PROFILING_ENABLED, a PROFILING_SAMPLE_RATE
+    share of requests run under cProfile, and those slower than
+    PROFILING_THRESHOLD_MS are dumped to PROFILING_DIR as .prof files
+    (open them with `python -m pstats` or snakeviz).
+
+    Like ServerTimingMiddleware it runs natively in both modes. Under ASGI
+    cProfile follows the event loop thread: a profile covers whatever else
+    ran on the loop meanwhile, and not the work sent to executor threads.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING_ENABLED", False):
+            # Django leaves disabled middleware out of the chain entirely.
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0.1)
+        self.threshold_ms = getattr(settings, "PROFILING_THRESHOLD_MS", 500)
+        self.profile_dir = Path(settings.PROFILING_DIR)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        profiler = self._start_profiler()
+        if profiler is None:
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        self._dump_if_slow(request, profiler, start)
+        return response
+
+    async def __acall__(self, request):
+        profiler = self._start_profiler()
+        if profiler is None:
+            return await self.get_response(request)
+
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiler.disable()
+        self._dump_if_slow(request, profiler, start)
+        return response
+
+    def _start_profiler(self):
+        """A running profiler if this request is sampled, else None."""
+
+        if random.random() >= self.sample_rate:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another request on this process is already being profiled.
+            return None
+        return profiler
+
+    def _dump_if_slow(self, request, profiler, start):
+        elapsed = (time.perf_counter() - start) * 1000
+        if elapsed < self.threshold_ms:
+            return
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", request.path).strip("_") or "root"
+        path = self.profile_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{elapsed:.0f}ms.prof"
+        profiler.dump_stats(path)
+        logger.info(json.dumps({"profile": str(path), "path": request.path, "total_ms": round(elapsed, 2)}))
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.10 on 2026-10-18 09:12
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def fill_content_hashes(apps, schema_editor):
+    """Hash the text of every record saved before the column existed."""
+
+    AnalysisRecord = apps.get_model("counter", "AnalysisRecord")
+    batch = []
+    for record in AnalysisRecord.objects.only("id", "original_text").iterator():
+        record.content_hash = hashlib.sha256(
+            record.original_text.encode("utf-8", errors="ignore")
+        ).hexdigest()
+        batch.append(record)
+        if len(batch) >= 500:
+            AnalysisRecord.objects.bulk_update(batch, ["content_hash"])
+            batch = []
+    AnalysisRecord.objects.bulk_update(batch, ["content_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [ # noqa: RUF012
+        ("counter", "0002_analysisrecord_bullets_and_more"),
+    ]
+
+    operations = [ # noqa: RUF012
+        migrations.AddField(
+            model_name="analysisrecord",
+            name="content_hash",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.RunPython(fill_content_hashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.10 on 2026-10-18 10:41
+
+from django.db import migrations
+
+
+def create_fts_index(apps, schema_editor):
+    """Create the FTS5 search table (SQLite only) and index existing records."""
+
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS counter_analysisrecord_fts "
+        "USING fts5(title, body, user_id UNINDEXED)"
+    )
+    schema_editor.execute(
+        "INSERT INTO counter_analysisrecord_fts (rowid, title, body, user_id) "
+        "SELECT id, title, original_text, user_id FROM counter_analysisrecord"
+    )
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS counter_analysisrecord_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [ # noqa: RUF012
+        ("counter", "0003_analysisrecord_content_hash"),
+    ]
+
+    operations = [ # noqa: RUF012
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
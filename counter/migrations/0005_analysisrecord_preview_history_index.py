@@ -0,0 +1,39 @@
+# Generated by Django 5.2.10 on 2026-10-18 11:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_previews(apps, schema_editor):
+    """Copy the start of each existing record's text into its preview."""
+
+    AnalysisRecord = apps.get_model("counter", "AnalysisRecord")
+    batch = []
+    for record in AnalysisRecord.objects.only("id", "original_text").iterator():
+        record.preview = record.original_text[:100]
+        batch.append(record)
+        if len(batch) >= 500:
+            AnalysisRecord.objects.bulk_update(batch, ["preview"])
+            batch = []
+    AnalysisRecord.objects.bulk_update(batch, ["preview"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [ # noqa: RUF012
+        ("counter", "0004_analysisrecord_fts"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [ # noqa: RUF012
+        migrations.AddField(
+            model_name="analysisrecord",
+            name="preview",
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name="analysisrecord",
+            index=models.Index(fields=["user", "-uploaded_at", "-id"], name="counter_history_idx"),
+        ),
+        migrations.RunPython(fill_previews, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.10 on 2026-10-18 11:30
+
+from django.db import migrations, models
+
+import counter.fields
+
+
+def compress_texts(apps, schema_editor):
+    """Copy every record's text into the compressed column."""
+
+    AnalysisRecord = apps.get_model("counter", "AnalysisRecord")
+    batch = []
+    for record in AnalysisRecord.objects.only("id", "original_text").iterator():
+        record.compressed_text = record.original_text
+        batch.append(record)
+        if len(batch) >= 500:
+            AnalysisRecord.objects.bulk_update(batch, ["compressed_text"])
+            batch = []
+    AnalysisRecord.objects.bulk_update(batch, ["compressed_text"])
+
+
+def decompress_texts(apps, schema_editor):
+    """Copy the compressed text back into the plain text column."""
+
+    AnalysisRecord = apps.get_model("counter", "AnalysisRecord")
+    batch = []
+    for record in AnalysisRecord.objects.only("id", "compressed_text").iterator():
+        record.original_text = record.compressed_text
+        batch.append(record)
+        if len(batch) >= 500:
+            AnalysisRecord.objects.bulk_update(batch, ["original_text"])
+            batch = []
+    AnalysisRecord.objects.bulk_update(batch, ["original_text"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [ # noqa: RUF012
+        ("counter", "0005_analysisrecord_preview_history_index"),
+    ]
+
+    operations = [ # noqa: RUF012
+        # The default lets the plain column be re-added when migrating backwards.
+        migrations.AlterField(
+            model_name="analysisrecord",
+            name="original_text",
+            field=models.TextField(default=""),
+        ),
+        migrations.AddField(
+            model_name="analysisrecord",
+            name="compressed_text",
+            field=counter.fields.CompressedTextField(default=""),
+            preserve_default=False,
+        ),
+        migrations.RunPython(compress_texts, decompress_texts),
+        migrations.RemoveField(
+            model_name="analysisrecord",
+            name="original_text",
+        ),
+        migrations.RenameField(
+            model_name="analysisrecord",
+            old_name="compressed_text",
+            new_name="original_text",
+        ),
+    ]
@@ -0,0 +1,102 @@
+# Generated by Django 5.2.10 on 2026-10-18 12:20
+
+import re
+from collections import Counter
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Frozen copies of TextProfile.content_word_counts and its STOP_WORDS, so
+# this migration counts words the same way however the app code changes.
+ALPHA_WORD_RE = re.compile(r"\b[a-zA-Z']+\b")
+
+STOP_WORDS = frozenset({'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', "you're",
+    "you've", "you'll", "you'd", 'your', 'yours', 'yourself', 'yourselves', 'he',
+    'him', 'his', 'himself', 'she', "she's", 'her', 'hers', 'herself', 'it', "it's",
+    'its', 'itself', 'they', 'them', 'their', 'theirs', 'themselves', 'what', 'which',
+    'who', 'whom', 'this', 'that', "that'll", 'these', 'those', 'am', 'is', 'are',
+    'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'having', 'do',
+    'does', 'did', 'doing', 'a', 'an', 'the', 'and', 'but', 'if', 'or', 'because',
+    'as', 'until', 'while', 'of', 'at', 'by', 'for', 'with', 'about', 'against',
+    'between', 'into', 'through', 'during', 'before', 'after', 'above', 'below', 'to',
+    'from', 'up', 'down', 'in', 'out', 'on', 'off', 'over', 'under', 'again', 'further',
+    'then', 'once', 'here', 'there', 'when', 'where', 'why', 'how', 'all', 'any',
+    'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not',
+    'only', 'own', 'same', 'so', 'than', 'too', 'very', 's', 't', 'can', 'will',
+    'just', 'don', "don't", 'should', "should've", 'now', 'd', 'll', 'm', 'o', 're',
+    've', 'y', 'ain', 'aren', "aren't", 'couldn', "couldn't", 'didn', "didn't", 'doesn',
+    "doesn't", 'hadn', "hadn't", 'hasn', "hasn't", 'haven', "haven't", 'isn', "isn't",
+    'ma', 'mightn', "mightn't", 'mustn', "mustn't", 'needn', "needn't", 'shan', "shan't",
+    'shouldn', "shouldn't", 'wasn', "wasn't", 'weren', "weren't", 'won', "won't",
+    'wouldn', "wouldn't"})
+
+
+def content_word_counts(text):
+    """Frequencies of alphabetic, lowercased tokens that are not STOP_WORDS."""
+
+    return Counter(w for w in ALPHA_WORD_RE.findall(text.lower()) if w not in STOP_WORDS)
+
+
+def fill_word_aggregates(apps, schema_editor):
+    """Count the words of every existing record, one user at a time."""
+
+    AnalysisRecord = apps.get_model("counter", "AnalysisRecord")
+    UserWordCount = apps.get_model("counter", "UserWordCount")
+    UserWordTotals = apps.get_model("counter", "UserWordTotals")
+
+    user_ids = AnalysisRecord.objects.values_list("user_id", flat=True).distinct()
+    for user_id in user_ids:
+        counts = Counter()
+        documents = 0
+        records = AnalysisRecord.objects.filter(user_id=user_id).only("id", "original_text")
+        for record in records.iterator():
+            counts.update(content_word_counts(record.original_text))
+            documents += 1
+
+        UserWordCount.objects.bulk_create(
+            [
+                UserWordCount(user_id=user_id, word=word, count=count)
+                for word, count in counts.items()
+                if len(word) <= 100
+            ],
+            batch_size=1000,
+        )
+        UserWordTotals.objects.create(
+            user_id=user_id,
+            documents=documents,
+            words=sum(c for w, c in counts.items() if len(w) <= 100),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [ # noqa: RUF012
+        ("counter", "0006_compress_original_text"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [ # noqa: RUF012
+        migrations.CreateModel(
+            name="UserWordTotals",
+            fields=[
+                ("user", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="word_totals", serialize=False, to=settings.AUTH_USER_MODEL)),
+                ("documents", models.IntegerField(default=0)),
+                ("words", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="UserWordCount",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("word", models.CharField(max_length=100)),
+                ("count", models.IntegerField(default=0)),
+                ("user", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="word_counts", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["user", "-count"], name="counter_user_top_words_idx")],
+                "constraints": [models.UniqueConstraint(fields=("user", "word"), name="unique_user_word")],
+            },
+        ),
+        migrations.RunPython(fill_word_aggregates, migrations.RunPython.noop),
+    ]
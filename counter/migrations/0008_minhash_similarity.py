@@ -0,0 +1,116 @@
+# Generated by Django 5.2.10 on 2026-10-18 12:55
+
+import hashlib
+import re
+import zlib
+
+import django.db.models.deletion
+import numpy as np
+from django.db import migrations, models
+
+# A frozen copy of counter.services.similarity as it was when signatures
+# were introduced, so this migration always writes the same signatures.
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 3
+SIGNATURE_BLOCK = 4096
+SHINGLE_WORD_RE = re.compile(r"\w+")
+
+_rng = np.random.default_rng(20260418)
+_MULTIPLIERS = _rng.integers(1, 2**63, NUM_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_OFFSETS = _rng.integers(0, 2**63, NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def compute_signature(text):
+    """The MinHash signature of a text's word 3-grams as bytes, or None."""
+
+    words = SHINGLE_WORD_RE.findall(text.lower())
+    if not words:
+        return None
+    if len(words) < SHINGLE_SIZE:
+        shingles = [" ".join(words)]
+    else:
+        shingles = (
+            " ".join(words[i : i + SHINGLE_SIZE])
+            for i in range(len(words) - SHINGLE_SIZE + 1)
+        )
+    hashes = np.unique(
+        np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64)
+    )
+
+    signature = np.full(NUM_PERMUTATIONS, np.iinfo(np.uint64).max, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for start in range(0, hashes.size, SIGNATURE_BLOCK):
+            block = hashes[start : start + SIGNATURE_BLOCK, None]
+            permuted = (block * _MULTIPLIERS[None, :] + _OFFSETS[None, :]) >> np.uint64(32)
+            np.minimum(signature, permuted.min(axis=0), out=signature)
+    return signature.astype("<u4").tobytes()
+
+
+def band_buckets(signature):
+    """(band, bucket) pairs of a signature, as the LSH index stores them."""
+
+    values = np.frombuffer(bytes(signature), dtype="<u4")
+    buckets = []
+    for band in range(BANDS):
+        rows = values[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND].tobytes()
+        digest = hashlib.blake2b(rows, digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, "big", signed=True)))
+    return buckets
+
+
+def fill_signatures(apps, schema_editor):
+    """Sign every existing record and put it in the LSH index."""
+
+    AnalysisRecord = apps.get_model("counter", "AnalysisRecord")
+    SimilarityBucket = apps.get_model("counter", "SimilarityBucket")
+
+    records, buckets = [], []
+
+    def flush():
+        AnalysisRecord.objects.bulk_update(records, ["minhash"])
+        SimilarityBucket.objects.bulk_create(buckets)
+        records.clear()
+        buckets.clear()
+
+    for record in AnalysisRecord.objects.only("id", "original_text").iterator():
+        record.minhash = compute_signature(record.original_text)
+        if record.minhash is None:
+            continue
+        records.append(record)
+        buckets.extend(
+            SimilarityBucket(record_id=record.pk, band=band, bucket=bucket)
+            for band, bucket in band_buckets(record.minhash)
+        )
+        if len(records) >= 500:
+            flush()
+    flush()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [ # noqa: RUF012
+        ("counter", "0007_user_word_aggregates"),
+    ]
+
+    operations = [ # noqa: RUF012
+        migrations.AddField(
+            model_name="analysisrecord",
+            name="minhash",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="SimilarityBucket",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("band", models.SmallIntegerField()),
+                ("bucket", models.BigIntegerField()),
+                ("record", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="similarity_buckets", to="counter.analysisrecord")),
+            ],
+            options={
+                "indexes": [models.Index(fields=["band", "bucket"], name="counter_similarity_idx")],
+            },
+        ),
+        migrations.RunPython(fill_signatures, migrations.RunPython.noop),
+    ]
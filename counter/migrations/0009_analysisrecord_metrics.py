@@ -0,0 +1,20 @@
+# Generated by Django 5.2.10 on 2026-10-18 08:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [ # noqa: RUF012
+        ("counter", "0008_minhash_similarity"),
+    ]
+
+    operations = [ # noqa: RUF012
+        # Existing records keep an empty dict; their metrics are computed
+        # from their text as before.
+        migrations.AddField(
+            model_name="analysisrecord",
+            name="metrics",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
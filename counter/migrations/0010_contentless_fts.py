@@ -0,0 +1,60 @@
+# Generated by Django 5.2.10 on 2026-10-18 14:05
+
+from django.db import migrations
+
+
+def _rebuild(schema_editor, definition, columns, rows):
+    """Recreate the FTS5 table with the given definition and fill in the rows."""
+
+    schema_editor.execute("DROP TABLE IF EXISTS counter_analysisrecord_fts")
+    schema_editor.execute(f"CREATE VIRTUAL TABLE counter_analysisrecord_fts USING fts5({definition})")
+    placeholders = ", ".join(["%s"] * (len(columns) + 1))
+    insert = (
+        f"INSERT INTO counter_analysisrecord_fts (rowid, {', '.join(columns)}) "
+        f"VALUES ({placeholders})"
+    )
+    with schema_editor.connection.cursor() as cursor:
+        batch = []
+        for row in rows.iterator():
+            batch.append(row)
+            if len(batch) >= 500:
+                cursor.executemany(insert, batch)
+                batch = []
+        if batch:
+            cursor.executemany(insert, batch)
+
+
+def make_contentless(apps, schema_editor):
+    """
+    Rebuild the search table without its own copy of every text: the
+    records keep their text compressed, the index only needs the words.
+    """
+
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    AnalysisRecord = apps.get_model("counter", "AnalysisRecord")
+    rows = AnalysisRecord.objects.values_list("id", "title", "original_text")
+    _rebuild(schema_editor, "title, body, content=''", ("title", "body"), rows)
+
+
+def restore_content(apps, schema_editor):
+    """Go back to the table of migration 0004, which stores the texts too."""
+
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    AnalysisRecord = apps.get_model("counter", "AnalysisRecord")
+    rows = AnalysisRecord.objects.values_list("id", "title", "original_text", "user_id")
+    _rebuild(
+        schema_editor, "title, body, user_id UNINDEXED", ("title", "body", "user_id"), rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [ # noqa: RUF012
+        ("counter", "0009_analysisrecord_metrics"),
+    ]
+
+    operations = [ # noqa: RUF012
+        migrations.RunPython(make_contentless, restore_content),
+    ]
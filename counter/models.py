@@ -1,15 +1,44 @@
 from django.contrib.auth.models import User
 from django.db import models
 
+from .fields import CompressedTextField
+from .services.similarity import compute_signature
+from .services.text_profile import text_digest
+
+# How much of the text is copied into `preview` for list pages.
+PREVIEW_LENGTH = 100
+
+# Analysis results kept in AnalysisRecord.metrics; the others have columns.
+STORED_METRICS = (
+    "char_count",
+    "sentence_count",
+    "paragraph_count",
+    "reading_time",
+    "top_words",
+    "vault_pins",
+)
+
 
 class AnalysisRecord(models.Model):
     """Link the analysis to a specific user."""
 
+    # Set when save() computed a new MinHash signature; see signals.py.
+    signature_changed = False
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="analyses")
 
     # Store the input.
     title = models.CharField(max_length=255, blank=True)
-    original_text = models.TextField()
+    # Stored zlib-compressed; reads and writes still use plain strings.
+    original_text = CompressedTextField()
+    # SHA-256 of the analyzed text, so identical uploads can be found instantly.
+    # Streamed uploads only keep the beginning of their text in original_text,
+    # so for them this hashes the full source, not original_text.
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    # The start of original_text, so lists never load the full text.
+    preview = models.CharField(max_length=PREVIEW_LENGTH, blank=True)
+    # MinHash signature of the text, for near-duplicate lookups.
+    minhash = models.BinaryField(null=True, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     file = models.FileField(upload_to="user_document/%Y/%m/%d/", blank=True, null=True)
 
@@ -33,8 +62,95 @@ class AnalysisRecord(models.Model):
     overused = models.JSONField(default=list, blank=True)
     # How many passive sentences?
     passive_count = models.IntegerField(default=0)
+    # The rest of the analysis of the full text (STORED_METRICS), so records
+    # whose text is only a preview never need it analyzed again.
+    metrics = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [ # noqa: RUF012
+            # History pages are read newest first, one user at a time.
+            models.Index(fields=["user", "-uploaded_at", "-id"], name="counter_history_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        """Fill in the content hash and preview before the row is written."""
+
+        self.fill_derived_fields()
+        super().save(*args, **kwargs)
+
+    def fill_derived_fields(self):
+        """
+        Derive the content hash, preview and MinHash signature from the text.
+        Called by save(); bulk_create skips save(), so call it first there.
+        """
+
+        # A record loaded without its text keeps the stored values.
+        if "original_text" not in self.get_deferred_fields():
+            self.preview = self.original_text[:PREVIEW_LENGTH]
+            if not self.content_hash:
+                self.content_hash = text_digest(self.original_text)
+            if self.minhash is None:
+                self.minhash = compute_signature(self.original_text)
+                # Tells the post_save handler the LSH buckets need rewriting.
+                self.signature_changed = True
 
     def __str__(self):
         """Defines how a object appears as a string."""
 
         return f"{self.user.username} - {self.title or 'Unnamed'} ({self.uploaded_at.date()})"
+
+
+class SimilarityBucket(models.Model):
+    """
+    One LSH band of a record's MinHash signature. Records sharing a
+    (band, bucket) pair are candidate near-duplicates.
+    """
+
+    record = models.ForeignKey(
+        AnalysisRecord, on_delete=models.CASCADE, related_name="similarity_buckets"
+    )
+    band = models.SmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [ # noqa: RUF012
+            models.Index(fields=["band", "bucket"], name="counter_similarity_idx"),
+        ]
+
+    def __str__(self):
+        return f"record {self.record_id}, band {self.band}"
+
+
+class UserWordCount(models.Model):
+    """How often a user has used a content word across their whole vault."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="word_counts")
+    word = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [ # noqa: RUF012
+            models.UniqueConstraint(fields=["user", "word"], name="unique_user_word"),
+        ]
+        indexes = [ # noqa: RUF012
+            # Top-k reads: a user's words, most used first.
+            models.Index(fields=["user", "-count"], name="counter_user_top_words_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username}: {self.word} x{self.count}"
+
+
+class UserWordTotals(models.Model):
+    """Running vocabulary totals for a user's vault."""
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="word_totals"
+    )
+    # Records counted in the aggregates.
+    documents = models.IntegerField(default=0)
+    # Content words (stop words excluded) across those records.
+    words = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user.username}: {self.words} words in {self.documents} documents"
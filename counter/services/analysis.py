@@ -1,8 +1,3 @@
-import collections
-
-# Import the Regular Expression module for advanced text searching and cleaning
-import re
-
 STOP_WORDS = {'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', "you're", 
     "you've", "you'll", "you'd", 'your', 'yours', 'yourself', 'yourselves', 'he', 
     'him', 'his', 'himself', 'she', "she's", 'her', 'hers', 'herself', 'it', "it's", 
@@ -23,15 +18,18 @@ STOP_WORDS = {'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you'
     'shouldn', "shouldn't", 'wasn', "wasn't", 'weren', "weren't", 'won', "won't", 
     'wouldn', "wouldn't"}
 
-def get_word_frequencies(text: str, limit: int = 10):
-    """Calculates the most frequent words; defaults to a top 10 list."""
+def get_word_frequencies(text, limit: int = 10):
+    """
+    Calculates the most frequent words; defaults to a top 10 list.
+    Accepts raw text or an already tokenized TextProfile.
+    """
+
+    # Imported here because text_profile imports STOP_WORDS from this module.
+    from .text_profile import get_profile
 
-    # Regex handles punctuation better than other methods.
-    # eg, 'code,' becomes 'code'
-    words = re.findall(r"\b[a-zA-Z']+\b", text.lower())
-    
-    # Create a new list excluding common 'filler' words (the, a, is, etc.)
-    filtered_words = [w for w in words if w not in STOP_WORDS]
+    # The profile's regex handles punctuation better than other methods.
+    # eg, 'code,' becomes 'code', and filler words (the, a, is) are removed.
+    counts = get_profile(text).content_word_counts
 
-    # Count word occurrences and return the top 'limit' (e.g., top 10) results
-    return collections.Counter(filtered_words).most_common(limit)
+    # Return the top 'limit' (e.g., top 10) results
+    return counts.most_common(limit)
@@ -0,0 +1,133 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from ..models import STORED_METRICS
+from . import timing, word_selectors
+from .analysis import get_word_frequencies
+from .origins import get_value_matches
+from .quality_insights import analyze_quality, get_basic_metrics
+from .summarizer import generate_summary
+from .text_profile import TextProfile, text_digest
+
+# Bump this when the shape of the analysis dictionary changes,
+# so old cached entries are ignored instead of breaking the template.
+CACHE_VERSION = 2
+
+# get_basic_metrics() results besides the word count, which has its own column.
+BASIC_METRICS = ("char_count", "sentence_count", "paragraph_count", "reading_time")
+
+
+@timing.stage("analysis")
+def analyze_text(text: str, record=None) -> dict:
+    """
+    Run every metric over the text, tokenizing it only once.
+    If a vault record with identical text is given, its stored summary,
+    quality insights and metrics are reused instead of being computed again.
+    """
+
+    stored = record.metrics if record is not None else {}
+    # Records with every stored metric are never analyzed again; for streamed
+    # uploads the text is only a preview and would give the wrong numbers.
+    profile = None if all(key in stored for key in STORED_METRICS) else TextProfile(text)
+
+    if "char_count" in stored:
+        metrics = {key: stored[key] for key in BASIC_METRICS}
+    else:
+        metrics = get_basic_metrics(profile)
+    if record is not None:
+        # Always the full text's count, even for records saved before `metrics`.
+        metrics["word_count"] = record.word_count
+        summary_data = {
+            "summary": record.summary,
+            "bullets": record.bullets,
+            "topics": record.topics,
+        }
+        quality_data = {
+            "longest_sentence": record.longest_sentence,
+            "ttr": record.ttr,
+            "overused": record.overused,
+            "passive_count": record.passive_count,
+        }
+    else:
+        summary_data = generate_summary(profile)
+        quality_data = analyze_quality(profile)
+
+    if "vault_pins" in stored:
+        vault_pins = stored["vault_pins"]
+    else:
+        # Check the DuckDB vault for every unique word.
+        vault_pins = get_value_matches(list(profile.unique_words))
+
+    if "top_words" in stored:
+        top_words = stored["top_words"]
+    else:
+        top_words = get_word_frequencies(profile)
+
+    return {
+        **metrics,  # word_count, sentence_count, paragraph_count, etc.
+        "summary": summary_data["summary"],
+        "bullets": summary_data["bullets"],
+        "topics": summary_data["topics"],
+        "longest_sentence": quality_data["longest_sentence"],
+        "ttr": quality_data["ttr"],
+        "overused": quality_data["overused"],
+        "passive_count": quality_data["passive_count"],
+        "vault_pins": vault_pins,
+        # Top 10 words for the frequency chart, so it never needs the text.
+        "top_words": top_words,
+    }
+
+
+def _cache_key(digest: str) -> str:
+    """Namespaced cache key for an analysis digest."""
+
+    return f"analysis:{digest}"
+
+
+@timing.stage("cache")
+def get_cached_analysis(digest: str):
+    """Return the stored analysis for a digest, or None on a miss."""
+
+    return cache.get(_cache_key(digest), version=CACHE_VERSION)
+
+
+def cache_analysis(digest: str, results: dict) -> None:
+    """Store computed results so repeat views are a single lookup."""
+
+    timeout = getattr(settings, "ANALYSIS_CACHE_TIMEOUT", 60 * 60)
+    cache.set(_cache_key(digest), results, timeout, version=CACHE_VERSION)
+
+
+def get_analysis(text: str, digest: str | None = None) -> dict:
+    """
+    Fetch the analysis of a text from the cache,
+    computing and storing it only on a miss.
+    """
+
+    digest = digest or text_digest(text)
+
+    results = get_cached_analysis(digest)
+    if results is None:
+        # Identical text already in the vault? Reuse its stored metrics.
+        record = word_selectors.find_record_by_hash(digest)
+        results = analyze_text(text, record)
+        cache_analysis(digest, results)
+    return results
+
+
+def get_top_words(digest: str, user):
+    """
+    Returns the chart's (word, count) pairs for an analysis digest,
+    or None if the analysis is neither cached nor in the user's vault.
+    """
+
+    results = get_cached_analysis(digest)
+    if results is not None:
+        return results["top_words"]
+
+    record = word_selectors.find_user_record_by_hash(user, digest)
+    if record is None:
+        return None
+    if "top_words" in record.metrics:
+        return record.metrics["top_words"]
+    return get_word_frequencies(record.original_text)
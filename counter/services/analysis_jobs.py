@@ -0,0 +1,325 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db import DatabaseError, close_old_connections
+
+from . import word_selectors
+from .analysis_cache import cache_analysis
+from .streaming_analysis import StreamingAnalyzer
+from .text_extractors import EXTRACTION_ERRORS, iter_text_chunks
+
+logger = logging.getLogger(__name__)
+
+# What the extracted pieces of each file type are, for the progress display.
+PIECE_UNITS = {".pdf": "pages", ".docx": "paragraphs"}
+
+# Pasted text is fed to the analyzer in blocks of this many characters.
+TEXT_BLOCK_CHARS = 1024 * 1024
+
+# How long EventSource waits before reconnecting to a stream that ended.
+SSE_RETRY_MS = 1000
+
+# Failures of the upload itself (or of saving it), reported through the job.
+JOB_ERRORS = (*EXTRACTION_ERRORS, DatabaseError)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """The local worker pool that analyzes uploads outside the request."""
+
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "ANALYSIS_JOB_WORKERS", 2),
+                thread_name_prefix="analysis-job",
+            )
+        return _executor
+
+
+def _jobs_dir() -> Path:
+    """Job state and uploads live on disk, so every worker process sees them."""
+
+    path = Path(settings.ANALYSIS_JOBS_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _state_path(job_id: str) -> Path:
+    return _jobs_dir() / f"{job_id}.json"
+
+
+def _upload_path(job: dict) -> Path:
+    return _jobs_dir() / f"{job['id']}.upload"
+
+
+def _write_state(job: dict) -> None:
+    """Atomically replace a job's state file, stamping when it was updated."""
+
+    path = _state_path(job["id"])
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps({**job, "updated_at": time.time()}))
+    os.replace(tmp_path, path)
+
+
+def _read_state(job_id: str):
+    try:
+        return json.loads(_state_path(job_id).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _iter_pieces(job: dict, text):
+    """The job's text in pieces: pasted text in blocks, uploads as extracted."""
+
+    if text is not None:
+        for start in range(0, len(text), TEXT_BLOCK_CHARS):
+            yield text[start : start + TEXT_BLOCK_CHARS]
+        return
+
+    with open(_upload_path(job), "rb") as raw:
+        chunks = iter_text_chunks(File(raw, name=job["title"]))
+        if chunks is None:
+            raise ValueError(f"Unsupported file type: {job['title']}")
+        yield from chunks
+
+
+def _run_job(job: dict, user, text, keep_text: bool) -> None:
+    """
+    Extract, analyze and save in a pool thread, writing the progress to the
+    state file: pieces extracted and words counted as they come in, then the
+    summary, then the saved record.
+    """
+
+    interval = getattr(settings, "ANALYSIS_JOB_PROGRESS_INTERVAL", 0.25)
+    job = {**job, "status": "running", "stage": "extracting"}
+    _write_state(job)
+    try:
+        analyzer = StreamingAnalyzer()
+        # Small documents are stored whole, like in the counter view; big
+        # ones only keep the analyzer's preview of their beginning.
+        pieces = [] if keep_text else None
+        last_write = time.monotonic()
+        for piece in _iter_pieces(job, text):
+            analyzer.feed(piece)
+            if pieces is not None:
+                pieces.append(piece)
+            job["extracted"] += 1
+            if time.monotonic() - last_write >= interval:
+                job["words"] = analyzer.word_count
+                _write_state(job)
+                last_write = time.monotonic()
+
+        job.update({"stage": "analyzing", "words": analyzer.word_count})
+        _write_state(job)
+        results = analyzer.finish()
+        stored_text = "".join(pieces) if pieces is not None else analyzer.preview
+        if not stored_text.strip():
+            raise ValueError(f"No text found in {job['title']}")
+
+        digest = analyzer.digest
+        cache_analysis(digest, results)
+        job.update(
+            {
+                "stage": "saving",
+                "words": results["word_count"],
+                "summary": results["summary"],
+                "digest": digest,
+            }
+        )
+        _write_state(job)
+
+        record, created = word_selectors.save_analysis_record(
+            user, job["title"], stored_text, results, digest
+        )
+        job.update(
+            {
+                "status": "done",
+                "stage": "done",
+                "record_id": record.pk,
+                "created": created,
+                "truncated": pieces is None,
+            }
+        )
+    except JOB_ERRORS as exc:
+        job.update({"status": "failed", "error": str(exc) or exc.__class__.__name__})
+    except Exception:
+        # A bug: end the job so the page doesn't wait for it, and re-raise
+        # rather than pass it off as a problem with the upload.
+        logger.exception("Analysis job %s crashed", job["id"])
+        _write_state({**job, "status": "failed", "error": "Internal error", "finished_at": time.time()})
+        raise
+    finally:
+        # Pool threads keep their own connections; don't leave them open.
+        close_old_connections()
+        _upload_path(job).unlink(missing_ok=True)
+    _write_state({**job, "finished_at": time.time()})
+
+
+def submit_analysis(user, title: str, text=None, uploaded_file=None) -> dict:
+    """
+    Queue the analysis of pasted text or an uploaded file and return its
+    job record straight away. Uploads are copied to the jobs folder first,
+    since Django deletes their temporary files when the request ends.
+    """
+
+    suffix = Path(title).suffix.lower()
+    job = {
+        "id": uuid.uuid4().hex,
+        "user_id": user.pk,
+        "title": title,
+        "status": "queued",
+        "stage": "queued",
+        "unit": PIECE_UNITS.get(suffix, "blocks"),
+        "extracted": 0,
+        "words": 0,
+        "summary": None,
+        "digest": None,
+        "record_id": None,
+        "created": None,
+        "truncated": False,
+        "error": "",
+        "created_at": time.time(),
+        "finished_at": None,
+    }
+
+    keep_text = True
+    if uploaded_file is not None:
+        with open(_upload_path(job), "wb") as destination:
+            destination.writelines(uploaded_file.chunks())
+        keep_text = uploaded_file.size < settings.STREAMING_ANALYSIS_MIN_BYTES
+
+    _write_state(job)
+    purge_expired_jobs()
+    _get_executor().submit(_run_job, job, user, text, keep_text)
+    return job
+
+
+def get_job(job_id: str, user):
+    """Returns a job owned by the user, or None."""
+
+    # Job ids are uuid4 hex strings; anything else could escape the jobs dir.
+    try:
+        job_id = uuid.UUID(hex=job_id).hex
+    except ValueError:
+        return None
+
+    job = _read_state(job_id)
+    if job is None or job["user_id"] != user.pk:
+        return None
+
+    # Jobs write their state as they go; one that stopped doing so (e.g. its
+    # process restarted) would otherwise stay unfinished until it is purged.
+    timeout = getattr(settings, "ANALYSIS_JOB_TIMEOUT", 10 * 60)
+    if job["status"] in ("queued", "running") and time.time() - job["updated_at"] > timeout:
+        job = {**job, "status": "failed", "error": "The analysis stopped responding"}
+        _write_state({**job, "finished_at": time.time()})
+    return job
+
+
+def job_progress(job: dict) -> dict:
+    """The part of a job's state that is sent to the browser."""
+
+    return {
+        key: job[key]
+        for key in (
+            "id", "status", "stage", "unit", "extracted",
+            "words", "summary", "record_id", "error",
+        )
+    }
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _poll_events(job_id: str, user, last, idle: float):
+    """
+    One poll of the job state: returns (events to send, state seen,
+    whether the stream is over). A comment line is sent after
+    ANALYSIS_JOB_HEARTBEAT seconds of silence, so proxies keep the stream open.
+    """
+
+    job = get_job(job_id, user)
+    if job is None:
+        return [_sse("failed", {"id": job_id, "error": "Unknown analysis job"})], last, True
+
+    progress = job_progress(job)
+    if job["status"] in ("done", "failed"):
+        return [_sse(job["status"], progress)], progress, True
+    if progress != last:
+        return [_sse("progress", progress)], progress, False
+    if idle >= getattr(settings, "ANALYSIS_JOB_HEARTBEAT", 15):
+        return [": keep-alive\n\n"], last, False
+    return [], last, False
+
+
+def iter_events(job_id: str, user, poll_interval: float = 0.2, max_seconds=None):
+    """
+    Server-sent events for a job: a "progress" event whenever its state
+    changes, then one "done" or "failed" event to end the stream.
+
+    With max_seconds the stream also ends after that long; EventSource
+    reconnects after SSE_RETRY_MS and gets a fresh stream. That way sync
+    workers are only held for a short while at a time.
+    """
+
+    yield f"retry: {SSE_RETRY_MS}\n\n"
+    started = time.monotonic()
+    last, quiet_since = None, started
+    while True:
+        events, last, finished = _poll_events(
+            job_id, user, last, time.monotonic() - quiet_since
+        )
+        yield from events
+        if finished or (max_seconds and time.monotonic() - started >= max_seconds):
+            return
+        if events:
+            quiet_since = time.monotonic()
+        time.sleep(poll_interval)
+
+
+async def aiter_events(job_id: str, user, poll_interval: float = 0.2):
+    """
+    iter_events for async views: waiting holds no thread,
+    so the stream lasts until the job ends.
+    """
+
+    yield f"retry: {SSE_RETRY_MS}\n\n"
+    last, quiet_since = None, time.monotonic()
+    while True:
+        events, last, finished = _poll_events(
+            job_id, user, last, time.monotonic() - quiet_since
+        )
+        for event in events:
+            yield event
+        if finished:
+            return
+        if events:
+            quiet_since = time.monotonic()
+        await asyncio.sleep(poll_interval)
+
+
+def purge_expired_jobs() -> None:
+    """Delete job files older than ANALYSIS_JOB_TTL seconds."""
+
+    cutoff = time.time() - getattr(settings, "ANALYSIS_JOB_TTL", 60 * 60)
+    for path in _jobs_dir().iterdir():
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            # Another worker purged it first.
+            continue
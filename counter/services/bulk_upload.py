@@ -0,0 +1,122 @@
+import zipfile
+import zlib
+from pathlib import PurePosixPath
+
+from django.conf import settings
+
+from . import batch, word_selectors
+
+
+class BulkUploadError(ValueError):
+    """The upload as a whole breaks a limit; nothing was stored."""
+
+
+# What reading one damaged zip entry can raise: a bad CRC or truncated data,
+# a password, an unsupported compression method, a corrupt deflate stream.
+ZIP_ENTRY_ERRORS = (zipfile.BadZipFile, RuntimeError, NotImplementedError, EOFError, zlib.error)
+
+
+def _limits():
+    return (
+        getattr(settings, "BULK_UPLOAD_MAX_FILES", 500),
+        getattr(settings, "BULK_UPLOAD_MAX_BYTES", 100 * 1024 * 1024),
+    )
+
+
+def collect_documents(uploaded_files):
+    """
+    Unpack the uploaded files (zip archives included) into
+    ([(name, bytes), ...] to analyze, {position: status dict} of skipped
+    entries), where position is the entry's place among all of them.
+
+    Raises BulkUploadError past BULK_UPLOAD_MAX_FILES documents or
+    BULK_UPLOAD_MAX_BYTES of uncompressed text files.
+    """
+
+    max_files, max_bytes = _limits()
+    documents, skipped = [], {}
+    total = 0
+
+    def skip(name, status, error):
+        skipped[len(documents) + len(skipped)] = {"name": name, "status": status, "error": error}
+
+    def add(name, size, read):
+        nonlocal total
+        if not name.lower().endswith(batch.SUPPORTED_EXTENSIONS):
+            skip(name, "unsupported", "Unsupported file type")
+            return
+        total += size
+        if len(documents) >= max_files:
+            raise BulkUploadError(f"Too many documents (the limit is {max_files}).")
+        if total > max_bytes:
+            raise BulkUploadError(
+                f"Upload too large (the limit is {max_bytes // (1024 * 1024)} MB uncompressed)."
+            )
+        try:
+            data = read()
+        except ZIP_ENTRY_ERRORS as exc:
+            skip(name, "failed", f"Unreadable archive entry: {exc}")
+            return
+        documents.append((name, data))
+
+    for uploaded_file in uploaded_files:
+        if not uploaded_file.name.lower().endswith(".zip"):
+            add(uploaded_file.name, uploaded_file.size, uploaded_file.read)
+            continue
+
+        try:
+            archive = zipfile.ZipFile(uploaded_file)
+        except zipfile.BadZipFile:
+            skip(uploaded_file.name, "failed", "Not a valid zip archive")
+            continue
+        with archive:
+            for info in archive.infolist():
+                parts = PurePosixPath(info.filename).parts
+                # Skip folders and the metadata macOS adds to archives.
+                if info.is_dir() or "__MACOSX" in parts or parts[-1].startswith("."):
+                    continue
+                name = f"{uploaded_file.name}/{info.filename}"
+                # The declared size is checked before anything is decompressed.
+                add(name, info.file_size, lambda archive=archive, info=info: archive.read(info))
+
+    return documents, skipped
+
+
+def process_bulk_upload(user, uploaded_files):
+    """
+    Analyze many uploaded documents on a bounded process pool and save
+    them to the user's vault in batched inserts.
+    Returns one status dict per file, in upload order.
+    """
+
+    documents, skipped = collect_documents(uploaded_files)
+    outcomes = batch.analyze_blobs(
+        documents, workers=getattr(settings, "BULK_UPLOAD_WORKERS", 2)
+    )
+    stored = word_selectors.store_analyzed_documents(
+        user,
+        # Tag each outcome with its document's index: failures and
+        # duplicates come back before the created ones of their batch.
+        ({**outcome, "index": index} for index, outcome in enumerate(outcomes)),
+        batch_size=getattr(settings, "BULK_UPLOAD_BATCH_SIZE", 200),
+    )
+
+    statuses = {
+        outcome["index"]: {
+            "name": outcome["path"],
+            "status": outcome["status"],
+            "error": outcome["error"],
+            "record_id": outcome.get("record_id"),
+            "word_count": outcome["results"]["word_count"] if "results" in outcome else None,
+        }
+        for outcome in stored
+    }
+    # Skipped entries go back in their place among the analyzed ones.
+    results, index = [], 0
+    for position in range(len(documents) + len(skipped)):
+        if position in skipped:
+            results.append(skipped[position])
+        else:
+            results.append(statuses[index])
+            index += 1
+    return results
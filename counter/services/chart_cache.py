@@ -0,0 +1,45 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+# Bump this when the chart's look changes, so browsers fetch the new image.
+CHART_VERSION = 1
+
+# digest -> PNG bytes, least recently used first.
+_charts: OrderedDict[str, bytes] = OrderedDict()
+_charts_lock = threading.Lock()
+
+
+def chart_etag(digest: str) -> str:
+    """The ETag of a chart only depends on its text and the chart version."""
+
+    return f"{digest}-v{CHART_VERSION}"
+
+
+def get_chart(digest: str):
+    """Return the cached PNG for a digest (or None), marking it recently used."""
+
+    with _charts_lock:
+        png = _charts.get(digest)
+        if png is not None:
+            _charts.move_to_end(digest)
+        return png
+
+
+def store_chart(digest: str, png: bytes) -> None:
+    """Cache a rendered PNG, evicting the least recently used charts."""
+
+    max_entries = getattr(settings, "CHART_CACHE_MAX_ENTRIES", 128)
+    with _charts_lock:
+        _charts[digest] = png
+        _charts.move_to_end(digest)
+        while len(_charts) > max_entries:
+            _charts.popitem(last=False)
+
+
+def clear_charts() -> None:
+    """Empty the chart cache."""
+
+    with _charts_lock:
+        _charts.clear()
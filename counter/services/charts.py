@@ -0,0 +1,30 @@
+from io import BytesIO
+
+# The object-oriented API: every chart gets its own Figure and Agg canvas,
+# so nothing touches pyplot's global (and non thread-safe) figure state.
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from . import timing
+
+BAR_COLOR = "#2D2D35FF"
+
+
+@timing.stage("chart")
+def render_frequency_chart(freq) -> bytes:
+    """Draw a list of (word, count) pairs as a PNG bar chart."""
+
+    words = [w for w, _ in freq]
+    counts = [c for _, c in freq]
+
+    figure = Figure(figsize=(8, 4))
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    axes.bar(words, counts, color=BAR_COLOR)
+    axes.set_title("Top 10 Most Common Words")
+    axes.tick_params(axis="x", labelrotation=45)
+    figure.tight_layout()
+
+    buffer = BytesIO()
+    figure.savefig(buffer, format="png")
+    return buffer.getvalue()
@@ -0,0 +1,176 @@
+import os
+import time
+
+import duckdb
+from django.conf import settings
+
+from ..models import AnalysisRecord
+from . import duckdb_pool
+from .text_profile import TextProfile
+
+# Columnar copies of the vault: one row per record, one row per (record, word).
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id BIGINT PRIMARY KEY,
+    user_id BIGINT,
+    uploaded_at TIMESTAMP,
+    word_count INTEGER,
+    ttr DOUBLE,
+    passive_count INTEGER
+);
+CREATE TABLE IF NOT EXISTS record_words (
+    record_id BIGINT,
+    user_id BIGINT,
+    word VARCHAR,
+    count INTEGER
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    synced_at DOUBLE
+);
+"""
+
+# Fields read from SQLite for each new record; the text is only needed for words.
+RECORD_FIELDS = ("id", "user_id", "uploaded_at", "word_count", "ttr", "passive_count")
+
+
+def get_corpus_db_path() -> str:
+    """Location of the analytics DuckDB file, separate from the origins vault."""
+
+    return str(settings.CORPUS_DUCKDB_PATH)
+
+
+def sync_corpus(batch_size: int = 500) -> dict:
+    """
+    Bring the DuckDB mirror up to date with AnalysisRecord: copy records it
+    doesn't have yet, with their word frequencies, and drop deleted ones.
+    Only new records have their text read, so repeat syncs are cheap.
+    """
+
+    # A short-lived write connection: DuckDB allows a single writing process,
+    # and web workers only keep the file open (read-only) around their queries.
+    with duckdb_pool.connect_writer(get_corpus_db_path()) as con:
+        con.execute(SCHEMA)
+
+        mirrored = {row[0] for row in con.execute("SELECT id FROM records").fetchall()}
+        current = set(AnalysisRecord.objects.values_list("id", flat=True))
+
+        deleted = sorted(mirrored - current)
+        if deleted:
+            con.execute("DELETE FROM record_words WHERE list_contains(?, record_id)", [deleted])
+            con.execute("DELETE FROM records WHERE list_contains(?, id)", [deleted])
+
+        added = sorted(current - mirrored)
+        for start in range(0, len(added), batch_size):
+            ids = added[start : start + batch_size]
+            records = AnalysisRecord.objects.filter(id__in=ids).only(
+                *RECORD_FIELDS, "original_text"
+            )
+            con.execute("BEGIN TRANSACTION")
+            for record in records:
+                _insert_record(con, record)
+            con.execute("COMMIT")
+
+        con.execute("DELETE FROM sync_state")
+        con.execute("INSERT INTO sync_state VALUES (?)", [time.time()])
+
+    return {"added": len(added), "deleted": len(deleted)}
+
+
+def _insert_record(con, record) -> None:
+    """Mirror one record and its content-word counts."""
+
+    con.execute(
+        "INSERT INTO records VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            record.id,
+            record.user_id,
+            record.uploaded_at.replace(tzinfo=None),
+            record.word_count,
+            record.ttr,
+            record.passive_count,
+        ],
+    )
+    counts = TextProfile(record.original_text).content_word_counts
+    if counts:
+        # Every word of the record goes in with one vectorized statement.
+        con.execute(
+            """
+            INSERT INTO record_words
+            SELECT ?, ?, unnest(?::VARCHAR[]), unnest(?::INTEGER[])
+            """,
+            [record.id, record.user_id, list(counts.keys()), list(counts.values())],
+        )
+
+
+class CorpusBusy(RuntimeError):
+    """The mirror is locked by a running sync_corpus; try again shortly."""
+
+
+def get_user_analytics(user, top_words: int = 20) -> dict | None:
+    """
+    Vault-wide numbers for one user from the DuckDB mirror:
+    top words, monthly TTR and passive voice trends, and totals.
+    Returns None until sync_corpus has run, and raises CorpusBusy while
+    a sync in another process holds the file's write lock.
+    """
+
+    db_path = get_corpus_db_path()
+    if not os.path.exists(db_path):
+        return None
+
+    pool = duckdb_pool.get_pool(db_path)
+    try:
+        [(synced_at,)] = pool.query(
+            "SELECT max(synced_at) FROM sync_state", label="corpus_synced_at"
+        )
+        [totals] = pool.query(
+            """
+            SELECT count(*), coalesce(sum(word_count), 0), avg(ttr), coalesce(sum(passive_count), 0)
+            FROM records WHERE user_id = ?
+            """,
+            [user.pk],
+            label="corpus_totals",
+        )
+        words = pool.query(
+            """
+            SELECT word, sum(count) AS total, count(*) AS documents
+            FROM record_words WHERE user_id = ?
+            GROUP BY word ORDER BY total DESC, word LIMIT ?
+            """,
+            [user.pk, top_words],
+            label="corpus_top_words",
+        )
+        months = pool.query(
+            """
+            SELECT strftime(date_trunc('month', uploaded_at), '%Y-%m') AS month,
+                   count(*), avg(ttr), sum(passive_count), sum(word_count)
+            FROM records WHERE user_id = ?
+            GROUP BY month ORDER BY month
+            """,
+            [user.pk],
+            label="corpus_months",
+        )
+    except duckdb.IOException as exc:
+        raise CorpusBusy(str(exc)) from exc
+
+    return {
+        "synced_at": synced_at,
+        "documents": totals[0],
+        "words": totals[1],
+        "average_ttr": totals[2],
+        "passive_count": totals[3],
+        "top_words": [
+            {"word": w, "count": c, "documents": d} for w, c, d in words
+        ],
+        "months": [
+            {
+                "month": m,
+                "documents": n,
+                "average_ttr": ttr,
+                "passive_count": passive,
+                # Passive sentences per 1,000 words, comparable across months.
+                "passive_per_1000": passive * 1000 / wc if wc else 0,
+            }
+            for m, n, ttr, passive, wc in months
+        ],
+    }
@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+
+import duckdb
+from django.conf import settings
+
+from . import timing
+
+# DuckDB locks its file across processes: any open read-only connection
+# keeps every writer (seed_origins, sync_corpus) out. So readers here share
+# one connection only while it is busy, plus DUCKDB_READ_IDLE_SECONDS, and
+# then let go of the file; bursts of queries still pay the connect cost once.
+
+
+class ReadPool:
+    """
+    A read-only connection to one DuckDB file, shared by the threads of this
+    process while queries keep coming. Each query gets its own cursor (DuckDB
+    connections aren't thread safe, their cursors are); the connection closes
+    once it has been idle for a moment. Keeps per-label timing metrics.
+    """
+
+    def __init__(self, db_path, idle_seconds: float):
+        self.db_path = str(db_path)
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+        self._in_use = 0
+        self._idle_timer = None
+        self.connects = 0
+        # label -> {"calls", "total_ms", "max_ms"}
+        self._timings: dict[str, dict] = {}
+
+    def _checkout(self):
+        with self._lock:
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+            # A forked worker must not reuse its parent's handle.
+            if self._connection is None or self._pid != os.getpid():
+                # Raises duckdb.IOException while a writer holds the file.
+                self._connection = duckdb.connect(self.db_path, read_only=True)
+                self._pid = os.getpid()
+                self._in_use = 0
+                self.connects += 1
+            self._in_use += 1
+            return self._connection.cursor()
+
+    def _checkin(self, cursor) -> None:
+        cursor.close()
+        with self._lock:
+            self._in_use -= 1
+            if self._in_use:
+                return
+            if self.idle_seconds <= 0:
+                self._close()
+                return
+            self._idle_timer = threading.Timer(self.idle_seconds, self._close_if_idle)
+            self._idle_timer.daemon = True
+            self._idle_timer.start()
+
+    def _close_if_idle(self) -> None:
+        with self._lock:
+            if not self._in_use:
+                self._close()
+
+    def _close(self) -> None:
+        # Only called with the lock held.
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    def close(self) -> None:
+        """Close the connection now (it reopens on the next query)."""
+
+        with self._lock:
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+            self._close()
+
+    def query(self, sql: str, params=None, label: str = "query") -> list:
+        """Run one read-only query and return all of its rows."""
+
+        cursor = self._checkout()
+        start = time.perf_counter()
+        try:
+            return cursor.execute(sql, params or []).fetchall()
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._checkin(cursor)
+            self._record(label, elapsed_ms)
+
+    def _record(self, label: str, elapsed_ms: float) -> None:
+        """Add one query's duration to the metrics and the request's timings."""
+
+        timing.record("duckdb", elapsed_ms)
+        with self._lock:
+            stats = self._timings.setdefault(
+                label, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            stats["calls"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    def metrics(self) -> dict:
+        """A snapshot of the connect count and the per-label query timings."""
+
+        with self._lock:
+            queries = {
+                label: {**stats, "avg_ms": stats["total_ms"] / stats["calls"]}
+                for label, stats in self._timings.items()
+            }
+        return {"db_path": self.db_path, "connects": self.connects, "queries": queries}
+
+
+# One pool per DuckDB file in this process.
+_pools: dict[str, ReadPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path) -> ReadPool:
+    """Returns this process's read pool for a DuckDB file."""
+
+    key = str(db_path)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ReadPool(
+                key, getattr(settings, "DUCKDB_READ_IDLE_SECONDS", 1.0)
+            )
+        return _pools[key]
+
+
+def connect_writer(db_path):
+    """
+    Open a DuckDB file for writing. This process's readers are closed first
+    (DuckDB refuses a second configuration of one file in a process); readers
+    in other processes let go within their idle time, so the lock is retried
+    for up to DUCKDB_WRITE_WAIT_SECONDS before giving up.
+    """
+
+    with _pools_lock:
+        pool = _pools.get(str(db_path))
+    if pool is not None:
+        pool.close()
+
+    deadline = time.monotonic() + getattr(settings, "DUCKDB_WRITE_WAIT_SECONDS", 5)
+    while True:
+        try:
+            return duckdb.connect(str(db_path))
+        except duckdb.IOException:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.1)
+
+
+def all_metrics() -> list[dict]:
+    """Metrics of every pool in this process."""
+
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.metrics() for pool in pools]
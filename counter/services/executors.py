@@ -0,0 +1,78 @@
+import asyncio
+import contextvars
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Process pools by worker count, shared by every request of this process.
+_process_pools: dict[int, ProcessPoolExecutor] = {}
+
+
+def get_cpu_executor() -> ThreadPoolExecutor:
+    """
+    The pool async views hand heavy work to. Under ASGI, sync code otherwise
+    runs on Django's single thread-sensitive worker, where one long analysis
+    would hold up every sync view and ORM call behind it.
+    """
+
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "ASYNC_CPU_WORKERS", 4),
+                thread_name_prefix="cpu-work",
+            )
+        return _executor
+
+
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    The long-lived process pool of a given size, for CPU work that needs
+    more than one core (PDF pages, bulk uploads, corpus runs).
+
+    Workers are started by a fork server (spawn where there is none), never
+    forked from this process: web workers run several threads, and a forked
+    child can inherit a lock another thread was holding and deadlock on it.
+    """
+
+    with _executor_lock:
+        pool = _process_pools.get(workers)
+        if pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn"
+            )
+            pool = _process_pools[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=context
+            )
+        return pool
+
+
+def _run_with_connections(func, args, kwargs):
+    """Run a job the way Django runs a request: stale DB connections closed around it."""
+
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_cpu(func, *args, **kwargs):
+    """
+    Await func(*args, **kwargs) on the CPU executor. The caller's context
+    variables (e.g. the request's stage timings) go along with it.
+    """
+
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_cpu_executor(), context.run, _run_with_connections, func, args, kwargs
+    )
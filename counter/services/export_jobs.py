@@ -0,0 +1,184 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from . import exporters, report_cache
+
+logger = logging.getLogger(__name__)
+
+# Failures of rendering or storing a document, reported through the job.
+EXPORT_ERRORS = (OSError, ValueError, DatabaseError)
+
+# format -> (generator, content type, download filename)
+EXPORT_FORMATS = {
+    "pdf": (exporters.generate_pdf_report, "application/pdf", "analysis_report.pdf"),
+    "docx": (
+        exporters.generate_docx_report,
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        "analysis_report.docx",
+    ),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """The local worker pool that renders exports outside the request."""
+
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "EXPORT_JOB_WORKERS", 2),
+                thread_name_prefix="export-job",
+            )
+        return _executor
+
+
+def _jobs_dir() -> Path:
+    """Job state and finished files live on disk, so every worker process sees them."""
+
+    path = Path(settings.EXPORT_JOBS_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _state_path(job_id: str) -> Path:
+    return _jobs_dir() / f"{job_id}.json"
+
+
+def artifact_path(job: dict) -> Path:
+    """Where the finished document of a job is written."""
+
+    return _jobs_dir() / f"{job['id']}.{job['format']}"
+
+
+def _write_state(job: dict) -> None:
+    """Atomically replace a job's state file."""
+
+    path = _state_path(job["id"])
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(job))
+    os.replace(tmp_path, path)
+
+
+def _read_state(job_id: str):
+    try:
+        return json.loads(_state_path(job_id).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _run_job(job: dict, data: dict, record=None) -> None:
+    """Render the document in a pool thread and record the outcome."""
+
+    generate = EXPORT_FORMATS[job["format"]][0]
+    _write_state({**job, "status": "running"})
+    try:
+        if record is not None:
+            # Vault records are rendered once and then served from the report cache.
+            cached = report_cache.get_or_render_report(
+                record, job["format"], lambda: generate(data)
+            )
+            content = cached.read_bytes()
+        else:
+            content = generate(data)
+        tmp_path = artifact_path(job).with_suffix(".part")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, artifact_path(job))
+    except EXPORT_ERRORS as exc:
+        _write_state({**job, "status": "failed", "error": str(exc), "finished_at": time.time()})
+    except Exception:
+        # A bug: end the job so the page stops polling, but don't hide it.
+        logger.exception("Export job %s crashed", job["id"])
+        _write_state({**job, "status": "failed", "error": "Internal error", "finished_at": time.time()})
+        raise
+    else:
+        _write_state({**job, "status": "done", "finished_at": time.time()})
+
+
+def submit_export(user, export_format: str, data: dict, record=None) -> dict:
+    """
+    Queue an export and return its job record straight away.
+    Pass the vault record being exported to reuse its cached report.
+    """
+
+    _, content_type, filename = EXPORT_FORMATS[export_format]
+    job = {
+        "id": uuid.uuid4().hex,
+        "user_id": user.pk,
+        "format": export_format,
+        "status": "queued",
+        "error": "",
+        "content_type": content_type,
+        "filename": filename,
+        "created_at": time.time(),
+        "finished_at": None,
+    }
+    _write_state(job)
+    purge_expired_jobs()
+    _get_executor().submit(_run_job, job, data, record)
+    return job
+
+
+def get_job(job_id: str, user):
+    """Returns a job owned by the user, or None."""
+
+    # Job ids are uuid4 hex strings; anything else could escape the jobs dir.
+    try:
+        job_id = uuid.UUID(hex=job_id).hex
+    except ValueError:
+        return None
+
+    job = _read_state(job_id)
+    if job is None or job["user_id"] != user.pk:
+        return None
+
+    # A job whose worker died (e.g. in a restart) would otherwise stay
+    # queued or running until it is purged, with the page waiting on it.
+    timeout = getattr(settings, "EXPORT_JOB_TIMEOUT", 10 * 60)
+    if job["status"] in ("queued", "running") and time.time() - job["created_at"] > timeout:
+        job = {**job, "status": "failed", "error": "Export timed out", "finished_at": time.time()}
+        _write_state(job)
+    return job
+
+
+async def await_job(job_id: str, user, timeout: float = 0, poll_interval: float = 0.2):
+    """
+    Returns the job once it has finished, or its current state after timeout
+    seconds. Only for async views: waiting sleeps on the event loop, whereas
+    a sync view would hold its worker for the whole export.
+    """
+
+    deadline = time.monotonic() + timeout
+    while True:
+        job = get_job(job_id, user)
+        if job is None or job["status"] in ("done", "failed"):
+            return job
+        if time.monotonic() >= deadline:
+            return job
+        await asyncio.sleep(poll_interval)
+
+
+def purge_expired_jobs() -> None:
+    """Delete job files older than EXPORT_JOB_TTL seconds."""
+
+    cutoff = time.time() - getattr(settings, "EXPORT_JOB_TTL", 60 * 60)
+    for path in _jobs_dir().iterdir():
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            # Another worker purged it first.
+            continue
@@ -1,23 +1,21 @@
-import matplotlib
-
-matplotlib.use("Agg")  # Forces matplotlib to use no GUI or Tkinter.
 import base64
 from io import BytesIO
 
-import matplotlib.pyplot as plt
 from django.template.loader import render_to_string
 from docx import Document
 from docx.shared import Inches
 from weasyprint import HTML
 
-from . import word_selectors
+from . import timing, word_selectors
 from .analysis import get_word_frequencies
+from .charts import render_frequency_chart
 
 
 def get_export_data(user, pk=None, session=None):
     """
     Unified helper to gather data for either PDF or Word.
-    It checks the Vault (PK) first, then falls back to the Session.
+    It checks the Vault (PK) first, then the record of the current
+    analysis, whose id is kept in the session.
     """
 
     # Prevents 'NoneType' errors if the function is called without a session
@@ -27,33 +25,55 @@ def get_export_data(user, pk=None, session=None):
         session = {}
 
     if pk:
-        record = word_selectors.get_record_for_user(user, pk)
-        return {
-            "text": record.original_text,
-            "summary": record.summary,
-            "topics": record.topics,
-            "word_count": record.word_count,
-            "bullets": record.bullets,
-            "longest_sentence": record.longest_sentence,
-            "ttr": record.ttr,
-            "overused": record.overused,
-            "passive_count": record.passive_count,
-        }
-
-    # Fallback to session data
+        return get_record_export_data(word_selectors.get_record_for_user(user, pk))
+
+    record = word_selectors.get_session_record(user, session)
+    if record is not None:
+        return get_record_export_data(record)
+
+    # Nothing analyzed yet: an empty report.
     return {
-        "text": session.get("analysis_text"),
-        "summary": session.get("summary"),
-        "bullets": session.get("bullets"),
-        "topics": session.get("topics"),
-        "word_count": session.get("word_count"),
-        "longest_sentence": session.get("longest_sentence"),
-        "ttr": session.get("ttr"),
-        "overused": session.get("overused"),
-        "passive_count": session.get("passive_count"),
+        "text": None,
+        "summary": None,
+        "bullets": None,
+        "topics": None,
+        "word_count": None,
+        "longest_sentence": None,
+        "ttr": None,
+        "overused": None,
+        "passive_count": None,
+        "top_words": None,
     }
 
 
+def get_record_export_data(record):
+    """The export data of a single vault record."""
+
+    return {
+        "text": record.original_text,
+        "summary": record.summary,
+        "topics": record.topics,
+        "word_count": record.word_count,
+        "bullets": record.bullets,
+        "longest_sentence": record.longest_sentence,
+        "ttr": record.ttr,
+        "overused": record.overused,
+        "passive_count": record.passive_count,
+        # Streamed uploads only store a preview of their text; their stored
+        # metrics still hold the top words of the whole file.
+        "top_words": record.metrics.get("top_words"),
+    }
+
+
+def get_chart_words(data):
+    """The (word, count) pairs to chart: stored ones, else counted from the text."""
+
+    if data.get("top_words"):
+        return data["top_words"]
+    return get_word_frequencies(data.get("text") or "")
+
+
+@timing.stage("export_pdf")
 def generate_pdf_report(context):
     """Handles the logic of turning a data dictionary into a PDF binary."""
 
@@ -61,21 +81,8 @@ def generate_pdf_report(context):
     text = context.get("text", "")
 
     if text:
-        freq = get_word_frequencies(text)
-        words = [w for w, _ in freq]
-        counts = [c for _, c in freq]
-
-        plt.figure(figsize=(8, 4))
-        plt.bar(words, counts, color="#2d2d35ff")
-        plt.title("Top 10 Most Common Words")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-
-        buffer = BytesIO()
-        plt.savefig(buffer, format="png")
-        plt.close()
-
-        image_base64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
+        chart_png = render_frequency_chart(get_chart_words(context))
+        image_base64 = base64.b64encode(chart_png).decode("utf-8")
         context["chart_data"] = f"data:image/png;base64,{image_base64}"
 
     # Render the HTML to PDF.
@@ -84,26 +91,13 @@ def generate_pdf_report(context):
     return html.write_pdf()
 
 
-def generate_word_frequency_chart_image(text):
+def generate_word_frequency_chart_image(data):
     """Internal helper for Word doc chart generation."""
 
-    freq = get_word_frequencies(text)
-    words = [w for w, _ in freq]
-    counts = [c for _, c in freq]
-
-    plt.figure(figsize=(8, 4))
-    plt.bar(words, counts, color="#2D2D35FF")
-    plt.title("Top 10 Most Common Words")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-
-    buffer = BytesIO()
-    plt.savefig(buffer, format="png")
-    plt.close()
-    buffer.seek(0)
-    return buffer
+    return BytesIO(render_frequency_chart(get_chart_words(data)))
 
 
+@timing.stage("export_docx")
 def generate_docx_report(data):
     """Constructs the full Word document from a data dictionary."""
 
@@ -124,7 +118,7 @@ def generate_docx_report(data):
 
     # Chart
     doc.add_heading("Word Frequency Chart", level=2)
-    chart_image = generate_word_frequency_chart_image(data.get("text", ""))
+    chart_image = generate_word_frequency_chart_image(data)
     doc.add_picture(chart_image, width=Inches(6))
     doc.paragraphs[-1].alignment = 1  # type:ignore
 
@@ -0,0 +1,86 @@
+import os
+import threading
+
+from django.conf import settings
+
+from . import duckdb_pool, timing
+
+# The origins table is tiny and static, so each worker keeps it in memory.
+# word -> list of pin dictionaries (a few words have more than one origin).
+_index: dict[str, list[dict]] = {}
+_index_mtime: float | None = None
+_index_lock = threading.Lock()
+
+
+def get_origins_db_path() -> str:
+    """Location of the DuckDB file seeded by seed_origins.seed_vault."""
+
+    return os.path.join(settings.BASE_DIR, "word_vault_analytics.duckdb")
+
+
+def load_origins_index(db_path: str) -> dict[str, list[dict]]:
+    """Read the whole origins table once and index it by word."""
+
+    results = duckdb_pool.get_pool(db_path).query(
+        """
+        SELECT word, root, country, lat, lng, fact
+        FROM origins
+    """,
+        label="origins",
+    )
+
+    index: dict[str, list[dict]] = {}
+    for r in results:
+        # Turn the raw tuples into a clean dict for our JS map.
+        index.setdefault(r[0], []).append(
+            {
+                "word": r[0],
+                "root": r[1],
+                "country": r[2],
+                "lat": r[3],
+                "lng": r[4],
+                "fact": r[5],
+            }
+        )
+    return index
+
+
+def get_origins_index() -> dict[str, list[dict]]:
+    """
+    Returns the in-memory origins index, loading it on first use and
+    reloading it whenever the .duckdb file is re-seeded.
+    """
+
+    global _index, _index_mtime
+
+    db_path = get_origins_db_path()
+    mtime = os.path.getmtime(db_path)
+    if mtime != _index_mtime:
+        with _index_lock:
+            # Another thread may have reloaded while we waited for the lock.
+            if mtime != _index_mtime:
+                _index = load_origins_index(db_path)
+                _index_mtime = mtime
+    return _index
+
+
+def reset_origins_index() -> None:
+    """Forget the loaded index so the next lookup reads DuckDB again."""
+
+    global _index, _index_mtime
+
+    with _index_lock:
+        _index = {}
+        _index_mtime = None
+
+
+@timing.stage("vault_lookup")
+def get_value_matches(word_list):
+    """Returns a list of dictionaries
+    for words that exist in our "origins" table"""
+
+    index = get_origins_index()
+
+    # A set intersection finds every known word without touching DuckDB.
+    matches = index.keys() & set(word_list)
+    return [pin for word in sorted(matches) for pin in index[word]]
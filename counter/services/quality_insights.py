@@ -1,27 +1,26 @@
-import re
-from collections import Counter
-
 from .analysis import STOP_WORDS
+from .text_profile import get_profile
 
 
-def get_basic_metrics(text: str) -> dict:
-    """Calculates core counters and reading time."""
+def get_basic_metrics(text) -> dict:
+    """
+    Calculates core counters and reading time.
+    Accepts raw text or a shared TextProfile.
+    """
 
-    # Ensure new lines don't blesd titles into sentences
-    clean_text = text.replace("\n", ", ")
+    profile = get_profile(text)
+    text = profile.text
 
-    # Split the string by whitespace into a list and count the items (words)
-    word_count = len(text.split())
+    # Count the whitespace separated items (words)
+    word_count = len(profile.whitespace_tokens)
     # Count every individual character in the string, including spaces and punctuation
     char_count = len(text)
 
     # Sentence detection logic.
-    sentence_count = (
-        clean_text.count(".") + clean_text.count("!") + clean_text.count("?")
-    )
+    sentence_count = text.count(".") + text.count("!") + text.count("?")
 
     # Paragraph detection
-    paragraph_count = len([p for p in text.split("\n") if p.strip()])
+    paragraph_count = len(profile.paragraphs)
 
     # Reading time (Standard 200 wpm)
     reading_time = max(1, round(word_count / 200))
@@ -35,35 +34,37 @@ def get_basic_metrics(text: str) -> dict:
     }
 
 
-def analyze_quality(text: str) -> dict:
-    """Evaluate the input text and return metrics as a dictionary."""
+def analyze_quality(text) -> dict:
+    """
+    Evaluate the input text and return metrics as a dictionary.
+    Accepts raw text or a shared TextProfile.
+    """
+
+    profile = get_profile(text)
 
     # Split into sequences.
-    sentences = re.split(r"(?<=[.!?])\s+", text)
-    sentences = [s.strip() for s in sentences if s.strip()]
+    sentences = profile.sentences
 
     # Longest sentence
     longest_sentence = max(sentences, key=len) if sentences else ""
 
     # Words
-    words = re.findall(r"\b\w+\b", text.lower())
+    words = profile.words
     total_words = len(words)
-    unique_words = len(set(words))
+    unique_words = len(profile.unique_words)
     ttr = round(unique_words / total_words, 3) if total_words else 0
 
-    # Overused words (Using the import STOP_WORDS)
-    filtered = [w for w in words if w not in STOP_WORDS]
+    # Overused words (Using the import STOP_WORDS), most frequent first.
+    filtered = (
+        item for item in profile.word_counts.most_common()
+        if item[0] not in STOP_WORDS
+    )
 
     # Only want words used more than 3 times to count as overused words
-    overused = [
-        item for item in Counter(filtered).most_common(5) if item[1] > 3
-    ]
+    overused = [item for _, item in zip(range(5), filtered) if item[1] > 3]
 
     # Passive voice/count detection
-    passive_matches = re.findall(
-        r"\b(be|is|was|were|been|being)\s+\w+(ed|en)\b", text.lower()
-    )
-    passive_count = len(passive_matches)
+    passive_count = profile.passive_count
 
     return {
         "longest_sentence": longest_sentence,
@@ -0,0 +1,117 @@
+import os
+import time
+import uuid
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+
+# Bump this when the PDF template or the DOCX layout changes,
+# so reports rendered with the old layout are no longer served.
+REPORT_VERSION = 2
+
+# Half-written reports (*.part) younger than this belong to a render in
+# progress; older ones were left behind by a crashed worker.
+PART_GRACE_SECONDS = 10 * 60
+
+
+def _cache_dir() -> Path:
+    path = Path(settings.REPORT_CACHE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def report_path(record, export_format: str) -> Path:
+    """A record's report file: keyed by id, content hash and layout version."""
+
+    name = f"{record.pk}-{record.content_hash[:16]}-v{REPORT_VERSION}.{export_format}"
+    return _cache_dir() / name
+
+
+def get_cached_report(record, export_format: str):
+    """Return the path of an already rendered report, or None."""
+
+    path = report_path(record, export_format)
+    try:
+        # Touch it, so eviction treats it as recently used.
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def store_report(record, export_format: str, content: bytes) -> Path:
+    """Write a rendered report to the cache, then keep the cache within budget."""
+
+    path = report_path(record, export_format)
+    # Write under a unique name first, so readers never see half a file.
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.part")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+    evict_reports(keep=path)
+    return path
+
+
+def get_or_render_report(record, export_format: str, render) -> Path:
+    """Serve a record's report from the cache, calling render() only on a miss."""
+
+    path = get_cached_report(record, export_format)
+    if path is None:
+        path = store_report(record, export_format, render())
+    return path
+
+
+def open_report(record, export_format: str, render):
+    """
+    Open a record's report for reading, rendering it on a miss. If eviction
+    removes the file between the lookup and the open, it is rendered again
+    and served from memory.
+    """
+
+    path = get_or_render_report(record, export_format, render)
+    try:
+        return open(path, "rb")
+    except FileNotFoundError:
+        content = render()
+        store_report(record, export_format, content)
+        return BytesIO(content)
+
+
+def evict_reports(keep=None) -> None:
+    """
+    Delete the least recently used reports until REPORT_CACHE_MAX_BYTES is
+    met. Reports still being written are left alone.
+    """
+
+    max_bytes = getattr(settings, "REPORT_CACHE_MAX_BYTES", 200 * 1024 * 1024)
+
+    stale_part = time.time() - PART_GRACE_SECONDS
+
+    entries = []
+    for path in _cache_dir().iterdir():
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if path.suffix == ".part":
+            # Deleting a part file would make its writer's os.replace fail.
+            if stat.st_mtime < stale_part:
+                path.unlink(missing_ok=True)
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def invalidate_record(pk) -> None:
+    """Remove every cached report of a record (all formats and versions)."""
+
+    for path in _cache_dir().glob(f"{pk}-*"):
+        path.unlink(missing_ok=True)
@@ -0,0 +1,144 @@
+import re
+
+from django.db import connection
+from django.utils.html import escape
+
+from . import timing
+
+# An FTS5 virtual table whose rowid is the AnalysisRecord id. It is
+# contentless (migration 0010): it holds the index only, since the texts
+# themselves are stored compressed in the records.
+FTS_TABLE = "counter_analysisrecord_fts"
+
+# Private-use markers, swapped for <mark> tags once the snippet is escaped.
+_MARK_START = "\ue000"
+_MARK_END = "\ue001"
+
+# Words in a snippet, as FTS5's snippet() would count them.
+SNIPPET_WORDS = 16
+
+
+def is_available() -> bool:
+    """Full-text search needs SQLite's FTS5 (created by migration 0004)."""
+
+    return connection.vendor == "sqlite"
+
+
+def _unindex(cursor, pk, title: str, text: str) -> None:
+    # A contentless table can only forget a row given the exact values it
+    # was indexed with; FTS5 works out which words to take out from them.
+    cursor.execute(
+        f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, body) "
+        "VALUES ('delete', %s, %s, %s)",
+        [pk, title, text],
+    )
+
+
+@timing.stage("search_index")
+def index_record(record, previous=None) -> None:
+    """
+    Add a record to the full-text index. A record that was indexed before
+    is refreshed: `previous` is the (title, text) it was indexed with.
+    """
+
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        if previous is not None:
+            _unindex(cursor, record.pk, *previous)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, body) VALUES (%s, %s, %s)",
+            [record.pk, record.title, record.original_text],
+        )
+
+
+def remove_record(record) -> None:
+    """Drop a record from the full-text index, while it still has its text."""
+
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        _unindex(cursor, record.pk, record.title, record.original_text)
+
+
+def build_match_query(search_query: str):
+    """
+    Turn what the user typed into an FTS5 query: every word must appear,
+    and the last one may be a prefix. Returns None if there are no words.
+    """
+
+    words = re.findall(r"\w+", search_query)
+    if not words:
+        return None
+    # Quoting each word keeps FTS5 operators (AND, NEAR, *, ...) literal.
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search(user, search_query: str, limit: int = 50) -> list[int]:
+    """
+    Ids of the user's records matching the query, best match first.
+    Titles weigh more than body text.
+    """
+
+    match = build_match_query(search_query)
+    if match is None:
+        return []
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT {FTS_TABLE}.rowid
+            FROM {FTS_TABLE}
+            JOIN counter_analysisrecord AS record ON record.id = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH %s AND record.user_id = %s
+            ORDER BY bm25({FTS_TABLE}, 10.0, 1.0)
+            LIMIT %s
+            """,
+            [match, user.pk, limit],
+        )
+        return [pk for (pk,) in cursor.fetchall()]
+
+
+def make_snippet(text: str, search_query: str) -> str:
+    """
+    An HTML snippet of the text around the first word matching the query,
+    with the matching words highlighted, like FTS5's snippet() would give.
+    """
+
+    words = re.findall(r"\w+", search_query)
+    if not words:
+        return ""
+    # Same rules as build_match_query: whole words, the last one as a prefix.
+    terms = [re.escape(w) for w in words]
+    terms[-1] += r"\w*"
+    matcher = re.compile(rf"(?:{'|'.join(terms)})", re.IGNORECASE)
+
+    tokens = list(re.finditer(r"\w+", text))
+    if not tokens:
+        return ""
+    first = next((i for i, t in enumerate(tokens) if matcher.fullmatch(t.group())), 0)
+    start = max(0, min(first - SNIPPET_WORDS // 4, len(tokens) - SNIPPET_WORDS))
+    window = tokens[start : start + SNIPPET_WORDS]
+
+    pieces = ["..." if start > 0 else ""]
+    position = window[0].start()
+    for token in window:
+        pieces.append(text[position : token.start()])
+        word = token.group()
+        pieces.append(f"{_MARK_START}{word}{_MARK_END}" if matcher.fullmatch(word) else word)
+        position = token.end()
+    if start + len(window) < len(tokens):
+        pieces.append("...")
+    return _highlight("".join(pieces))
+
+
+def _highlight(snippet: str) -> str:
+    """Escape a snippet for HTML, then turn the match markers into <mark> tags."""
+
+    return (
+        escape(snippet)
+        .replace(_MARK_START, "<mark>")
+        .replace(_MARK_END, "</mark>")
+    )
@@ -4,9 +4,10 @@ import json
 import os
 
 import django
-import duckdb
 from django.conf import settings
 
+from counter.services import duckdb_pool
+
 # This tells the script which settings file to use.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'wordcounterapp.settings')
 django.setup()
@@ -28,8 +29,8 @@ def seed_vault():
     with open(json_path, 'r') as f:
         data = json.load(f)
     
-    # Connect to DuckDB.
-    con = duckdb.connect(db_path)
+    # Connect to DuckDB, once web workers have let go of the file.
+    con = duckdb_pool.connect_writer(db_path)
 
     # Create the table.
     con.execute("""
@@ -0,0 +1,90 @@
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+# A MinHash signature is NUM_PERMUTATIONS 32-bit minimums (256 bytes), cut
+# into BANDS bands of ROWS_PER_BAND values for locality-sensitive hashing.
+# Two texts share a band bucket with probability 1 - (1 - J^4)^16 for Jaccard
+# similarity J: about 0.05 at J=0.3, 0.65 at J=0.6 and 0.99 at J=0.8.
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+
+# Words per shingle; revised drafts keep most of their 3-word runs.
+SHINGLE_SIZE = 3
+
+# Estimated similarity a candidate needs to be shown as "similar".
+SIMILARITY_THRESHOLD = 0.5
+
+SHINGLE_WORD_RE = re.compile(r"\w+")
+
+# Shingles hashed per vectorized block: 4096 x 64 uint64 values is 2 MB.
+SIGNATURE_BLOCK = 4096
+
+# Fixed seeds: signatures are stored, so the permutations must never change.
+_rng = np.random.default_rng(20260418)
+_MULTIPLIERS = _rng.integers(1, 2**63, NUM_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_OFFSETS = _rng.integers(0, 2**63, NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def shingle_hashes(text: str) -> np.ndarray:
+    """crc32 of every distinct word 3-gram in the text (lowercased)."""
+
+    words = SHINGLE_WORD_RE.findall(text.lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    if len(words) < SHINGLE_SIZE:
+        shingles = [" ".join(words)]
+    else:
+        # A generator, so only the hashes are ever held, never every shingle string.
+        shingles = (
+            " ".join(words[i : i + SHINGLE_SIZE])
+            for i in range(len(words) - SHINGLE_SIZE + 1)
+        )
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64
+    )
+    return np.unique(hashes)
+
+
+def compute_signature(text: str):
+    """The MinHash signature of a text as bytes, or None if it has no words."""
+
+    hashes = shingle_hashes(text)
+    if not hashes.size:
+        return None
+
+    # Multiply-shift hashing: (a * x + b) mod 2^64, keeping the top 32 bits.
+    # Shingles go through in blocks, each a vectorized pass over every
+    # permutation, so memory stays flat however long the text is.
+    signature = np.full(NUM_PERMUTATIONS, np.iinfo(np.uint64).max, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for start in range(0, hashes.size, SIGNATURE_BLOCK):
+            block = hashes[start : start + SIGNATURE_BLOCK, None]
+            permuted = (block * _MULTIPLIERS[None, :] + _OFFSETS[None, :]) >> np.uint64(32)
+            np.minimum(signature, permuted.min(axis=0), out=signature)
+    return signature.astype("<u4").tobytes()
+
+
+def _as_array(signature) -> np.ndarray:
+    return np.frombuffer(bytes(signature), dtype="<u4")
+
+
+def estimate_similarity(first, second) -> float:
+    """Estimated Jaccard similarity of two texts from their signatures."""
+
+    return float(np.mean(_as_array(first) == _as_array(second)))
+
+
+def band_buckets(signature) -> list[tuple[int, int]]:
+    """(band, bucket) pairs of a signature; equal bands land in equal buckets."""
+
+    values = _as_array(signature)
+    buckets = []
+    for band in range(BANDS):
+        rows = values[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND].tobytes()
+        digest = hashlib.blake2b(rows, digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, "big", signed=True)))
+    return buckets
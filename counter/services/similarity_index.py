@@ -0,0 +1,54 @@
+from django.db.models import Q
+
+from ..models import AnalysisRecord, SimilarityBucket
+from . import timing
+from .similarity import SIMILARITY_THRESHOLD, band_buckets, estimate_similarity
+
+
+@timing.stage("similarity_index")
+def index_record(record) -> None:
+    """(Re)write a record's LSH buckets from its MinHash signature."""
+
+    SimilarityBucket.objects.filter(record=record).delete()
+    if record.minhash is None:
+        return
+    SimilarityBucket.objects.bulk_create(
+        [
+            SimilarityBucket(record=record, band=band, bucket=bucket)
+            for band, bucket in band_buckets(record.minhash)
+        ]
+    )
+
+
+@timing.stage("similar_records")
+def find_similar_records(record, limit: int = 5, threshold: float = SIMILARITY_THRESHOLD):
+    """
+    The user's records most like this one, as (record, similarity) pairs.
+    Only records sharing an LSH bucket are compared, never the whole vault.
+    """
+
+    if record.minhash is None:
+        return []
+
+    # Any shared band makes a candidate: one indexed lookup per band, in one query.
+    shared_band = Q()
+    for band, bucket in band_buckets(record.minhash):
+        shared_band |= Q(band=band, bucket=bucket)
+    candidate_ids = set(
+        SimilarityBucket.objects.filter(shared_band, record__user_id=record.user_id)
+        .exclude(record_id=record.pk)
+        .values_list("record_id", flat=True)
+    )
+    if not candidate_ids:
+        return []
+
+    candidates = AnalysisRecord.objects.filter(pk__in=candidate_ids).only(
+        "id", "title", "preview", "uploaded_at", "word_count", "minhash"
+    )
+    scored = [
+        (candidate, estimate_similarity(record.minhash, candidate.minhash))
+        for candidate in candidates
+    ]
+    scored = [pair for pair in scored if pair[1] >= threshold]
+    scored.sort(key=lambda pair: (-pair[1], -pair[0].pk))
+    return scored[:limit]
@@ -0,0 +1,197 @@
+import hashlib
+import re
+from collections import Counter
+
+from django.conf import settings
+
+from . import timing
+from .analysis import STOP_WORDS
+from .analysis_cache import cache_analysis
+from .origins import get_value_matches
+from .text_extractors import iter_text_chunks
+from .text_profile import ALPHA_WORD_RE, PASSIVE_RE, SENTENCE_SPLIT_RE, WORD_RE
+
+# Sentence boundaries: punctuation followed by spaces, as in SENTENCE_SPLIT_RE.
+SENTENCE_END_RE = re.compile(r"[.!?]\s+")
+
+
+class StreamingAnalyzer:
+    """
+    Computes the same metrics as analysis_cache.analyze_text over a text
+    that arrives in chunks, without ever holding the whole text.
+
+    Chunks are buffered only up to the end of the last complete sentence;
+    everything before it is counted and thrown away. Memory is bounded by
+    the vocabulary (the word counters) plus one carried-over sentence.
+    """
+
+    def __init__(self, max_carry: int | None = None):
+        # A "sentence" longer than this is cut at a space (or anywhere, if it
+        # has none) to bound memory.
+        self.max_carry = max_carry or getattr(
+            settings, "STREAMING_MAX_CARRY_CHARS", 1024 * 1024
+        )
+        self.preview_chars = getattr(settings, "STREAMING_TEXT_PREVIEW_CHARS", 100_000)
+
+        self._buffer = ""
+        self._hash = hashlib.sha256()
+        self.preview = ""
+
+        self.char_count = 0
+        self.sentence_count = 0
+        self.paragraph_count = 0
+        self._line_has_text = False
+        self.word_count = 0
+
+        self.total_words = 0
+        self.word_counts = Counter()
+        self.content_word_counts = Counter()
+        self.passive_count = 0
+        self.first_sentences: list[str] = []
+        self.longest_sentence = ""
+
+    def feed(self, chunk: str) -> None:
+        """Add the next piece of text."""
+
+        self._hash.update(chunk.encode("utf-8", errors="ignore"))
+        if len(self.preview) < self.preview_chars:
+            self.preview += chunk[: self.preview_chars - len(self.preview)]
+
+        # Character level counters work on the raw chunk directly.
+        self.char_count += len(chunk)
+        self.sentence_count += chunk.count(".") + chunk.count("!") + chunk.count("?")
+        self._count_paragraphs(chunk)
+
+        # The carried-over buffer holds no complete boundary, except maybe
+        # punctuation as its last character, so only the new text is searched.
+        search_from = max(0, len(self._buffer) - 1)
+        self._buffer += chunk
+
+        cut = None
+        for match in SENTENCE_END_RE.finditer(self._buffer, search_from):
+            cut = match.end()
+        if cut is None and len(self._buffer) > self.max_carry:
+            cut = max(self._buffer.rfind(c) for c in " \t\r\n") + 1
+            if not cut:
+                # Not even a space (e.g. a minified blob): cut hard, in whole
+                # multiples of max_carry, so the carry never exceeds it.
+                cut = len(self._buffer) // self.max_carry * self.max_carry
+        if cut:
+            self._process(self._buffer[:cut])
+            self._buffer = self._buffer[cut:]
+
+    def _count_paragraphs(self, chunk: str) -> None:
+        """Count non-empty lines, even when a line spans two chunks."""
+
+        lines = chunk.split("\n")
+        for i, line in enumerate(lines):
+            if line.strip():
+                self._line_has_text = True
+            # Every piece but the last ends with a newline.
+            if i < len(lines) - 1:
+                self.paragraph_count += self._line_has_text
+                self._line_has_text = False
+
+    def _process(self, block: str) -> None:
+        """Count the words and sentences of a block that ends on a boundary."""
+
+        self.word_count += len(block.split())
+
+        lowered = block.lower()
+        words = WORD_RE.findall(lowered)
+        self.total_words += len(words)
+        self.word_counts.update(words)
+        self.content_word_counts.update(
+            w for w in ALPHA_WORD_RE.findall(lowered) if w not in STOP_WORDS
+        )
+        self.passive_count += sum(1 for _ in PASSIVE_RE.finditer(lowered))
+
+        for sentence in SENTENCE_SPLIT_RE.split(block):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            if len(self.first_sentences) < 4:
+                self.first_sentences.append(sentence)
+            if len(sentence) > len(self.longest_sentence):
+                self.longest_sentence = sentence
+
+    @property
+    def digest(self) -> str:
+        """SHA-256 of everything fed so far, same as text_digest(full_text)."""
+
+        return self._hash.hexdigest()
+
+    def finish(self) -> dict:
+        """Flush the last partial sentence and return the analysis dictionary."""
+
+        if self._buffer:
+            self._process(self._buffer)
+            self._buffer = ""
+        if self._line_has_text:
+            self.paragraph_count += 1
+            self._line_has_text = False
+
+        ttr = round(len(self.word_counts) / self.total_words, 3) if self.total_words else 0
+        overused = [
+            item
+            for _, item in zip(
+                range(5),
+                (i for i in self.word_counts.most_common() if i[0] not in STOP_WORDS),
+            )
+            if item[1] > 3
+        ]
+        topics = [
+            w
+            for _, w in zip(
+                range(5),
+                (w for w, _ in self.content_word_counts.most_common() if len(w) > 2),
+            )
+        ]
+
+        return {
+            "word_count": self.word_count,
+            "char_count": self.char_count,
+            "sentence_count": self.sentence_count,
+            "paragraph_count": self.paragraph_count,
+            "reading_time": max(1, round(self.word_count / 200)),
+            "summary": " ".join(self.first_sentences[:2]),
+            "bullets": self.first_sentences[:4],
+            "topics": topics if self.first_sentences else [],
+            "longest_sentence": self.longest_sentence,
+            "ttr": ttr,
+            "overused": overused,
+            "passive_count": self.passive_count,
+            "vault_pins": get_value_matches(self.word_counts.keys()),
+            "top_words": self.content_word_counts.most_common(10),
+        }
+
+
+def analyze_chunks(chunks):
+    """
+    Analyze an iterable of text chunks with bounded memory.
+    Returns (results, digest, preview) where preview is the start of the text.
+    """
+
+    analyzer = StreamingAnalyzer()
+    for chunk in chunks:
+        analyzer.feed(chunk)
+    return analyzer.finish(), analyzer.digest, analyzer.preview
+
+
+@timing.stage("streaming_analysis")
+def analyze_upload(uploaded_file):
+    """
+    Stream an uploaded file through the analyzer and cache the results
+    under the digest of its full text.
+    Returns (preview, digest, results), or (None, None, None) for
+    unsupported files. Save the results with the record: they cover the
+    whole file, the preview does not.
+    """
+
+    chunks = iter_text_chunks(uploaded_file)
+    if chunks is None:
+        return None, None, None
+
+    results, digest, preview = analyze_chunks(chunks)
+    cache_analysis(digest, results)
+    return preview, digest, results
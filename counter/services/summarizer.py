@@ -1,15 +1,16 @@
-import re
-from collections import Counter
+from .text_profile import get_profile
 
-from .analysis import STOP_WORDS
 
+def generate_summary(text) -> dict:
+    """
+    Produce a concise summary of the input text as a dictionary.
+    Accepts raw text or a shared TextProfile.
+    """
 
-def generate_summary(text: str) -> dict:
-    """Produce a concise summary of the input text as a dictionary."""
+    profile = get_profile(text)
 
-    # This splits on . ! or ? ONLY if followed by a space.
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    sentences = [s.strip() for s in sentences if s.strip()]
+    # Sentences are split on . ! or ? ONLY if followed by a space.
+    sentences = profile.sentences
 
     if not sentences:
         return {
@@ -17,25 +18,20 @@ def generate_summary(text: str) -> dict:
             "bullets": [],
             "topics": []
         }
-    
+
     # Short summary. first 2 sentences.
     summary = " ".join(sentences[:2])
 
     # Bullet points = first 4 sentences
     bullets = sentences[:4]
 
-    # Topics = Most common words.
-    words = re.findall(r"\b[a-zA-Z']+\b", text.lower())
-    
-    # Filter using the master STOP_WORDS list.
-    filtered = [w for w in words if w not in STOP_WORDS and len(w) > 2]
-
-    # Count frequencies.
-    common = Counter(filtered).most_common(5)
-    topics = [w for w, _ in common]
+    # Topics = Most common words, already filtered by the STOP_WORDS list.
+    # Skip very short words, keeping the same frequency order.
+    common = (w for w, _ in profile.content_word_counts.most_common() if len(w) > 2)
+    topics = [w for _, w in zip(range(5), common)]
 
     return {
         "summary": summary,
         "bullets": bullets,
         "topics": topics
-    }
\ No newline at end of file
+    }
@@ -1,5 +1,30 @@
+import codecs
+import logging
+import os
+import tempfile
+import time
+import zipfile
+from io import BytesIO
+from xml.etree import ElementTree
+
+from django.conf import settings
 from docx import Document
 from PyPDF2 import PdfReader
+from PyPDF2.errors import PyPdfError
+
+from . import timing
+from .executors import get_process_pool
+
+logger = logging.getLogger(__name__)
+
+# What extracting a damaged or unexpected file can raise: unreadable or
+# undecodable data, a bad zip or XML part (DOCX, or a missing one), a bad PDF.
+EXTRACTION_ERRORS = (
+    OSError, ValueError, KeyError, zipfile.BadZipFile, ElementTree.ParseError, PyPdfError,
+)
+
+# The WordprocessingML namespace, as ElementTree spells it in tag names.
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
 
 
 def extract_text_from_txt(file) -> str:
@@ -8,24 +33,183 @@ def extract_text_from_txt(file) -> str:
     # Read the raw file bytes, then convert them into a readable string.
     return file.read().decode("utf-8", errors="ignore")
 
+def iter_txt_chunks(file, chunk_size: int = 1024 * 1024):
+    """Decode a txt file piece by piece instead of reading it all at once."""
+
+    # An incremental decoder keeps multi-byte characters split across chunks intact.
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    if hasattr(file, "chunks"):
+        pieces = file.chunks(chunk_size)
+    else:
+        pieces = iter(lambda: file.read(chunk_size), b"")
+    for piece in pieces:
+        text = decoder.decode(piece)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
 def extract_text_from_pdf(file) -> str:
     """Read a PDF object and return its extracted text."""
-    
+
+    # Save the page to the [] list if the page contains text.
+    text = [page["text"] for page in iter_pdf_pages(file) if page["text"]]
+    return "\n".join(text)
+
+def iter_pdf_pages(file, max_pages=None, workers=None):
+    """
+    Yield the text of a PDF one page at a time, in page order, as
+    {"page": number, "text": str, "seconds": extraction time}.
+
+    Large documents are split across a process pool so extraction scales
+    with cores instead of page count. max_pages and workers default to the
+    PDF_MAX_PAGES and PDF_EXTRACT_WORKERS settings.
+    """
+
+    if max_pages is None:
+        max_pages = getattr(settings, "PDF_MAX_PAGES", None)
+    if workers is None:
+        workers = getattr(settings, "PDF_EXTRACT_WORKERS", os.cpu_count() or 1)
+
     # load the PDF file into a reader object for text extraction.
-    reader = PdfReader(file)
-    text = []
-    
+    data = file.read()
+    reader = PdfReader(BytesIO(data))
+    page_count = len(reader.pages)
+    if max_pages:
+        page_count = min(page_count, max_pages)
+
+    start = time.perf_counter()
+    min_pages = getattr(settings, "PDF_PARALLEL_MIN_PAGES", 50)
+    if workers > 1 and page_count >= min_pages:
+        pages = _iter_pages_in_pool(data, page_count, workers)
+    else:
+        pages = (_extract_page(reader, n) for n in range(page_count))
+
     # Loop through every page in the PDF document.
-    for page in reader.pages:
-        page_text = page.extract_text()
-        # Save the page to the [] list if the page contains text.
-        if page_text:
-            text.append(page_text)
+    yield from pages
+    logger.debug(
+        "Extracted %s PDF pages in %.2fs", page_count, time.perf_counter() - start
+    )
+
+def _extract_page(reader, number) -> dict:
+    """Extract and time a single page."""
+
+    start = time.perf_counter()
+    text = reader.pages[number].extract_text() or ""
+    return {"page": number + 1, "text": text, "seconds": time.perf_counter() - start}
+
+def _iter_pages_in_pool(data, page_count, workers):
+    """Extract pages across the shared process pool, yielding them back in order."""
+
+    # Workers read the PDF from a temporary file instead of each task
+    # getting its own pickled copy of the whole document.
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        tmp.write(data)
+    try:
+        # A few page ranges per worker; each task parses the PDF once.
+        size = max(1, page_count // (workers * 4))
+        tasks = [
+            (tmp.name, start, min(start + size, page_count))
+            for start in range(0, page_count, size)
+        ]
+        for pages in get_process_pool(workers).map(_extract_page_range, tasks):
+            yield from pages
+    finally:
+        os.unlink(tmp.name)
+
+def _extract_page_range(task) -> list[dict]:
+    """Pool worker: extract pages start..stop-1 of the PDF at path."""
+
+    path, start, stop = task
+    reader = PdfReader(path)
+    return [_extract_page(reader, number) for number in range(start, stop)]
 
-    return "\n".join(text)
-    
 def extract_text_from_docx(file) -> str:
-    """Pull plain text from a Word document."""
+    """Pull plain text from a Word document, tables included."""
+
+    # Skip any paragraphs that are empty or only have spaces.
+    paragraphs = [p for p in iter_docx_paragraphs(file) if p.strip()]
+    # Merge the list of paragraphs into a string, separated by newlines.
+    return "\n".join(paragraphs)
+
+def iter_docx_paragraphs(file):
+    """
+    Yield the text of every paragraph in a Word document, table cells
+    included, by streaming word/document.xml straight out of the zip.
+
+    Nothing but the current paragraph is kept in memory, unlike building
+    a full python-docx Document object tree.
+    """
+
+    with zipfile.ZipFile(file) as archive, archive.open("word/document.xml") as xml:
+        # One list of text pieces per open <w:p> (text boxes nest paragraphs),
+        # and the depth of each open <w:r>.
+        open_paragraphs = []
+        open_runs = []
+        depth = 0
+        body = None
+        # Inside <mc:Fallback>: the legacy copy of content (eg, a text box)
+        # that <mc:Choice> already holds, so it would be counted twice.
+        fallback_depth = None
+
+        for event, element in ElementTree.iterparse(xml, events=("start", "end")):
+            tag = element.tag[element.tag.rfind("}") + 1:]
+
+            if event == "start":
+                depth += 1
+                if fallback_depth is not None:
+                    continue
+                if tag == "Fallback":
+                    fallback_depth = depth
+                elif tag == "p":
+                    open_paragraphs.append([])
+                elif tag == "r":
+                    open_runs.append(depth)
+                elif tag == "body":
+                    body = element
+                continue
+
+            depth -= 1
+            if fallback_depth is not None:
+                if depth < fallback_depth:
+                    fallback_depth = None
+                continue
+
+            if tag == "p":
+                yield "".join(open_paragraphs.pop())
+            elif tag == "r":
+                open_runs.pop()
+            elif open_paragraphs and open_runs and depth == open_runs[-1]:
+                # A run's own content, mapped the way python-docx's Run.text
+                # does (a <w:tab> in the paragraph properties is a tab stop).
+                text = _run_content_text(tag, element)
+                if text:
+                    open_paragraphs[-1].append(text)
+
+            # A finished paragraph or table directly under <w:body> is no
+            # longer needed, so drop it to keep memory flat.
+            if body is not None and depth == 2:
+                body.clear()
+
+def _run_content_text(tag: str, element) -> str:
+    """The text of one element inside a <w:r>, as python-docx reads it."""
+
+    if tag == "t":
+        return element.text or ""
+    if tag in ("tab", "ptab"):
+        return "\t"
+    if tag == "cr":
+        return "\n"
+    if tag == "br":
+        # Line breaks are newlines; page and column breaks are not text.
+        return "\n" if element.get(W_NS + "type", "textWrapping") == "textWrapping" else ""
+    if tag == "noBreakHyphen":
+        return "-"
+    return ""
+
+def extract_text_from_docx_document(file) -> str:
+    """Pull plain text from a Word document with python-docx (body paragraphs only)."""
 
     # Load the uploaded file into a Word document object.
     document = Document(file)
@@ -34,6 +218,7 @@ def extract_text_from_docx(file) -> str:
     # # Merge the list of paragrapns into a string, seperated by newlines.
     return "\n".join(paragraphs)
 
+@timing.stage("extract")
 def get_text_from_uploaded_file(uploaded_file):
     """Acts as a central gateway to extract text regardless of file type"""
 
@@ -47,4 +232,30 @@ def get_text_from_uploaded_file(uploaded_file):
         return extract_text_from_docx(uploaded_file)
     
     return None # Returns None if the file type is not supported.
+
+def iter_text_chunks(uploaded_file):
+    """
+    The streaming counterpart of get_text_from_uploaded_file: yields the
+    text in pieces (blocks of a txt, pages of a PDF, paragraphs of a DOCX)
+    that join up to the same text. Returns None for unsupported files.
+    """
+
+    filename = uploaded_file.name.lower()
+
+    if filename.endswith('.txt'):
+        return iter_txt_chunks(uploaded_file)
+    elif filename.endswith('pdf'):
+        pages = (page["text"] for page in iter_pdf_pages(uploaded_file))
+        return _join_pieces(page for page in pages if page)
+    elif filename.endswith('docx'):
+        paragraphs = iter_docx_paragraphs(uploaded_file)
+        return _join_pieces(p for p in paragraphs if p.strip())
+
+    return None
+
+def _join_pieces(pieces):
+    """Yield pieces with the newline that "\\n".join() would put between them."""
+
+    for i, piece in enumerate(pieces):
+        yield piece if i == 0 else "\n" + piece
     
\ No newline at end of file
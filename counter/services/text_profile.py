@@ -0,0 +1,100 @@
+import hashlib
+import re
+from collections import Counter
+from functools import cached_property
+
+from .analysis import STOP_WORDS
+
+# Compiled once at import time so every request reuses the same patterns.
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+WORD_RE = re.compile(r"\b\w+\b")
+ALPHA_WORD_RE = re.compile(r"\b[a-zA-Z']+\b")
+PASSIVE_RE = re.compile(r"\b(be|is|was|were|been|being)\s+\w+(ed|en)\b")
+
+
+class TextProfile:
+    """
+    A single tokenized view of a text that every metric can share.
+
+    Each tokenization (words, sentences, paragraphs...) is computed the first
+    time it is asked for and then cached, so the summary, quality insights,
+    basic metrics and origins lookup never scan the same text twice.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+
+    @cached_property
+    def lowered(self) -> str:
+        """The text lowercased once for every case-insensitive match."""
+
+        return self.text.lower()
+
+    @cached_property
+    def whitespace_tokens(self) -> list[str]:
+        """Whitespace separated chunks, used for the headline word count."""
+
+        return self.text.split()
+
+    @cached_property
+    def sentences(self) -> list[str]:
+        """Sentences split on . ! or ? followed by a space."""
+
+        sentences = SENTENCE_SPLIT_RE.split(self.text)
+        return [s.strip() for s in sentences if s.strip()]
+
+    @cached_property
+    def paragraphs(self) -> list[str]:
+        """Every non-empty line of the text."""
+
+        return [p for p in self.text.split("\n") if p.strip()]
+
+    @cached_property
+    def words(self) -> list[str]:
+        """Lowercase word tokens (letters, numbers and underscores)."""
+
+        return WORD_RE.findall(self.lowered)
+
+    @cached_property
+    def word_counts(self) -> Counter:
+        """How many times each lowercase word token appears."""
+
+        return Counter(self.words)
+
+    @cached_property
+    def unique_words(self) -> set[str]:
+        """The vocabulary of the text, used for TTR and origin lookups."""
+
+        return set(self.word_counts)
+
+    @cached_property
+    def alpha_words(self) -> list[str]:
+        """Lowercase alphabetic tokens, apostrophes included (eg, don't)."""
+
+        return ALPHA_WORD_RE.findall(self.lowered)
+
+    @cached_property
+    def content_word_counts(self) -> Counter:
+        """Frequencies of alphabetic tokens that are not STOP_WORDS."""
+
+        return Counter(w for w in self.alpha_words if w not in STOP_WORDS)
+
+    @cached_property
+    def passive_count(self) -> int:
+        """How many 'to be' + past participle pairs appear in the text."""
+
+        return sum(1 for _ in PASSIVE_RE.finditer(self.lowered))
+
+
+def text_digest(text: str) -> str:
+    """Return the SHA-256 hex digest that identifies a piece of text."""
+
+    return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
+
+
+def get_profile(text) -> TextProfile:
+    """Return the shared profile for text, building one if needed."""
+
+    if isinstance(text, TextProfile):
+        return text
+    return TextProfile(text)
@@ -0,0 +1,64 @@
+import time
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+
+# The stage timings of the request being handled: name -> [total ms, calls].
+# None outside a request (management commands, tests), where timing is a no-op.
+_timings: ContextVar[dict | None] = ContextVar("stage_timings", default=None)
+
+
+def start_request():
+    """Begin collecting stage timings; returns a token for end_request()."""
+
+    return _timings.set({})
+
+
+def end_request(token) -> dict:
+    """Stop collecting and return {stage: (total ms, calls)}."""
+
+    timings = _timings.get() or {}
+    _timings.reset(token)
+    return {name: (total, calls) for name, (total, calls) in timings.items()}
+
+
+def record(name: str, milliseconds: float) -> None:
+    """Add a measured duration to the current request's stage."""
+
+    timings = _timings.get()
+    if timings is None:
+        return
+    entry = timings.setdefault(name, [0.0, 0])
+    entry[0] += milliseconds
+    entry[1] += 1
+
+
+class stage(ContextDecorator):
+    """
+    Time a block or a function as a named stage of the current request:
+
+        with timing.stage("analysis"):
+            ...
+
+        @timing.stage("extract")
+        def get_text_from_uploaded_file(...):
+            ...
+
+    Repeated and nested stages are all recorded; durations of the same
+    name add up.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._start = 0.0
+
+    def _recreate_cm(self):
+        # A fresh instance per decorated call, so concurrent calls don't share a start time.
+        return stage(self.name)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, (time.perf_counter() - self._start) * 1000)
+        return False
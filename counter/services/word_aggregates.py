@@ -0,0 +1,84 @@
+from django.db import connection, transaction
+from django.db.models import F
+
+from ..models import UserWordCount, UserWordTotals
+from . import timing
+from .text_profile import get_profile
+
+# Adds to a word's running count, creating the row the first time it is seen.
+# ON CONFLICT upserts work on SQLite (3.24+) and PostgreSQL alike.
+UPSERT_SQL = """
+INSERT INTO {table} (user_id, word, count) VALUES (%s, %s, %s)
+ON CONFLICT (user_id, word) DO UPDATE SET count = {table}.count + excluded.count
+"""
+
+
+# Longer "words" are noise (URLs, hashes) and would not fit the column.
+MAX_WORD_LENGTH = 100
+
+
+def _record_counts(record):
+    """The content-word counts a record contributes to its owner's totals."""
+
+    counts = get_profile(record.original_text).content_word_counts
+    return {w: c for w, c in counts.items() if len(w) <= MAX_WORD_LENGTH}
+
+
+@timing.stage("word_aggregates")
+def add_record(record) -> None:
+    """Add a new record's words to its owner's aggregates."""
+
+    _apply(record.user_id, _record_counts(record), sign=1)
+
+
+@timing.stage("word_aggregates")
+def remove_record(record) -> None:
+    """Subtract a deleted record's words from its owner's aggregates."""
+
+    _apply(record.user_id, _record_counts(record), sign=-1)
+
+
+def _apply(user_id, counts, sign: int) -> None:
+    table = UserWordCount._meta.db_table
+    with transaction.atomic():
+        if counts:
+            with connection.cursor() as cursor:
+                if sign > 0:
+                    cursor.executemany(
+                        UPSERT_SQL.format(table=table),
+                        [(user_id, word, count) for word, count in counts.items()],
+                    )
+                else:
+                    cursor.executemany(
+                        f"UPDATE {table} SET count = count - %s WHERE user_id = %s AND word = %s",
+                        [(count, user_id, word) for word, count in counts.items()],
+                    )
+            if sign < 0:
+                UserWordCount.objects.filter(user_id=user_id, count__lte=0).delete()
+
+        totals, _ = UserWordTotals.objects.get_or_create(user_id=user_id)
+        UserWordTotals.objects.filter(pk=totals.pk).update(
+            documents=F("documents") + sign,
+            words=F("words") + sign * sum(counts.values()),
+        )
+
+
+def get_top_words(user, limit: int = 10) -> list[tuple[str, int]]:
+    """A user's most used content words across the vault, as (word, count)."""
+
+    return list(
+        UserWordCount.objects.filter(user=user)
+        .order_by("-count", "word")
+        .values_list("word", "count")[:limit]
+    )
+
+
+def get_vocabulary_stats(user) -> dict:
+    """Document, word and distinct-word totals for a user's vault."""
+
+    totals = UserWordTotals.objects.filter(user=user).first()
+    return {
+        "documents": totals.documents if totals else 0,
+        "words": totals.words if totals else 0,
+        "distinct_words": UserWordCount.objects.filter(user=user).count(),
+    }
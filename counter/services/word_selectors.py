@@ -1,25 +1,298 @@
-# The '..' means move up one directory level to find the models file
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
 from django.db.models import Q
-from django.shortcuts import get_object_or_404
+from django.db.models.signals import post_save
+from django.shortcuts import aget_object_or_404, get_object_or_404
+
+# The '..' means move up one directory level to find the models file
+from ..models import STORED_METRICS, AnalysisRecord
+from . import search_index, timing
 
-from ..models import AnalysisRecord
+# The only columns a history list needs; the text and JSON fields stay on disk.
+HISTORY_LIST_FIELDS = ("id", "user_id", "title", "preview", "uploaded_at", "word_count")
 
 
 def get_user_history(user, search_query=""):
     """Fetches and filters the user's analysis history."""
 
     records = AnalysisRecord.objects.filter(user=user).order_by('-uploaded_at')
-    
+
     # If the search term exists, filter the results to find matches.
     if search_query:
+        if search_index.is_available():
+            return search_user_history(user, search_query)
+
         records = records.filter(
-            # Look for the query in the title or original text.
             Q(title__icontains=search_query) |
-            Q(original_text__icontains=search_query)
+            Q(pk__in=_scan_texts(user, search_query))
         )
     # Return either the filtered list or the full history.
     return records
 
+def _scan_texts(user, search_query):
+    """
+    Ids of the user's records whose text contains the query. The text is
+    stored compressed, so the database can't look inside it; without the
+    SQLite index, each text is decompressed and searched here instead.
+    """
+
+    needle = search_query.casefold()
+    texts = AnalysisRecord.objects.filter(user=user).values_list("pk", "original_text")
+    return [pk for pk, text in texts.iterator(chunk_size=200) if needle in text.casefold()]
+
+@timing.stage("search")
+def search_user_history(user, search_query):
+    """
+    Ranked full-text search over the user's records, best match first.
+    Each record gets a `snippet` attribute with the matches highlighted.
+    """
+
+    hits = search_index.search(user, search_query)
+    records = AnalysisRecord.objects.filter(user=user, pk__in=hits)
+    # The index keeps no text, so snippets come from the records' own.
+    records_by_pk = {
+        record.pk: record
+        for record in records.only(*HISTORY_LIST_FIELDS, "original_text")
+    }
+
+    results = []
+    for pk in hits:
+        record = records_by_pk.get(pk)
+        if record is not None:
+            record.snippet = search_index.make_snippet(record.original_text, search_query)
+            results.append(record)
+    return results
+
+def encode_cursor(record):
+    """An opaque page cursor pointing at a record's place in the history."""
+
+    position = f"{record.uploaded_at.isoformat()}|{record.pk}"
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+def decode_cursor(cursor):
+    """Returns (uploaded_at, pk) from a cursor, or None if it is missing or invalid."""
+
+    if not cursor:
+        return None
+    try:
+        uploaded_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(uploaded_at), int(pk)
+    except (ValueError, UnicodeError):
+        return None
+
+@timing.stage("db_history")
+def get_history_page(user, search_query="", cursor=None, direction="older", page_size=None):
+    """
+    One page of the user's history, newest first, using keyset pagination:
+    each page starts right after the (uploaded_at, id) of the cursor record,
+    so it costs the same however deep into the vault it is.
+
+    Returns a dict with `records` and the `newer` / `older` cursors
+    (None when there is no such page). Ranked search results are one page.
+    """
+
+    page_size = page_size or getattr(settings, "HISTORY_PAGE_SIZE", 25)
+
+    if search_query and search_index.is_available():
+        return {"records": search_user_history(user, search_query), "newer": None, "older": None}
+
+    records = get_user_history(user, search_query).only(*HISTORY_LIST_FIELDS)
+    position = decode_cursor(cursor)
+
+    if position and direction == "newer":
+        uploaded_at, pk = position
+        # Walk forwards from the cursor, then flip back to newest first.
+        page = list(
+            records.filter(Q(uploaded_at__gt=uploaded_at) | Q(uploaded_at=uploaded_at, pk__gt=pk))
+            .order_by("uploaded_at", "pk")[: page_size + 1]
+        )
+        has_newer, has_older = len(page) > page_size, True
+        page = page[:page_size][::-1]
+    else:
+        if position:
+            uploaded_at, pk = position
+            records = records.filter(
+                Q(uploaded_at__lt=uploaded_at) | Q(uploaded_at=uploaded_at, pk__lt=pk)
+            )
+        page = list(records.order_by("-uploaded_at", "-pk")[: page_size + 1])
+        has_newer, has_older = position is not None, len(page) > page_size
+        page = page[:page_size]
+
+    return {
+        "records": page,
+        "newer": encode_cursor(page[0]) if page and has_newer else None,
+        "older": encode_cursor(page[-1]) if page and has_older else None,
+    }
+
+def find_record_by_hash(content_hash):
+    """
+    Finds any vault record with identical text, so its computed metrics
+    can be reused. The large original text is not loaded.
+    """
+
+    return (
+        AnalysisRecord.objects.filter(content_hash=content_hash)
+        .defer("original_text")
+        .first()
+    )
+
+def find_user_record_by_hash(user, content_hash):
+    """Finds the user's own record for a piece of text, if they saved one."""
+
+    if not user.is_authenticated:
+        return None
+    return AnalysisRecord.objects.filter(user=user, content_hash=content_hash).first()
+
+def user_has_analysis(user, content_hash):
+    """Whether the user saved a record of this text, so may see its chart."""
+
+    return AnalysisRecord.objects.filter(user=user, content_hash=content_hash).exists()
+
+async def auser_has_analysis(user, content_hash):
+    """Async user_has_analysis, for async views."""
+
+    return await AnalysisRecord.objects.filter(user=user, content_hash=content_hash).aexists()
+
+@timing.stage("db_save")
+def save_analysis_record(user, title, text, results, content_hash):
+    """
+    Stores an analysis in the user's vault.
+    Returns (record, created); re-uploading identical text reuses the
+    existing record instead of writing a duplicate copy.
+    """
+
+    existing = (
+        AnalysisRecord.objects.filter(user=user, content_hash=content_hash)
+        .defer("original_text")
+        .first()
+    )
+    if existing:
+        return existing, False
+
+    record = build_analysis_record(user, title, text, results, content_hash)
+    record.save()
+    return record, True
+
+def build_analysis_record(user, title, text, results, content_hash):
+    """An unsaved record holding an analysis dictionary's stored fields."""
+
+    return AnalysisRecord(
+        user=user,
+        title=title,
+        original_text=text,
+        content_hash=content_hash,
+        word_count=results["word_count"],
+        summary=results["summary"],
+        topics=results["topics"],
+        bullets=results["bullets"],
+        longest_sentence=results["longest_sentence"],
+        ttr=results["ttr"],
+        overused=results["overused"],
+        passive_count=results["passive_count"],
+        metrics={key: results[key] for key in STORED_METRICS if key in results},
+    )
+
+def bulk_save_analysis_records(records, batch_size=500):
+    """
+    Insert many new records at once. bulk_create skips save() and the
+    model signals, so both are done here: the derived fields first, then
+    post_save for each row, which keeps the search index up to date.
+    """
+
+    for record in records:
+        record.fill_derived_fields()
+    created = AnalysisRecord.objects.bulk_create(records, batch_size=batch_size)
+    for record in created:
+        post_save.send(
+            sender=AnalysisRecord, instance=record, created=True, raw=False,
+            using=record._state.db, update_fields=None,
+        )
+    return created
+
+def store_analyzed_documents(user, outcomes, batch_size=200):
+    """
+    Save batch analysis outcomes (see services.batch) to the user's vault
+    with one bulk insert per batch. Yields every outcome, with its text
+    dropped and `status` set to "created", "duplicate" or "failed"; created
+    ones also get a `record_id`.
+    """
+
+    seen = set()
+    pending = []
+
+    def flush():
+        existing = get_user_content_hashes(user, (o["digest"] for o in pending))
+        new = [o for o in pending if o["digest"] not in existing]
+        with transaction.atomic():
+            records = bulk_save_analysis_records(
+                [
+                    build_analysis_record(user, o["title"], o["text"], o["results"], o["digest"])
+                    for o in new
+                ]
+            )
+        for outcome, record in zip(new, records):
+            outcome["status"], outcome["record_id"] = "created", record.pk
+        for outcome in pending:
+            outcome.setdefault("status", "duplicate")
+            outcome.pop("text", None)
+        return pending
+
+    for outcome in outcomes:
+        if outcome["error"]:
+            outcome["status"] = "failed"
+            yield outcome
+            continue
+        # The same text twice in one batch is only stored once.
+        if outcome["digest"] in seen:
+            outcome["status"] = "duplicate"
+            outcome.pop("text", None)
+            yield outcome
+            continue
+        seen.add(outcome["digest"])
+        pending.append(outcome)
+
+        if len(pending) >= batch_size:
+            yield from flush()
+            pending = []
+
+    if pending:
+        yield from flush()
+
+def get_user_content_hashes(user, content_hashes):
+    """Which of these content hashes are already in the user's vault."""
+
+    return set(
+        AnalysisRecord.objects.filter(user=user, content_hash__in=list(content_hashes))
+        .values_list("content_hash", flat=True)
+    )
+
+def get_session_record(user, session):
+    """
+    The record of the user's current analysis, or None.
+    The session keeps only its id, never the text or results.
+    """
+
+    pk = session.get("analysis_record_id")
+    if not pk or not user.is_authenticated:
+        return None
+    return AnalysisRecord.objects.filter(user=user, pk=pk).first()
+
+async def aget_session_record(user, session):
+    """Async get_session_record, for async views."""
+
+    pk = await session.aget("analysis_record_id")
+    if not pk or not user.is_authenticated:
+        return None
+    return await AnalysisRecord.objects.filter(user=user, pk=pk).afirst()
+
+async def aget_record_for_user(user, pk):
+    """Async get_record_for_user, for async views."""
+
+    return await aget_object_or_404(AnalysisRecord, pk=pk, user=user)
+
 def get_record_for_user(user, pk):
     """Securley fetches a record owned by a specific user."""
     
@@ -0,0 +1,81 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .models import AnalysisRecord
+from .services import report_cache, search_index, similarity_index, word_aggregates
+
+
+@receiver(pre_save, sender=AnalysisRecord)
+def remember_indexed_text(sender, instance, update_fields=None, **kwargs):
+    """
+    The search index keeps no copy of the text, so note the title and text
+    an existing record was indexed with before the save replaces them.
+    """
+
+    instance.indexed_text = None
+    if instance._state.adding:
+        return
+    if update_fields is not None and not {"title", "original_text"} & set(update_fields):
+        return
+    instance.indexed_text = (
+        AnalysisRecord.objects.filter(pk=instance.pk)
+        .values_list("title", "original_text")
+        .first()
+    )
+
+
+@receiver(post_save, sender=AnalysisRecord)
+def index_saved_record(sender, instance, created, **kwargs):
+    """Keep the full-text search index in step with the vault."""
+
+    # Bulk inserts send post_save only, so new records may lack the attribute.
+    previous = getattr(instance, "indexed_text", None)
+    if created or (previous is not None and previous != (instance.title, instance.original_text)):
+        search_index.index_record(instance, previous)
+
+
+@receiver(post_save, sender=AnalysisRecord)
+def index_record_similarity(sender, instance, created, **kwargs):
+    """
+    Put the record's MinHash bands in the near-duplicate index. Other saves
+    leave the signature as it was, so its buckets are left alone too.
+    """
+
+    if created or instance.signature_changed:
+        similarity_index.index_record(instance)
+        instance.signature_changed = False
+
+
+@receiver(post_save, sender=AnalysisRecord)
+def count_new_record_words(sender, instance, created, **kwargs):
+    """Add a new record's words to its owner's vault-wide counts."""
+
+    if created:
+        word_aggregates.add_record(instance)
+
+
+@receiver(pre_delete, sender=AnalysisRecord)
+def uncount_deleted_record_words(sender, instance, **kwargs):
+    """
+    Subtract a record's words before it goes; pre_delete, because a record
+    loaded without its text can still fetch it while the row exists.
+    """
+
+    word_aggregates.remove_record(instance)
+
+
+@receiver(post_delete, sender=AnalysisRecord)
+def drop_cached_reports(sender, instance, **kwargs):
+    """A deleted record's rendered reports must not be served again."""
+
+    report_cache.invalidate_record(instance.pk)
+
+
+@receiver(pre_delete, sender=AnalysisRecord)
+def unindex_deleted_record(sender, instance, **kwargs):
+    """
+    A deleted record must no longer turn up in searches. Unindexing needs
+    its text, so like the word counts this happens before the row goes.
+    """
+
+    search_index.remove_record(instance)
@@ -1,21 +1,54 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 app_name = "counter"
 
+# The views that do heavy CPU work, as coroutines under ASGI when enabled.
+heavy_views = async_views if settings.USE_ASYNC_VIEWS else views
+
 urlpatterns = [
-    path("", views.counter, name="home"),
-    path("chart/", views.word_frequency_chart, name="chart"),
+    path("", heavy_views.counter, name="home"),
+    path("chart/<str:digest>/", heavy_views.word_frequency_chart, name="chart"),
     # This path is for the homepage.
-    path("export-pdf/", views.export_pdf, name="export_pdf"),
+    path("export-pdf/", heavy_views.export_pdf, name="export_pdf"),
     #This path is for the vault history detail page.
-    path("export-pdf/<int:pk>/", views.export_pdf, name="export_pdf_by_id"),
+    path("export-pdf/<int:pk>/", heavy_views.export_pdf, name="export_pdf_by_id"),
     # This path is for the homepage.
-    path("export-docx/", views.export_docx, name="export_docx"),
+    path("export-docx/", heavy_views.export_docx, name="export_docx"),
     # This path is for the vault history detail page
-    path("export-docx/<int:pk>/", views.export_docx, name="export_docx_by_id"),
+    path("export-docx/<int:pk>/", heavy_views.export_docx, name="export_docx_by_id"),
+    # These paths queue exports on the background worker pool.
+    path("exports/start/<str:export_format>/", views.export_job_start, name="export_job_start"),
+    path(
+        "exports/start/<str:export_format>/<int:pk>/",
+        views.export_job_start,
+        name="export_job_start_by_id",
+    ),
+    path("exports/<str:job_id>/", heavy_views.export_job_status, name="export_job_status"),
+    path(
+        "exports/<str:job_id>/download/",
+        views.export_job_download,
+        name="export_job_download",
+    ),
+    # Analyses run in the background with their progress streamed as server-sent events.
+    path("analysis/start/", views.analysis_job_start, name="analysis_job_start"),
+    path(
+        "analysis/<str:job_id>/events/",
+        heavy_views.analysis_job_events,
+        name="analysis_job_events",
+    ),
+    path(
+        "analysis/<str:job_id>/finish/",
+        views.analysis_job_finish,
+        name="analysis_job_finish",
+    ),
+    # Many files (or zip archives) analyzed in one request.
+    path("bulk-upload/", heavy_views.bulk_upload_view, name="bulk_upload"),
     path("history/", views.history, name='history'),
+    # Vault-wide trends from the DuckDB corpus mirror.
+    path("analytics/", views.analytics, name="analytics"),
     path("history/<int:pk>/", views.history_detail, name="history_detail"),
     # This path is for the delete button. very important!
     path("history/delete/<int:pk>/", views.delete_analysis, name="delete_analysis"),
@@ -1,22 +1,56 @@
-import os
-import re
+from datetime import UTC, datetime
 from typing import Any
 
-import duckdb
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import UserCreationForm
-from django.http import HttpResponse
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import redirect, render
 from django.templatetags.static import static
-
-from .models import AnalysisRecord
-from .services import exporters, word_selectors
-from .services.quality_insights import analyze_quality, get_basic_metrics
-from .services.summarizer import generate_summary
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_POST
+
+from .services import (
+    analysis_jobs,
+    bulk_upload,
+    chart_cache,
+    charts,
+    corpus_analytics,
+    export_jobs,
+    exporters,
+    report_cache,
+    similarity_index,
+    timing,
+    word_aggregates,
+    word_selectors,
+)
+from .services.analysis_cache import get_analysis, get_top_words, text_digest
+from .services.origins import get_value_matches  # noqa: F401
+from .services.streaming_analysis import analyze_upload
 from .services.text_extractors import get_text_from_uploaded_file
 
+# Session keys that used to hold a copy of the text and its results.
+LEGACY_SESSION_KEYS = (
+    "analysis_text",
+    "is_saved",
+    "summary",
+    "bullets",
+    "topics",
+    "word_count",
+    "longest_sentence",
+    "ttr",
+    "overused",
+    "passive_count",
+)
+
 
 # A "decorator" that forces the user to log in before they can access this view.
 # User will not see this view until they are logged-in.
@@ -24,111 +58,134 @@ from .services.text_extractors import get_text_from_uploaded_file
 def counter(request):
     """Main view."""
 
-    context: dict[str, Any] = {"on": "active"}
-
-    # Check if text comes from a previous redirect or current session.
-    text = request.session.get("analysis_text", "")
     if request.method == "POST":
-        # Text from text area.
-        text = request.POST.get("texttocount", "")
+        return _counter_post(request)
 
-        # Text from file upload.
-        if "file" in request.FILES:
-            uploaded_file = request.FILES["file"]
+    # Analysis metrics. (Runs on GET after redirect.)
+    record = word_selectors.get_session_record(request.user, request.session)
+    context = _counter_context(record, request.session.get("analysis_digest"))
+    with timing.stage("render"):
+        return render(request, "counter/counter.html", context)
 
-            # 1. DELEGATE TO EXTRACTOR SERVICE
-            text = get_text_from_uploaded_file(uploaded_file)
 
+def _counter_post(request):
+    """
+    Analyze the posted text or file, save it to the vault and point the
+    session at the record. Shared by the sync and async home views.
+    """
+
+    # Text from text area.
+    text = request.POST.get("texttocount", "")
+    record_title = "Manual Entry"
+
+    digest = results = None
+
+    # Text from file upload.
+    if "file" in request.FILES:
+        uploaded_file = request.FILES["file"]
+        record_title = uploaded_file.name
+
+        # 1. DELEGATE TO EXTRACTOR SERVICE
+        if uploaded_file.size >= settings.STREAMING_ANALYSIS_MIN_BYTES:
+            # Too big to hold in memory: analyze it chunk by chunk and
+            # keep only the start of the text for display and export.
+            text, digest, results = analyze_upload(uploaded_file)
             if text:
-                messages.success(
-                    request, f"'{uploaded_file.name}' analyzed successfully!"
+                messages.info(
+                    request,
+                    "Large document: metrics cover the whole file, "
+                    "but only its beginning is stored.",
                 )
-            else:
-                messages.error(request, f"Unsupported file type: {uploaded_file.name}")
-                return redirect("counter:home")
-
-        # Reset the save guard for the new data.
-        request.session["is_saved"] = False
+        else:
+            text = get_text_from_uploaded_file(uploaded_file)
 
-        # Store text in session and redirect.
-        request.session["analysis_text"] = text
+        if text:
+            messages.success(
+                request, f"'{uploaded_file.name}' analyzed successfully!"
+            )
+        else:
+            messages.error(request, f"Unsupported file type: {uploaded_file.name}")
+            return redirect("counter:home")
+
+    # Drop the bulky keys older versions of this view kept in the session.
+    for key in LEGACY_SESSION_KEYS:
+        request.session.pop(key, None)
+
+    if not text:
+        request.session.pop("analysis_record_id", None)
+        request.session.pop("analysis_digest", None)
         return redirect("counter:home")
 
-    # Analysis metrics. (Runs on GET after redirect.)
-    if text:
-        # 2. DELEGATE LINGUISTIC MATH TO SERVICES
-        metrics = get_basic_metrics(text)
-        summary_data = generate_summary(text)
-        quality_data = analyze_quality(text)
-
-        # Hook up the DuckDB.
-
-        # Lowercase the text and remove everything except letters/numbers.
-        clean_text = text.lower()
-        # regex finds only letters and ignores commas, periods, etc.
-        words_only = re.findall(r"\b\w+\b", clean_text)
-        # use set() to get unique words only (faster for Duckdb)
-        all_unique_words = list(set(words_only))
-        # Check the vault for all these words.
-        vault_pins = get_value_matches(all_unique_words)
+    # 2. DELEGATE LINGUISTIC MATH TO SERVICES
+    if results is None:
+        digest = text_digest(text)
+        results = get_analysis(text, digest)
+
+    # Save the analysis to the user's vault once, here, so a refresh
+    # can't duplicate it. Identical text is not stored twice.
+    record, created = word_selectors.save_analysis_record(
+        request.user, record_title, text, results, digest
+    )
+    if not created:
+        messages.info(request, "This text is already in your vault.")
+
+    # The session only points at the record; the text and results live
+    # in the vault and the analysis cache.
+    request.session["analysis_record_id"] = record.pk
+    request.session["analysis_digest"] = digest
+    return redirect("counter:home")
+
+
+def _counter_context(record, digest) -> dict[str, Any]:
+    """The home page context, with the analysis of the session's record if any."""
+
+    context: dict[str, Any] = {"on": "active"}
+    if record is not None:
+        text = record.original_text
+        # Repeat views of the same text are served from the analysis cache.
+        digest = digest or record.content_hash
+        results = get_analysis(text, digest)
 
         # Update context cleanly
         context.update(
-            metrics
-        )  # Adds word_count, sentence_count, paragraph_count, etc.
+            results
+        )  # Adds word_count, summary, vault_pins, ttr, etc.
         context.update(
             {
                 "text": text,
+                "analysis_digest": digest,
                 "has_result": True,
-                "vault_pins": vault_pins,
-                "show_chart": len(text) < 30000,
-                "summary": summary_data["summary"],
-                "bullets": summary_data["bullets"],
-                "topics": summary_data["topics"],
-                "longest_sentence": quality_data["longest_sentence"],
-                "ttr": quality_data["ttr"],
-                "overused": quality_data["overused"],
-                "passive_count": quality_data["passive_count"],
+                # The chart only plots the top words, so any text can have one.
+                "show_chart": bool(results["top_words"]),
             }
         )
+    return context
 
-        # Save details of the logged in user into the database.
-        if request.user.is_authenticated and not request.session.get("is_saved"):
-                record_title = "Manual Entry"
-                if "file" in request.FILES:
-                    record_title = request.FILES["file"].name
-
-                AnalysisRecord.objects.create(
-                    user=request.user,
-                    title=record_title,
-                    original_text=text,
-                    word_count=metrics[
-                        "word_count"
-                    ],  # Extracted from metrics dictionary
-                    summary=summary_data["summary"],
-                    topics=summary_data["topics"],
-                    bullets=summary_data["bullets"],
-                    longest_sentence=quality_data["longest_sentence"],
-                    ttr=quality_data["ttr"],
-                    overused=quality_data["overused"],
-                    passive_count=quality_data["passive_count"],
-                )
-                # Mark as saved so a refresh does not duplicate the entry.
-                request.session["is_saved"] = True
-
-        # Save everything to session for a PDF export.
-        for key in [
-            "summary",
-            "bullets",
-            "topics",
-            "word_count",
-            "longest_sentence",
-            "ttr",
-            "overused",
-            "passive_count",
-        ]:
-            request.session[key] = context.get(key)
-    return render(request, "counter/counter.html", context)
+
+@login_required
+def bulk_upload_view(request):
+    """
+    Analyze many documents in one request: several files and/or zip archives.
+    Answers with a per-file status summary, as JSON when the client asks for it.
+    """
+
+    context: dict[str, Any] = {}
+    if request.method == "POST":
+        files = request.FILES.getlist("files")
+        status = 200
+        try:
+            context["results"] = bulk_upload.process_bulk_upload(request.user, files)
+        except bulk_upload.BulkUploadError as exc:
+            context["error"] = str(exc)
+            status = 400
+
+        if "application/json" in request.headers.get("Accept", ""):
+            return JsonResponse(context, status=status)
+        if "results" in context:
+            context["created"] = sum(r["status"] == "created" for r in context["results"])
+        return render(request, "counter/bulk_upload.html", context, status=status)
+
+    return render(request, "counter/bulk_upload.html", context)
 
 
 def register(request):
@@ -157,6 +214,17 @@ def export_docx(request, pk=None):
     or the vault (database).
     """
 
+    # Vault records never change, so their reports are rendered only once.
+    record = _export_record(request, pk)
+    if record is not None:
+        return _report_response(
+            record,
+            "docx",
+            lambda: exporters.generate_docx_report(
+                exporters.get_record_export_data(record)
+            ),
+        )
+
     # Gather data using the coordinator
     data = exporters.get_export_data(request.user, pk, request.session)
 
@@ -174,11 +242,22 @@ def export_docx(request, pk=None):
 def export_pdf(request, pk=None):
     """Export the WORD document for the user."""
 
+    logo_url = request.build_absolute_uri(static("counter/img/python_developer.png"))
+
+    # Vault records never change, so their reports are rendered only once.
+    record = _export_record(request, pk)
+    if record is not None:
+        return _report_response(
+            record,
+            "pdf",
+            lambda: exporters.generate_pdf_report(
+                {**exporters.get_record_export_data(record), "logo_url": logo_url}
+            ),
+        )
+
     # Gather data using the coordinator
     data = exporters.get_export_data(request.user, pk, request.session)
-    data["logo_url"] = request.build_absolute_uri(
-        static("counter/img/python_developer.png")
-    )
+    data["logo_url"] = logo_url
 
     # Generate and return
     pdf_bytes = exporters.generate_pdf_report(data)
@@ -187,20 +266,238 @@ def export_pdf(request, pk=None):
     return response
 
 
-def word_frequency_chart(request):
+def _export_record(request, pk=None):
+    """The vault record to export: the one asked for, else the current analysis."""
+
+    if pk:
+        return word_selectors.get_record_for_user(request.user, pk)
+    return word_selectors.get_session_record(request.user, request.session)
+
+
+def _report_response(record, export_format, render):
+    """Serve a record's report from the cache (render() on a miss) as a download."""
+
+    _, content_type, filename = export_jobs.EXPORT_FORMATS[export_format]
+    return FileResponse(
+        report_cache.open_report(record, export_format, render),
+        as_attachment=True,
+        filename=filename,
+        content_type=content_type,
+    )
+
+
+@login_required
+@require_POST
+def export_job_start(request, export_format, pk=None):
     """
-    A thin wrapper that fetches text from the URL
-    and returns a PNG from the service layer.
+    Queue a PDF or WORD export on the background worker pool and return
+    the job id straight away, so this request worker is freed at once.
     """
 
-    text = request.GET.get("text", "")
-    if not text.strip():
-        return HttpResponse("No text provided", status=400)
+    if export_format not in export_jobs.EXPORT_FORMATS:
+        raise Http404("Unknown export format")
 
-    # Use the existing chart logic now moved to exporters or a visuals service
-    chart_bytes = exporters.generate_word_frequency_chart_image(text)
+    # Gather data now, while the session and user are at hand.
+    record = _export_record(request, pk)
+    if record is not None:
+        data = exporters.get_record_export_data(record)
+    else:
+        data = exporters.get_export_data(request.user, pk, request.session)
+    if export_format == "pdf":
+        data["logo_url"] = request.build_absolute_uri(
+            static("counter/img/python_developer.png")
+        )
+
+    job = export_jobs.submit_export(request.user, export_format, data, record)
+    return JsonResponse(_job_payload(job), status=202)
+
+
+@login_required
+def export_job_status(request, job_id):
+    """
+    Report an export job's status straight away; the page polls on a timer.
+    (The async version can also wait for the job, see async_views.)
+    """
 
-    return HttpResponse(chart_bytes.getvalue(), content_type="image/png")
+    job = export_jobs.get_job(job_id, request.user)
+    if job is None:
+        raise Http404("Unknown export job")
+    return JsonResponse(_job_payload(job))
+
+
+@login_required
+def export_job_download(request, job_id):
+    """Serve the finished document of an export job."""
+
+    job = export_jobs.get_job(job_id, request.user)
+    if job is None:
+        raise Http404("Unknown export job")
+    if job["status"] != "done":
+        return JsonResponse(_job_payload(job), status=409)
+
+    try:
+        return FileResponse(
+            open(export_jobs.artifact_path(job), "rb"),
+            as_attachment=True,
+            filename=job["filename"],
+            content_type=job["content_type"],
+        )
+    except FileNotFoundError:
+        # Purged since the state was read.
+        raise Http404("Export expired") from None
+
+
+def _job_payload(job):
+    """The JSON shape returned for an export job."""
+
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "error": job["error"],
+        "status_url": reverse("counter:export_job_status", args=[job["id"]]),
+        "download_url": reverse("counter:export_job_download", args=[job["id"]]),
+    }
+
+
+@login_required
+@require_POST
+def analysis_job_start(request):
+    """
+    Queue the analysis of the posted text or file on the background pool
+    and return the job id straight away; progress is streamed from
+    analysis_job_events and analysis_job_finish points the session at the result.
+    """
+
+    if "file" in request.FILES:
+        uploaded_file = request.FILES["file"]
+        job = analysis_jobs.submit_analysis(
+            request.user, uploaded_file.name, uploaded_file=uploaded_file
+        )
+    elif text := request.POST.get("texttocount", ""):
+        job = analysis_jobs.submit_analysis(request.user, "Manual Entry", text=text)
+    else:
+        return JsonResponse({"error": "Nothing to analyze"}, status=400)
+
+    return JsonResponse(
+        {
+            **analysis_jobs.job_progress(job),
+            "events_url": reverse("counter:analysis_job_events", args=[job["id"]]),
+            "finish_url": reverse("counter:analysis_job_finish", args=[job["id"]]),
+        },
+        status=202,
+    )
+
+
+@login_required
+def analysis_job_events(request, job_id):
+    """
+    Stream an analysis job's progress as server-sent events. The stream
+    holds this worker, so it ends after ANALYSIS_JOB_STREAM_SECONDS and the
+    browser reconnects; the async version streams until the job ends.
+    """
+
+    return _event_stream(
+        analysis_jobs.iter_events(
+            job_id,
+            request.user,
+            max_seconds=getattr(settings, "ANALYSIS_JOB_STREAM_SECONDS", 10),
+        )
+    )
+
+
+def _event_stream(events):
+    """A text/event-stream response that proxies must not buffer."""
+
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@login_required
+@require_POST
+def analysis_job_finish(request, job_id):
+    """Make a finished job's record the current analysis, as the counter view does."""
+
+    job = analysis_jobs.get_job(job_id, request.user)
+    if job is None:
+        raise Http404("Unknown analysis job")
+    if job["status"] != "done":
+        return JsonResponse(analysis_jobs.job_progress(job), status=409)
+
+    for key in LEGACY_SESSION_KEYS:
+        request.session.pop(key, None)
+    request.session["analysis_record_id"] = job["record_id"]
+    request.session["analysis_digest"] = job["digest"]
+
+    if job["title"] != "Manual Entry":
+        messages.success(request, f"'{job['title']}' analyzed successfully!")
+    if job["truncated"]:
+        messages.info(
+            request,
+            "Large document: metrics cover the whole file, "
+            "but only its beginning is stored.",
+        )
+    if not job["created"]:
+        messages.info(request, "This text is already in your vault.")
+    return JsonResponse({"redirect_url": reverse("counter:home")})
+
+
+def _chart_response(chart_bytes: bytes) -> HttpResponse:
+    """
+    Charts are addressed by the text's digest, so the image for a given text
+    never changes and the browser can keep it, revalidating with the ETag.
+    It stays private: the digest says what the user's text is about. Only
+    the PNG gets these headers, not the 404 for an unknown digest.
+    """
+
+    response = HttpResponse(chart_bytes, content_type="image/png")
+    patch_cache_control(response, private=True, max_age=settings.CHART_CACHE_MAX_AGE)
+    return response
+
+
+@login_required
+def word_frequency_chart(request, digest):
+    """
+    A thin wrapper that looks up an analysis by its digest
+    and returns a (cached) PNG from the service layer.
+    """
+
+    # Charts are cached per digest for everyone, so check ownership first;
+    # that also keeps unknown digests from getting a 304.
+    if not word_selectors.user_has_analysis(request.user, digest):
+        return HttpResponse("Unknown analysis", status=404)
+    return _owned_chart(request, digest)
+
+
+@condition(etag_func=lambda request, digest: chart_cache.chart_etag(digest))
+def _owned_chart(request, digest):
+    chart_bytes = chart_cache.get_chart(digest)
+    if chart_bytes is None:
+        top_words = get_top_words(digest, request.user)
+        if top_words is None:
+            return HttpResponse("Unknown analysis", status=404)
+
+        chart_bytes = charts.render_frequency_chart(top_words)
+        chart_cache.store_chart(digest, chart_bytes)
+
+    return _chart_response(chart_bytes)
+
+
+@login_required
+def analytics(request):
+    """Vault-wide trends for the user, read from the DuckDB corpus mirror."""
+
+    try:
+        context = {"analytics": corpus_analytics.get_user_analytics(request.user)}
+    except corpus_analytics.CorpusBusy:
+        # A sync holds the file for a moment; that's no reason for a 500.
+        context = {"analytics": None, "busy": True}
+    if context["analytics"] and context["analytics"]["synced_at"]:
+        context["synced_at"] = datetime.fromtimestamp(
+            context["analytics"]["synced_at"], tz=UTC
+        )
+    return render(request, "counter/analytics.html", context)
 
 
 @login_required
@@ -211,8 +508,23 @@ def history(request):
     """
 
     query = request.GET.get("q", "")
-    records = word_selectors.get_user_history(request.user, query)
-    return render(request, "counter/history.html", {"records": records})
+    page = word_selectors.get_history_page(
+        request.user,
+        query,
+        cursor=request.GET.get("cursor"),
+        direction=request.GET.get("dir", "older"),
+    )
+    context = {
+        "records": page["records"],
+        "newer_cursor": page["newer"],
+        "older_cursor": page["older"],
+        "query": query,
+        # Kept up to date as records come and go, so these are cheap reads.
+        "top_words": word_aggregates.get_top_words(request.user),
+        "vocabulary": word_aggregates.get_vocabulary_stats(request.user),
+    }
+    with timing.stage("render"):
+        return render(request, "counter/history.html", context)
 
 
 @login_required
@@ -223,7 +535,14 @@ def history_detail(request, pk):
     """
 
     record = word_selectors.get_record_for_user(request.user, pk)
-    return render(request, "counter/analysis_detail.html", {"record": record})
+    return render(
+        request,
+        "counter/analysis_detail.html",
+        {
+            "record": record,
+            "similar_records": similarity_index.find_similar_records(record),
+        },
+    )
 
 
 @login_required
@@ -239,35 +558,3 @@ def delete_analysis(request, pk):
         messages.success(request, "Record deleted successfully!")
     # Send the user back to the history list regardless of the outcome
     return redirect("counter:history")
-
-
-def get_value_matches(word_list):
-    """Connects to DuckDB and returns a list of dictionaries
-    for words that exist in our "origins" table"""
-
-    db_path = os.path.join(settings.BASE_DIR, "word_vault_analytics.duckdb")
-
-    # Use a context manager to handle the connection safely.
-    with duckdb.connect(db_path, read_only=True) as con:
-        # Lets us pass a python list directly.
-        results = con.execute(
-            """
-            SELECT word, root, country, lat, lng, fact
-            FROM origins
-            WHERE word IN ?
-        """,
-            [word_list],
-        ).fetchall()
-
-    # Turn the raw tuples into a clean list of dicts for our JS map.
-    return [
-        {
-            "word": r[0],
-            "root": r[1],
-            "country": r[2],
-            "lat": r[3],
-            "lng": r[4],
-            "fact": r[5],
-        }
-        for r in results
-    ]
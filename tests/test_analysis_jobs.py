@@ -0,0 +1,134 @@
+import json
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from counter.models import AnalysisRecord
+from counter.services import analysis_jobs
+
+
+@pytest.fixture(autouse=True)
+def jobs_dir(settings, tmp_path, mocker):
+    """Keep job files out of the real media folder."""
+
+    settings.ANALYSIS_JOBS_DIR = tmp_path / "analysis_jobs"
+    mocker.patch("counter.services.streaming_analysis.get_value_matches", return_value=[])
+
+
+def parse_events(response):
+    return parse_events_body(b"".join(response.streaming_content).decode())
+
+
+def parse_events_body(body):
+    """(event, data) pairs of a server-sent event stream, keep-alives skipped."""
+
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+# Jobs save from a pool thread with its own database connection,
+# so these tests need committed data rather than a test transaction.
+@pytest.mark.django_db(transaction=True)
+def test_upload_is_analyzed_in_background_with_streamed_progress(client):
+    """Start a job, follow its events to the end, then open the result."""
+
+    User.objects.create_user(username='patient', password='password123')
+    client.login(username='patient', password='password123')
+
+    text = "Progress streams to the page. Nobody stares at a spinner. " * 200
+    upload = SimpleUploadedFile("notes.txt", text.encode(), content_type="text/plain")
+    start = client.post(reverse('counter:analysis_job_start'), {"file": upload})
+    assert start.status_code == 202
+    job = start.json()
+    assert job["unit"] == "blocks"
+
+    events = client.get(job["events_url"])
+    assert events["Content-Type"] == "text/event-stream"
+    stream = parse_events(events)
+    name, final = stream[-1]
+    assert name == "done"
+    assert all(event == "progress" for event, _ in stream[:-1])
+    assert final["summary"] and final["extracted"] == 1
+
+    record = AnalysisRecord.objects.get()
+    assert final["record_id"] == record.pk
+    assert record.original_text == text
+    assert final["words"] == record.word_count
+
+    finish = client.post(job["finish_url"])
+    assert finish.json()["redirect_url"] == reverse('counter:home')
+    assert client.session["analysis_record_id"] == record.pk
+    assert client.get(reverse('counter:home')).context["word_count"] == record.word_count
+
+
+@pytest.mark.django_db(transaction=True)
+def test_failed_and_foreign_jobs(client):
+    """Unreadable uploads fail through the stream; other users' jobs don't exist."""
+
+    User.objects.create_user(username='owner', password='password123')
+    User.objects.create_user(username='snoop', password='password123')
+    client.login(username='owner', password='password123')
+
+    upload = SimpleUploadedFile("image.png", b"\x89PNG", content_type="image/png")
+    job = client.post(reverse('counter:analysis_job_start'), {"file": upload}).json()
+
+    name, data = parse_events(client.get(job["events_url"]))[-1]
+    assert name == "failed"
+    assert "Unsupported file type" in data["error"]
+    assert client.post(job["finish_url"]).status_code == 409
+    assert not AnalysisRecord.objects.exists()
+
+    client.login(username='snoop', password='password123')
+    name, data = parse_events(client.get(job["events_url"]))[-1]
+    assert (name, data["error"]) == ("failed", "Unknown analysis job")
+    assert client.post(job["finish_url"]).status_code == 404
+
+
+@pytest.mark.django_db
+def test_sync_streams_are_short_and_stuck_jobs_fail(client, settings):
+    """The sync stream ends early for EventSource to reconnect; stalled jobs end it for good."""
+
+    settings.ANALYSIS_JOB_STREAM_SECONDS = 0.3
+    user = User.objects.create_user(username='waiting', password='password123')
+    client.login(username='waiting', password='password123')
+
+    # A job that never gets picked up, as after a restart.
+    job = {"id": "0" * 32, "user_id": user.pk, "status": "queued", "stage": "queued",
+           "unit": "blocks", "extracted": 0, "words": 0, "summary": None,
+           "record_id": None, "error": ""}
+    analysis_jobs._write_state(job)
+    events_url = reverse('counter:analysis_job_events', args=[job["id"]])
+
+    response = client.get(events_url)
+    body = b"".join(response.streaming_content).decode()
+    assert body.startswith(f"retry: {analysis_jobs.SSE_RETRY_MS}")
+    assert [name for name, _ in parse_events_body(body)] == ["progress"]
+
+    settings.ANALYSIS_JOB_TIMEOUT = 0
+    time.sleep(0.01)
+    name, data = parse_events(client.get(events_url))[-1]
+    assert (name, data["error"]) == ("failed", "The analysis stopped responding")
+
+
+@pytest.mark.django_db
+def test_bugs_end_the_job_but_are_not_swallowed(mocker):
+    """Only upload problems are ordinary failures; anything else is re-raised."""
+
+    user = User.objects.create_user(username='crasher', password='password123')
+    mocker.patch.object(analysis_jobs.StreamingAnalyzer, "feed", side_effect=TypeError("bug"))
+    job = {"id": "1" * 32, "user_id": user.pk, "title": "Manual Entry", "status": "queued",
+           "stage": "queued", "unit": "blocks", "extracted": 0, "words": 0, "summary": None,
+           "record_id": None, "error": ""}
+
+    with pytest.raises(TypeError):
+        analysis_jobs._run_job(job, user, "Some text.", keep_text=True)
+
+    state = analysis_jobs.get_job(job["id"], user)
+    assert (state["status"], state["error"]) == ("failed", "Internal error")
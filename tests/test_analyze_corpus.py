@@ -0,0 +1,53 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from docx import Document
+
+from counter.models import AnalysisRecord
+from counter.services import batch, word_selectors
+
+
+@pytest.mark.django_db
+def test_analyze_corpus_bulk_inserts_and_skips_known_texts(tmp_path, capsys):
+    user = User.objects.create_user(username="archivist", password="pw")
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "a.txt").write_text("Alpha documents arrive first. They are short.")
+    (tmp_path / "nested" / "b.txt").write_text("Beta documents come later. Nobody reads them.")
+    (tmp_path / "copy.txt").write_text("Alpha documents arrive first. They are short.")
+    (tmp_path / "broken.pdf").write_bytes(b"not really a pdf")
+    (tmp_path / "notes.md").write_text("Ignored: not a supported type.")
+    document = Document()
+    document.add_paragraph("Gamma lives in a Word file.")
+    document.save(tmp_path / "c.docx")
+
+    call_command("analyze_corpus", str(tmp_path), user="archivist", workers=2, batch_size=2)
+
+    records = AnalysisRecord.objects.filter(user=user)
+    assert sorted(records.values_list("title", flat=True)) == ["a.txt", "b.txt", "c.docx"]
+    alpha = records.get(title="a.txt")
+    assert alpha.word_count == 7
+    assert alpha.summary.startswith("Alpha documents arrive first.")
+    assert alpha.preview.startswith("Alpha")
+
+    output = capsys.readouterr()
+    assert "Stored 3 records (1 duplicates skipped, 1 failed)" in output.out
+    assert "docs/s" in output.out and "MB/s" in output.out
+    assert "broken.pdf" in output.err
+
+    # Bulk-inserted records are indexed for search like any other.
+    assert [r.title for r in word_selectors.get_user_history(user, "gamma")] == ["c.docx"]
+
+    # A second run stores nothing new.
+    call_command("analyze_corpus", str(tmp_path), user="archivist", workers=1)
+    assert AnalysisRecord.objects.filter(user=user).count() == 3
+
+
+def test_bad_files_fail_alone_but_bugs_propagate(mocker):
+    """Damaged documents become errors; a programming error is not hidden."""
+
+    outcome = batch.analyze_blob(("broken.docx", b"not a zip"))
+    assert outcome["error"] == "File is not a zip file"
+
+    mocker.patch("counter.services.batch.generate_summary", side_effect=TypeError("bug"))
+    with pytest.raises(TypeError):
+        batch.analyze_blob(("fine.txt", b"Perfectly readable text."))
@@ -0,0 +1,111 @@
+import importlib
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth.models import User
+from django.urls import clear_url_caches, resolve, reverse
+
+from counter.models import AnalysisRecord
+
+
+def _reload_urls():
+    import counter.urls
+    import wordcounterapp.urls
+
+    importlib.reload(counter.urls)
+    importlib.reload(wordcounterapp.urls)
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_urls(settings, tmp_path):
+    """Route the heavy views to their async versions for one test."""
+
+    settings.USE_ASYNC_VIEWS = True
+    settings.REPORT_CACHE_DIR = tmp_path / "report_cache"
+    _reload_urls()
+    yield
+    settings.USE_ASYNC_VIEWS = False
+    _reload_urls()
+
+
+# The executor threads use their own database connections,
+# so these tests need committed data rather than a test transaction.
+@pytest.mark.django_db(transaction=True)
+def test_async_views_analyze_save_and_export(async_urls, async_client, mocker):
+    """Under USE_ASYNC_VIEWS the home page and exports run as coroutines."""
+
+    mocker.patch("counter.services.analysis_cache.get_value_matches", return_value=[])
+    user = User.objects.create_user(username='async', password='password123')
+    async_to_sync(async_client.aforce_login)(user)
+
+    url = reverse('counter:home')
+    assert iscoroutinefunction(resolve(url).func)
+
+    text = "Async views keep the loop free. The executor does the work. " * 20
+    response = async_to_sync(async_client.post)(url, {"texttocount": text})
+    assert response.status_code == 302
+
+    record = AnalysisRecord.objects.get(user=user)
+    page = async_to_sync(async_client.get)(url)
+    assert page.status_code == 200
+    assert page.context["word_count"] == record.word_count
+    assert "render;" in page["Server-Timing"]
+
+    export = async_to_sync(async_client.get)(reverse('counter:export_docx'))
+    assert export.content.startswith(b"PK")
+    assert "analysis_report.docx" in export["Content-Disposition"]
+
+    chart = async_to_sync(async_client.get)(
+        reverse('counter:chart', kwargs={'digest': record.content_hash})
+    )
+    assert chart["Content-Type"] == "image/png"
+    assert chart["ETag"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_views_still_check_ownership(async_urls, async_client):
+    """Another user's record is a 404, and anonymous users are sent to log in."""
+
+    owner = User.objects.create_user(username='owner', password='password123')
+    record = AnalysisRecord.objects.create(
+        user=owner, title="Private", original_text="Mine only.", word_count=2
+    )
+
+    assert async_to_sync(async_client.get)(reverse('counter:home')).status_code == 302
+
+    other = User.objects.create_user(username='other', password='password123')
+    async_to_sync(async_client.aforce_login)(other)
+    response = async_to_sync(async_client.get)(
+        reverse('counter:export_pdf_by_id', kwargs={'pk': record.pk})
+    )
+    assert response.status_code == 404
+
+    chart = async_to_sync(async_client.get)(
+        reverse('counter:chart', kwargs={'digest': record.content_hash})
+    )
+    assert chart.status_code == 404
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_analysis_progress_stream(async_urls, async_client, settings, tmp_path, mocker):
+    """Under USE_ASYNC_VIEWS the progress events come from an async generator."""
+
+    settings.ANALYSIS_JOBS_DIR = tmp_path / "analysis_jobs"
+    mocker.patch("counter.services.streaming_analysis.get_value_matches", return_value=[])
+    user = User.objects.create_user(username='streamer', password='password123')
+    async_to_sync(async_client.aforce_login)(user)
+
+    start = async_to_sync(async_client.post)(
+        reverse('counter:analysis_job_start'), {"texttocount": "Stream me. " * 100}
+    )
+    events_url = start.json()["events_url"]
+    assert iscoroutinefunction(resolve(events_url).func)
+
+    async def read_stream():
+        response = await async_client.get(events_url)
+        return "".join([part.decode() async for part in response.streaming_content])
+
+    body = async_to_sync(read_stream)()
+    assert "event: done" in body
+    assert AnalysisRecord.objects.filter(user=user).count() == 1
@@ -0,0 +1,127 @@
+import io
+import zipfile
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from counter.models import AnalysisRecord
+
+
+def make_zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+@pytest.mark.django_db
+def test_bulk_upload_accepts_files_and_zips(client, settings):
+    settings.BULK_UPLOAD_WORKERS = 2
+    settings.BULK_UPLOAD_BATCH_SIZE = 2
+    user = User.objects.create_user(username="bulk", password="pw")
+    client.login(username="bulk", password="pw")
+
+    archive = make_zip({
+        "docs/one.txt": "First zipped text. It is short.",
+        "docs/two.txt": "Second zipped text. Also short.",
+        "docs/image.png": "not a document",
+        "__MACOSX/docs/._one.txt": "resource fork",
+    })
+    files = [
+        SimpleUploadedFile("loose.txt", b"A loose file. Uploaded alongside."),
+        SimpleUploadedFile("notes.rtf", b"{\\rtf1 not supported}"),
+        SimpleUploadedFile("again.txt", b"First zipped text. It is short."),
+        SimpleUploadedFile("bundle.zip", archive),
+    ]
+
+    response = client.post(
+        reverse("counter:bulk_upload"), {"files": files}, HTTP_ACCEPT="application/json"
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    # In upload order, skipped entries included.
+    assert [r["name"] for r in results] == [
+        "loose.txt", "notes.rtf", "again.txt", "bundle.zip/docs/one.txt",
+        "bundle.zip/docs/two.txt", "bundle.zip/docs/image.png",
+    ]
+    assert [r["status"] for r in results] == [
+        "created", "unsupported", "created", "duplicate", "created", "unsupported",
+    ]
+    assert AnalysisRecord.objects.filter(user=user).count() == 3
+
+
+@pytest.mark.django_db
+def test_bulk_upload_statuses_stay_with_their_files(client, settings):
+    """Failures and in-batch duplicates don't jump ahead of created files."""
+
+    settings.BULK_UPLOAD_WORKERS = 1
+    settings.BULK_UPLOAD_BATCH_SIZE = 10
+    User.objects.create_user(username="orderly", password="pw")
+    client.login(username="orderly", password="pw")
+
+    files = [
+        SimpleUploadedFile("one.txt", b"Identical words. Twice over."),
+        SimpleUploadedFile("empty.txt", b"   "),
+        SimpleUploadedFile("two.txt", b"Identical words. Twice over."),
+        SimpleUploadedFile("three.txt", b"Something else entirely."),
+    ]
+    response = client.post(
+        reverse("counter:bulk_upload"), {"files": files}, HTTP_ACCEPT="application/json"
+    )
+
+    results = response.json()["results"]
+    assert [(r["name"], r["status"]) for r in results] == [
+        ("one.txt", "created"),
+        ("empty.txt", "failed"),
+        ("two.txt", "duplicate"),
+        ("three.txt", "created"),
+    ]
+    assert results[0]["record_id"] and results[3]["record_id"]
+
+
+@pytest.mark.django_db
+def test_bulk_upload_skips_damaged_zip_entries(client):
+    """A corrupted entry fails on its own; the rest of the archive is stored."""
+
+    User.objects.create_user(username="damaged", password="pw")
+    client.login(username="damaged", password="pw")
+
+    archive = make_zip({"good.txt": "Intact text. Still readable.", "bad.txt": "Corrupted text."})
+    # Flip a byte of bad.txt's stored data so its CRC no longer matches.
+    offset = archive.index(b"Corrupted text.")
+    archive = archive[:offset] + b"X" + archive[offset + 1:]
+
+    response = client.post(
+        reverse("counter:bulk_upload"),
+        {"files": [SimpleUploadedFile("damaged.zip", archive)]},
+        HTTP_ACCEPT="application/json",
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(r["name"], r["status"]) for r in results] == [
+        ("damaged.zip/good.txt", "created"),
+        ("damaged.zip/bad.txt", "failed"),
+    ]
+    assert "Bad CRC-32" in results[1]["error"]
+
+
+@pytest.mark.django_db
+def test_bulk_upload_enforces_limits(client, settings):
+    settings.BULK_UPLOAD_MAX_BYTES = 10
+    User.objects.create_user(username="greedy", password="pw")
+    client.login(username="greedy", password="pw")
+
+    archive = make_zip({"big.txt": "x" * 1000})
+    response = client.post(
+        reverse("counter:bulk_upload"),
+        {"files": [SimpleUploadedFile("bomb.zip", archive)]},
+    )
+
+    assert response.status_code == 400
+    assert "too large" in response.context["error"]
+    assert AnalysisRecord.objects.count() == 0
@@ -0,0 +1,29 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest  # noqa
+
+from counter.services.charts import render_frequency_chart
+
+FREQ = [("code", 9), ("vault", 7), ("words", 4), ("origin", 2)]
+
+
+def test_render_frequency_chart_returns_png():
+    """The chart renderer should produce PNG bytes."""
+
+    png = render_frequency_chart(FREQ)
+    assert png.startswith(b"\x89PNG")
+
+
+def test_render_frequency_chart_is_thread_safe():
+    """Concurrent renders must not bleed into each other's figures."""
+
+    expected = render_frequency_chart(FREQ)
+    other = render_frequency_chart([("other", 1)])
+
+    # Interleave two different charts across several threads.
+    jobs = [FREQ, [("other", 1)]] * 8
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(render_frequency_chart, jobs))
+
+    assert results[0::2] == [expected] * 8
+    assert results[1::2] == [other] * 8
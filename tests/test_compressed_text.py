@@ -0,0 +1,38 @@
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+
+from counter.fields import CODEC_RAW, CODEC_ZLIB, compress_text, decompress_text
+from counter.models import AnalysisRecord
+
+
+def test_compress_round_trip_and_codec_choice():
+    long_text = "The vault keeps every word. " * 200
+    packed = compress_text(long_text)
+
+    assert packed[:1] == CODEC_ZLIB
+    assert len(packed) < len(long_text) / 10
+    assert decompress_text(packed) == long_text
+
+    # Short text isn't worth compressing, but still round-trips.
+    assert compress_text("héllo")[:1] == CODEC_RAW
+    assert decompress_text(compress_text("héllo")) == "héllo"
+    assert decompress_text(compress_text("")) == ""
+
+
+@pytest.mark.django_db
+def test_original_text_is_stored_compressed():
+    user = User.objects.create_user(username="packer", password="pw")
+    text = "Compression makes the vault smaller. " * 500
+    record = AnalysisRecord.objects.create(
+        user=user, title="Big", original_text=text, word_count=len(text.split())
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT original_text FROM counter_analysisrecord WHERE id = %s", [record.pk]
+        )
+        [(stored,)] = cursor.fetchall()
+    assert len(stored) < len(text) / 10
+
+    assert AnalysisRecord.objects.get(pk=record.pk).original_text == text
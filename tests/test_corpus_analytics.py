@@ -0,0 +1,93 @@
+import subprocess
+import sys
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+
+from counter.models import AnalysisRecord
+from counter.services import corpus_analytics
+
+
+@pytest.fixture(autouse=True)
+def corpus_path(settings, tmp_path):
+    settings.CORPUS_DUCKDB_PATH = tmp_path / "corpus.duckdb"
+
+
+def make_record(user, text, ttr=0.5, passive=0):
+    return AnalysisRecord.objects.create(
+        user=user, title="Doc", original_text=text,
+        word_count=len(text.split()), ttr=ttr, passive_count=passive,
+    )
+
+
+@pytest.mark.django_db
+def test_sync_is_incremental_and_handles_deletes():
+    user = User.objects.create_user(username="analyst", password="pw")
+    other = User.objects.create_user(username="other", password="pw")
+    first = make_record(user, "Rivers flow. Rivers bend. Mountains stand.", ttr=0.4, passive=1)
+    make_record(user, "Rivers again and rivers forever.", ttr=0.6, passive=1)
+    make_record(other, "Mountains mountains mountains.")
+
+    assert corpus_analytics.sync_corpus() == {"added": 3, "deleted": 0}
+    assert corpus_analytics.sync_corpus() == {"added": 0, "deleted": 0}
+
+    analytics = corpus_analytics.get_user_analytics(user)
+    assert analytics["documents"] == 2
+    assert analytics["top_words"][0] == {"word": "rivers", "count": 4, "documents": 2}
+    assert analytics["average_ttr"] == pytest.approx(0.5)
+    assert [m["passive_count"] for m in analytics["months"]] == [2]
+
+    first.delete()
+    assert corpus_analytics.sync_corpus() == {"added": 0, "deleted": 1}
+    analytics = corpus_analytics.get_user_analytics(user)
+    assert analytics["documents"] == 1
+    assert analytics["top_words"][0] == {"word": "rivers", "count": 2, "documents": 1}
+
+
+@pytest.mark.django_db
+def test_analytics_view_before_and_after_sync(client):
+    user = User.objects.create_user(username="viewer", password="pw")
+    make_record(user, "Comets glow. Comets fade.")
+    client.login(username="viewer", password="pw")
+    url = reverse("counter:analytics")
+
+    assert "sync_corpus" in client.get(url).content.decode()
+
+    call_command("sync_corpus")
+    response = client.get(url)
+    assert response.context["analytics"]["top_words"][0]["word"] == "comets"
+
+
+@pytest.mark.django_db
+def test_analytics_view_while_another_process_syncs(client, settings):
+    """A writer in another process locks the file; the page says so instead of failing."""
+
+    user = User.objects.create_user(username="waiter", password="pw")
+    make_record(user, "Comets glow. Comets fade.")
+    corpus_analytics.sync_corpus()
+    client.login(username="waiter", password="pw")
+
+    writer = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            (
+                "import duckdb, sys, time; con = duckdb.connect(sys.argv[1]); "
+                "print('locked', flush=True); time.sleep(30)"
+            ),
+            str(settings.CORPUS_DUCKDB_PATH),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        assert writer.stdout.readline().strip() == "locked"
+        response = client.get(reverse("counter:analytics"))
+    finally:
+        writer.kill()
+        writer.wait()
+
+    assert response.status_code == 200
+    assert response.context["busy"]
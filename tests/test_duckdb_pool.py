@@ -0,0 +1,81 @@
+import subprocess
+import sys
+import threading
+import time
+
+import duckdb
+import pytest
+
+from counter.services import duckdb_pool
+from counter.services.duckdb_pool import ReadPool
+
+
+@pytest.fixture
+def analytics_db(tmp_path):
+    """A small DuckDB file shaped like the origins vault."""
+
+    db_path = tmp_path / "analytics.duckdb"
+    with duckdb.connect(str(db_path)) as con:
+        con.execute("CREATE TABLE origins (word VARCHAR, country VARCHAR)")
+        con.execute("INSERT INTO origins VALUES ('house', 'Germany'), ('logic', 'Greece')")
+    return db_path
+
+
+def test_busy_threads_share_one_connection_and_are_timed(analytics_db):
+    """Queries close together reuse the connection; each label gets its timings."""
+
+    pool = ReadPool(analytics_db, idle_seconds=5)
+    counts = []
+
+    def worker():
+        for _ in range(5):
+            counts.append(pool.query("SELECT count(*) FROM origins", label="count")[0][0])
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert counts == [2] * 20
+    assert pool.connects == 1
+    stats = pool.metrics()["queries"]["count"]
+    assert stats["calls"] == 20
+    assert stats["max_ms"] >= stats["avg_ms"] > 0
+    pool.close()
+
+
+def test_idle_pool_lets_writers_in(analytics_db, settings):
+    """Once idle, the file is released for a writer in another process."""
+
+    settings.DUCKDB_WRITE_WAIT_SECONDS = 0
+    pool = ReadPool(analytics_db, idle_seconds=0.2)
+    assert pool.query("SELECT country FROM origins WHERE word = ?", ["logic"]) == [("Greece",)]
+
+    write = [
+        sys.executable, "-c",
+        "import duckdb, sys; duckdb.connect(sys.argv[1]).execute('DELETE FROM origins')",
+        str(analytics_db),
+    ]
+    # While the connection is kept for the next query, writers are locked out...
+    assert subprocess.run(write, capture_output=True, check=False).returncode != 0
+    time.sleep(0.5)
+    # ...but not once it has been idle.
+    subprocess.run(write, check=True)
+    assert pool.query("SELECT count(*) FROM origins") == [(0,)]
+    assert pool.connects == 2
+    pool.close()
+
+
+def test_writer_in_this_process_closes_its_readers(analytics_db, settings):
+    """DuckDB won't mix configurations in one process, so readers go first."""
+
+    settings.DUCKDB_READ_IDLE_SECONDS = 60
+    pool = duckdb_pool.get_pool(analytics_db)
+    pool.query("SELECT 1")
+
+    with duckdb_pool.connect_writer(analytics_db) as con:
+        con.execute("INSERT INTO origins VALUES ('tea', 'China')")
+
+    assert pool.query("SELECT count(*) FROM origins") == [(3,)]
+    pool.close()
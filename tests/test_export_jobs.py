@@ -0,0 +1,118 @@
+import json
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from counter.models import AnalysisRecord
+from counter.services import export_jobs
+
+
+@pytest.fixture(autouse=True)
+def jobs_dir(settings, tmp_path):
+    """Keep job files out of the real media folder."""
+
+    settings.EXPORT_JOBS_DIR = tmp_path / "export_jobs"
+    settings.REPORT_CACHE_DIR = tmp_path / "report_cache"
+
+
+def poll(client, url, timeout=10):
+    """Poll a job's status the way the page does, until it finishes."""
+
+    deadline = time.monotonic() + timeout
+    while True:
+        status = client.get(url).json()
+        if status["status"] not in ("queued", "running") or time.monotonic() > deadline:
+            return status
+        time.sleep(0.05)
+
+
+@pytest.mark.django_db
+def test_export_job_runs_in_background_and_downloads(client):
+    """Submit an export, wait for it, then download the finished file."""
+
+    user = User.objects.create_user(username='author', password='password123')
+    record = AnalysisRecord.objects.create(
+        user=user, title="Report", original_text="Export me please.", word_count=3
+    )
+    client.login(username='author', password='password123')
+
+    start = client.post(
+        reverse('counter:export_job_start_by_id', kwargs={'export_format': 'docx', 'pk': record.pk})
+    )
+    assert start.status_code == 202
+    job = start.json()
+
+    status = poll(client, job["status_url"])
+    assert status["status"] == "done"
+
+    download = client.get(job["download_url"])
+    assert download["Content-Disposition"].startswith("attachment")
+    # DOCX files are zip archives.
+    assert b"".join(download.streaming_content).startswith(b"PK")
+
+
+@pytest.mark.django_db
+def test_export_jobs_are_private(client):
+    """Another user must not be able to see or download someone's export."""
+
+    owner = User.objects.create_user(username='owner', password='password123')
+    User.objects.create_user(username='snoop', password='password123')
+    record = AnalysisRecord.objects.create(
+        user=owner, title="Private", original_text="Secret stuff.", word_count=2
+    )
+
+    client.login(username='owner', password='password123')
+    job = client.post(
+        reverse('counter:export_job_start_by_id', kwargs={'export_format': 'docx', 'pk': record.pk})
+    ).json()
+
+    client.login(username='snoop', password='password123')
+    assert client.get(job["status_url"]).status_code == 404
+    assert client.get(job["download_url"]).status_code == 404
+    # Made-up ids (or path tricks) are rejected too.
+    assert client.get(reverse('counter:export_job_status', args=['..%2Fsecret'])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_stale_and_purged_jobs(client, settings):
+    """Jobs left unfinished by a dead worker fail; purged files are a 404."""
+
+    user = User.objects.create_user(username='author', password='password123')
+    record = AnalysisRecord.objects.create(
+        user=user, title="Report", original_text="Export me please.", word_count=3
+    )
+    client.login(username='author', password='password123')
+    job = client.post(
+        reverse('counter:export_job_start_by_id', kwargs={'export_format': 'docx', 'pk': record.pk})
+    ).json()
+    assert poll(client, job["status_url"])["status"] == "done"
+
+    # The file is purged between the status check and the download.
+    state = export_jobs.get_job(job["job_id"], user)
+    export_jobs.artifact_path(state).unlink()
+    assert client.get(job["download_url"]).status_code == 404
+
+    # A job its worker never picked up, from before a restart.
+    orphan = {**state, "id": "0" * 32, "status": "queued", "created_at": time.time() - 3600}
+    (settings.EXPORT_JOBS_DIR / f"{orphan['id']}.json").write_text(json.dumps(orphan))
+    status = client.get(reverse('counter:export_job_status', args=[orphan["id"]])).json()
+    assert (status["status"], status["error"]) == ("failed", "Export timed out")
+
+
+def test_render_errors_fail_the_job_and_bugs_are_raised(mocker):
+    """A document that can't be written is a failed job; a bug is not hidden."""
+
+    job = {"id": "2" * 32, "user_id": 1, "format": "pdf", "status": "queued", "error": ""}
+    formats = mocker.patch.dict(
+        export_jobs.EXPORT_FORMATS,
+        {"pdf": (mocker.Mock(side_effect=OSError("disk full")), "application/pdf", "r.pdf")},
+    )
+    export_jobs._run_job(job, {})
+    assert export_jobs._read_state(job["id"])["error"] == "disk full"
+
+    formats["pdf"][0].side_effect = TypeError("bug")
+    with pytest.raises(TypeError):
+        export_jobs._run_job(job, {})
+    assert export_jobs._read_state(job["id"])["error"] == "Internal error"
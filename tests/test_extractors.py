@@ -1,6 +1,53 @@
-import pytest #noqa
+import zipfile
+from io import BytesIO
+
+import pytest  #noqa
 from django.core.files.uploadedfile import SimpleUploadedFile
-from counter.services.text_extractors import get_text_from_uploaded_file
+from docx import Document
+
+from counter.services.text_extractors import (
+    get_text_from_uploaded_file,
+    iter_docx_paragraphs,
+    iter_pdf_pages,
+)
+
+
+def make_pdf(page_texts):
+    """Build a minimal PDF with one line of Helvetica text per page."""
+
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    # The page tree comes right after every content stream and page object.
+    pages_id = len(objects) + 1 + 2 * len(page_texts)
+    kids = []
+    for text in page_texts:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        kids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (pages_id, font, content)
+        ))
+    add(b"<< /Type /Pages /Kids [%s] /Count %d >>"
+        % (b" ".join(b"%d 0 R" % k for k in kids), len(kids)))
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog, xref)
+    return bytes(out)
 
 
 def test_extract_text_from_simple_text():
@@ -33,3 +80,77 @@ def test_extract_text_from_unsupported_file():
 
     # This confirms the else logic in the view will trigger correctly.
     assert extracted_text == "" or extracted_text is None
+
+
+def test_pdf_pages_stream_in_order(settings):
+    """Pages are yielded one by one, in order, in-process or from the pool."""
+
+    settings.PDF_PARALLEL_MIN_PAGES = 4
+    data = make_pdf([f"Filing page {i}" for i in range(1, 9)])
+
+    in_process = list(iter_pdf_pages(SimpleUploadedFile("f.pdf", data), workers=1))
+    in_pool = list(iter_pdf_pages(SimpleUploadedFile("f.pdf", data), workers=2))
+
+    assert [p["page"] for p in in_pool] == list(range(1, 9))
+    assert [p["text"] for p in in_pool] == [p["text"] for p in in_process]
+    assert "Filing page 8" in in_pool[-1]["text"]
+    assert all(p["seconds"] >= 0 for p in in_pool)
+
+
+def test_pdf_page_limit():
+    """Only the first max_pages pages are extracted."""
+
+    data = make_pdf(["One", "Two", "Three"])
+    pages = list(iter_pdf_pages(SimpleUploadedFile("f.pdf", data), max_pages=2))
+
+    assert [p["text"].strip() for p in pages] == ["One", "Two"]
+    assert get_text_from_uploaded_file(SimpleUploadedFile("f.pdf", data)).split() == [
+        "One", "Two", "Three"
+    ]
+
+
+def test_docx_extraction_includes_tables():
+    """Paragraphs and table cells are both streamed out of the document."""
+
+    document = Document()
+    document.add_paragraph("Contract terms")
+    document.add_paragraph("   ")
+    table = document.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = "Party A"
+    table.cell(0, 1).text = "Party B"
+    buffer = BytesIO()
+    document.save(buffer)
+
+    fake_file = SimpleUploadedFile("contract.docx", buffer.getvalue())
+    extracted_text = get_text_from_uploaded_file(fake_file)
+
+    # Blank paragraphs are skipped, table text is no longer dropped.
+    assert extracted_text == "Contract terms\nParty A\nParty B"
+
+
+def test_docx_paragraphs_match_python_docx_text():
+    """Text boxes count once, tab stops aren't text, page breaks aren't newlines."""
+
+    body = (
+        '<w:p><w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/></w:tabs></w:pPr>'
+        '<w:r><w:t>Before</w:t><w:br w:type="page"/><w:t>after</w:t></w:r>'
+        '<w:r><w:tab/><w:t>line</w:t><w:br/><w:t>two</w:t></w:r></w:p>'
+        '<w:p><w:r><mc:AlternateContent>'
+        '<mc:Choice Requires="wps"><w:drawing><w:txbxContent>'
+        '<w:p><w:r><w:t>Boxed</w:t></w:r></w:p>'
+        '</w:txbxContent></w:drawing></mc:Choice>'
+        '<mc:Fallback><w:pict><w:txbxContent>'
+        '<w:p><w:r><w:t>Boxed</w:t></w:r></w:p>'
+        '</w:txbxContent></w:pict></mc:Fallback>'
+        '</mc:AlternateContent></w:r></w:p>'
+    )
+    xml = (
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+        ' xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006">'
+        f"<w:body>{body}</w:body></w:document>"
+    )
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", xml)
+
+    assert list(iter_docx_paragraphs(buffer)) == ["Beforeafter\tline\ntwo", "Boxed", ""]
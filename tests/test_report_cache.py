@@ -0,0 +1,105 @@
+import os
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from counter.models import AnalysisRecord
+from counter.services import exporters, report_cache
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(settings, tmp_path):
+    """Keep cached reports out of the real media folder."""
+
+    settings.REPORT_CACHE_DIR = tmp_path / "report_cache"
+    return settings.REPORT_CACHE_DIR
+
+
+@pytest.mark.django_db
+def test_vault_reports_are_rendered_once(client, mocker, cache_dir):
+    """Repeat downloads are served from disk; deleting the record drops them."""
+
+    user = User.objects.create_user(username='archivist', password='password123')
+    record = AnalysisRecord.objects.create(
+        user=user, title="Filing", original_text="Cache this report.", word_count=3
+    )
+    client.login(username='archivist', password='password123')
+    render = mocker.spy(exporters, "generate_docx_report")
+
+    url = reverse('counter:export_docx_by_id', kwargs={'pk': record.pk})
+    first = b"".join(client.get(url).streaming_content)
+    second = b"".join(client.get(url).streaming_content)
+
+    assert first == second
+    assert render.call_count == 1
+    assert len(list(cache_dir.iterdir())) == 1
+
+    record.delete()
+    assert list(cache_dir.iterdir()) == []
+
+
+@pytest.mark.django_db
+def test_report_evicted_before_it_is_opened_is_rendered_again(client, mocker):
+    """Another request may evict the file between the lookup and the open."""
+
+    user = User.objects.create_user(username='racer', password='password123')
+    record = AnalysisRecord.objects.create(
+        user=user, title="Race", original_text="Evict me quickly.", word_count=3
+    )
+    client.login(username='racer', password='password123')
+    render = mocker.spy(exporters, "generate_docx_report")
+
+    lookup = report_cache.get_or_render_report
+
+    def evicted_right_after(*args):
+        path = lookup(*args)
+        path.unlink()
+        return path
+
+    mocker.patch.object(report_cache, "get_or_render_report", side_effect=evicted_right_after)
+    response = client.get(reverse('counter:export_docx_by_id', kwargs={'pk': record.pk}))
+
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content).startswith(b"PK")
+    assert render.call_count == 2
+
+
+@pytest.mark.django_db
+def test_report_cache_evicts_least_recently_used(settings, cache_dir):
+    """Once over budget, the oldest reports are removed first."""
+
+    settings.REPORT_CACHE_MAX_BYTES = 250
+    user = User.objects.create_user(username='hoarder', password='password123')
+    records = [
+        AnalysisRecord.objects.create(
+            user=user, title=str(i), original_text=f"Text {i}", word_count=2
+        )
+        for i in range(3)
+    ]
+
+    paths = []
+    for record in records:
+        paths.append(report_cache.store_report(record, "pdf", b"x" * 100))
+
+    assert not paths[0].exists()
+    assert paths[1].exists() and paths[2].exists()
+
+
+def test_eviction_spares_reports_being_written(settings, cache_dir):
+    """Another worker's part file survives eviction until it is clearly abandoned."""
+
+    settings.REPORT_CACHE_MAX_BYTES = 0
+    cache_dir.mkdir(parents=True)
+    writing = cache_dir / "1-abc-v1.pdf.0123.part"
+    abandoned = cache_dir / "2-def-v1.pdf.4567.part"
+    writing.write_bytes(b"x" * 100)
+    abandoned.write_bytes(b"x" * 100)
+    old = time.time() - report_cache.PART_GRACE_SECONDS - 1
+    os.utime(abandoned, (old, old))
+
+    report_cache.evict_reports()
+
+    assert writing.exists()
+    assert not abandoned.exists()
@@ -0,0 +1,102 @@
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.urls import reverse
+
+from counter.models import AnalysisRecord
+from counter.services import search_index, word_selectors
+
+
+def make_record(user, title, text):
+    return AnalysisRecord.objects.create(
+        user=user, title=title, original_text=text, word_count=len(text.split())
+    )
+
+
+def test_build_match_query_quotes_words_and_prefixes_last():
+    """User input can't inject FTS5 syntax; the last word matches as a prefix."""
+
+    assert search_index.build_match_query('dragon NEAR "eggs') == '"dragon" "NEAR" "eggs"*'
+    assert search_index.build_match_query("  ** ") is None
+
+
+@pytest.mark.django_db
+def test_search_ranks_title_matches_first_and_highlights():
+    user = User.objects.create_user(username="reader", password="pw")
+    body_only = make_record(user, "Notes", "The comet passed once. Nothing else happened.")
+    in_title = make_record(user, "Comet report", "A bright comet appeared over the hills.")
+
+    records = word_selectors.get_user_history(user, "comet")
+
+    assert [r.pk for r in records] == [in_title.pk, body_only.pk]
+    assert "<mark>comet</mark>" in records[0].snippet
+
+
+@pytest.mark.django_db
+def test_search_index_follows_saves_deletes_and_owners():
+    owner = User.objects.create_user(username="owner", password="pw")
+    other = User.objects.create_user(username="other", password="pw")
+    record = make_record(owner, "Draft", "Glaciers <b>move</b> slowly.")
+    make_record(other, "Theirs", "Glaciers everywhere.")
+
+    # Snippets are escaped before the match is highlighted.
+    [hit] = word_selectors.get_user_history(owner, "glac")
+    assert hit.pk == record.pk
+    assert "&lt;b&gt;" in hit.snippet
+
+    record.original_text = "Deserts are dry."
+    record.save()
+    assert word_selectors.get_user_history(owner, "glaciers") == []
+    assert [r.pk for r in word_selectors.get_user_history(owner, "deserts")] == [record.pk]
+
+    # Saves that leave the title and text alone don't touch the index.
+    record.summary = "Dry."
+    record.save()
+    assert [r.pk for r in word_selectors.get_user_history(owner, "deserts")] == [record.pk]
+
+    record.delete()
+    assert word_selectors.get_user_history(owner, "deserts") == []
+
+
+@pytest.mark.django_db
+def test_history_view_shows_snippets(client):
+    user = User.objects.create_user(username="viewer", password="pw")
+    make_record(user, "Orchard", "Apples ripen in the autumn sun.")
+    client.login(username="viewer", password="pw")
+
+    response = client.get(reverse("counter:history"), {"q": "apples"})
+
+    assert response.status_code == 200
+    assert "<mark>Apples</mark>" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_index_keeps_no_copy_of_the_text():
+    """The FTS table is contentless; the snippet comes from the record."""
+
+    user = User.objects.create_user(username="saver", password="pw")
+    words = " ".join(f"word{i}" for i in range(40))
+    make_record(user, "Long", f"{words} needle {words}")
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT body FROM {search_index.FTS_TABLE}")
+        assert cursor.fetchall() == [(None,)]
+
+    [hit] = word_selectors.get_user_history(user, "need")
+    assert "<mark>needle</mark>" in hit.snippet
+    assert hit.snippet.startswith("...") and hit.snippet.endswith("...")
+    assert len(hit.snippet.split()) == search_index.SNIPPET_WORDS
+
+
+@pytest.mark.django_db
+def test_search_without_fts_still_looks_at_the_whole_text(mocker):
+    """Other databases have no index, but matches past the preview still count."""
+
+    mocker.patch.object(search_index, "is_available", return_value=False)
+    user = User.objects.create_user(username="portable", password="pw")
+    deep = make_record(user, "Notes", "filler " * 50 + "Volcano ahead.")
+    titled = make_record(user, "Volcano trip", "Nothing to see.")
+    make_record(user, "Other", "Calm seas.")
+
+    records = word_selectors.get_user_history(user, "volcano")
+    assert {r.pk for r in records} == {deep.pk, titled.pk}
@@ -0,0 +1,68 @@
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from counter.models import AnalysisRecord, SimilarityBucket
+from counter.services import similarity, similarity_index
+
+DRAFT = " ".join(
+    f"Clause {i} says the tenant pays rent on day {i % 28 + 1} of each month."
+    for i in range(60)
+)
+
+
+def make_record(user, text, title="Doc"):
+    return AnalysisRecord.objects.create(
+        user=user, title=title, original_text=text, word_count=len(text.split())
+    )
+
+
+def test_signatures_estimate_jaccard_similarity():
+    revised = DRAFT.replace("Clause 7 says", "Clause 7 now says")
+    unrelated = "Completely different words about weather, rain and sunshine. " * 20
+
+    signature = similarity.compute_signature(DRAFT)
+    assert len(signature) == similarity.NUM_PERMUTATIONS * 4
+    assert similarity.compute_signature(DRAFT) == signature
+    assert similarity.estimate_similarity(signature, similarity.compute_signature(revised)) > 0.8
+    assert similarity.estimate_similarity(signature, similarity.compute_signature(unrelated)) < 0.1
+    assert similarity.compute_signature("  ...  ") is None
+
+
+def test_signature_does_not_depend_on_block_size(monkeypatch):
+    """Long texts are hashed in blocks; the running minimum gives the same signature."""
+
+    signature = similarity.compute_signature(DRAFT)
+    monkeypatch.setattr(similarity, "SIGNATURE_BLOCK", 7)
+    assert similarity.compute_signature(DRAFT) == signature
+
+
+@pytest.mark.django_db
+def test_similar_documents_are_found_through_lsh_buckets(client):
+    user = User.objects.create_user(username="drafter", password="pw")
+    other = User.objects.create_user(username="other", password="pw")
+    original = make_record(user, DRAFT, "Lease v1")
+    revision = make_record(user, DRAFT.replace("tenant pays", "tenant must pay", 3), "Lease v2")
+    make_record(user, "A grocery list: eggs, milk, bread and butter. " * 10, "Groceries")
+    make_record(other, DRAFT, "Someone else's lease")
+
+    assert SimilarityBucket.objects.filter(record=original).count() == similarity.BANDS
+
+    # Saving again without a new signature leaves the buckets alone.
+    bucket_ids = set(SimilarityBucket.objects.filter(record=original).values_list("id", flat=True))
+    original.title = "Lease v1 (final)"
+    original.save()
+    assert set(
+        SimilarityBucket.objects.filter(record=original).values_list("id", flat=True)
+    ) == bucket_ids
+
+    similar = similarity_index.find_similar_records(original)
+    assert [record.pk for record, _ in similar] == [revision.pk]
+    assert similar[0][1] >= similarity.SIMILARITY_THRESHOLD
+
+    client.login(username="drafter", password="pw")
+    response = client.get(reverse("counter:history_detail", args=[original.pk]))
+    assert "Lease v2" in response.content.decode()
+
+    revision.delete()
+    assert similarity_index.find_similar_records(original) == []
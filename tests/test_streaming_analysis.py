@@ -0,0 +1,77 @@
+import random
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from counter.services.analysis_cache import analyze_text
+from counter.services.streaming_analysis import StreamingAnalyzer, analyze_chunks
+from counter.services.text_extractors import iter_text_chunks, iter_txt_chunks
+from counter.services.text_profile import text_digest
+
+SAMPLE = (
+    "The contract was signed by both parties. Payment is expected in March!\n"
+    "\n"
+    "Was the invoice approved? The invoice was approved and the goods were shipped.\n"
+    "Code, code and more code... Don't stop now.  The end"
+)
+
+
+@pytest.fixture(autouse=True)
+def no_duckdb(mocker):
+    """Origins are looked up the same way in both modes; keep them out of it."""
+
+    mocker.patch("counter.services.analysis_cache.get_value_matches", return_value=[])
+    mocker.patch("counter.services.streaming_analysis.get_value_matches", return_value=[])
+
+
+def chunked(text, seed):
+    """Split text at random places, like blocks read from a large upload."""
+
+    rng = random.Random(seed)
+    pieces, start = [], 0
+    while start < len(text):
+        end = start + rng.randint(1, 25)
+        pieces.append(text[start:end])
+        start = end
+    return pieces
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_streaming_matches_whole_text_analysis(seed):
+    """However the text is chunked, the metrics match the in-memory analysis."""
+
+    results, digest, preview = analyze_chunks(chunked(SAMPLE, seed))
+
+    expected = analyze_text(SAMPLE)
+    assert {k: results[k] for k in expected} == expected
+    assert digest == text_digest(SAMPLE)
+    assert preview == SAMPLE
+
+
+def test_streaming_buffer_is_bounded():
+    """A huge text without sentence breaks is still processed in slices."""
+
+    analyzer = StreamingAnalyzer(max_carry=100)
+    for _ in range(50):
+        analyzer.feed("word " * 10)
+        assert len(analyzer._buffer) <= 150
+
+    assert analyzer.finish()["word_count"] == 500
+
+    # Not even a space to cut at: the buffer is cut hard instead.
+    analyzer = StreamingAnalyzer(max_carry=100)
+    for _ in range(50):
+        analyzer.feed("x" * 70)
+        assert len(analyzer._buffer) <= 100
+    assert analyzer.finish()["char_count"] == 3500
+
+
+def test_txt_chunks_keep_multibyte_characters():
+    """A character split across two read blocks is decoded correctly."""
+
+    data = "café naïve".encode()
+    assert "".join(iter_txt_chunks(BytesIO(data), chunk_size=4)) == "café naïve"
+
+    upload = SimpleUploadedFile("notes.txt", data)
+    assert "".join(iter_text_chunks(upload)) == "café naïve"
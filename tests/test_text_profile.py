@@ -0,0 +1,28 @@
+import pytest  # noqa
+from counter.services.quality_insights import analyze_quality, get_basic_metrics
+from counter.services.summarizer import generate_summary
+from counter.services.text_profile import TextProfile, get_profile
+
+
+def test_profile_tokenizes_once():
+    """Each tokenization should be cached and reused by every service."""
+
+    profile = TextProfile("The report was signed. The report was filed!")
+
+    # The same list object comes back, so the regex only ran once.
+    assert profile.words is profile.words
+    assert profile.sentences == ["The report was signed.", "The report was filed!"]
+    assert "report" in profile.unique_words
+    assert profile.passive_count == 2
+
+
+def test_services_accept_a_shared_profile():
+    """Passing a profile must give the same results as passing raw text."""
+
+    text = "Code, code and more code!\nIs it tested? It was tested."
+    profile = get_profile(text)
+
+    assert get_profile(profile) is profile
+    assert get_basic_metrics(profile) == get_basic_metrics(text)
+    assert generate_summary(profile) == generate_summary(text)
+    assert analyze_quality(profile) == analyze_quality(text)
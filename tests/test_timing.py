@@ -0,0 +1,85 @@
+import json
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.urls import reverse
+
+from counter.middleware import ProfilingMiddleware
+from counter.services import timing
+
+
+def test_stages_are_collected_per_request_only():
+    @timing.stage("work")
+    def work():
+        return 42
+
+    # Outside a request nothing is collected (and nothing breaks).
+    assert work() == 42
+
+    token = timing.start_request()
+    work()
+    with timing.stage("block"):
+        work()
+    stages = timing.end_request(token)
+
+    assert set(stages) == {"work", "block"}
+    assert stages["work"][1] == 2
+    assert stages["block"][0] >= 0
+
+
+@pytest.mark.django_db
+def test_server_timing_header_and_log_line(client, mocker, caplog):
+    User.objects.create_user(username='timed', password='password123')
+    client.login(username='timed', password='password123')
+    mocker.patch("counter.services.analysis_cache.get_value_matches", return_value=[])
+
+    url = reverse('counter:home')
+    with caplog.at_level(logging.INFO, logger="counter.timing"):
+        post = client.post(url, {"texttocount": "Time every stage. Then report it."})
+        page = client.get(url)
+
+    for stage in ("analysis", "db_save", "session", "total"):
+        assert f"{stage};dur=" in post["Server-Timing"]
+    assert "render;dur=" in page["Server-Timing"]
+
+    logged = json.loads(caplog.records[0].getMessage())
+    assert logged["path"] == url and logged["status"] == 302
+    assert logged["stages"]["analysis"]["calls"] == 1
+
+
+@pytest.mark.django_db
+def test_profiler_dumps_slow_requests(client, settings, tmp_path):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_SAMPLE_RATE = 1.0
+    settings.PROFILING_THRESHOLD_MS = 0
+    settings.PROFILING_DIR = tmp_path
+
+    # The client builds its middleware chain on the first request.
+    client.get(reverse('login'))
+
+    [dump] = tmp_path.glob("*.prof")
+    assert "accounts_login" in dump.name
+
+
+@pytest.mark.django_db
+def test_profiler_runs_natively_under_asgi(async_client, settings, tmp_path):
+    """The profiler doesn't push async requests onto the sync thread."""
+
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_SAMPLE_RATE = 1.0
+    settings.PROFILING_THRESHOLD_MS = 0
+    settings.PROFILING_DIR = tmp_path
+
+    async def view(request):
+        return HttpResponse()
+
+    # Wrapping an async handler, the middleware is itself a coroutine.
+    assert iscoroutinefunction(ProfilingMiddleware(view))
+
+    async_to_sync(async_client.get)(reverse('login'))
+
+    [dump] = tmp_path.glob("*.prof")
+    assert "accounts_login" in dump.name
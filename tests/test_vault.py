@@ -2,6 +2,8 @@
 # Better to do this than test the DB, testing the connection to the SQL.
 import pytest #noqa
 from unittest.mock import MagicMock
+from counter.services import duckdb_pool
+from counter.services.origins import get_origins_db_path, reset_origins_index
 from counter.views import get_value_matches
 
 
@@ -18,11 +20,15 @@ def test_get_value_matches_logic(mocker):
     mock_cursor.fetchall.return_value = [
         ("python", "Greek", "Greece", 39.0, 22.0, "Named after a serpent.")
     ]
-    # Handle the 'with' statement.
-    mock_conn.__enter__.return_value = mock_conn
+    # The read pool runs each query on a cursor of the connection.
+    mock_conn.cursor.return_value = mock_conn
 
     # Use mocker.patch - to swap the real Duckdb connect with our fake one.
-    mocker.patch("counter.views.duckdb.connect", return_value=mock_conn)
+    mocker.patch("counter.services.duckdb_pool.duckdb.connect", return_value=mock_conn)
+    duckdb_pool.get_pool(get_origins_db_path()).close()
+
+    # Start from an empty index so the fake connection is used to load it.
+    reset_origins_index()
 
     # Run the function with a test word.
     result = get_value_matches(["python"])
@@ -36,3 +42,29 @@ def test_get_value_matches_logic(mocker):
 
     # Verify that the actual DB was called with the right SQL.
     mock_conn.execute.assert_called_once()
+
+    # A second lookup is served from memory, without touching DuckDB again.
+    assert get_value_matches(["python", "banana"]) == result
+    mock_conn.execute.assert_called_once()
+    reset_origins_index()
+    duckdb_pool.get_pool(get_origins_db_path()).close()
+
+
+def test_origins_index_reloads_when_vault_is_reseeded(mocker):
+    """A new .duckdb modification time must trigger a fresh load."""
+
+    reset_origins_index()
+    loader = mocker.patch(
+        "counter.services.origins.load_origins_index",
+        side_effect=[{}, {"logic": [{"word": "logic"}]}],
+    )
+    mtime = mocker.patch("counter.services.origins.os.path.getmtime")
+
+    mtime.return_value = 1.0
+    assert get_value_matches(["logic"]) == []
+
+    # Simulate `python -m counter.services.seed_origins` rewriting the file.
+    mtime.return_value = 2.0
+    assert get_value_matches(["logic"]) == [{"word": "logic"}]
+    assert loader.call_count == 2
+    reset_origins_index()
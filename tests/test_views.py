@@ -1,8 +1,11 @@
 import pytest
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
 
 from counter.models import AnalysisRecord
+from counter.services import analysis_cache, charts, exporters
 
 
 @pytest.mark.django_db
@@ -42,3 +45,183 @@ def test_user_cannot_delete_others_history(client):
     # Assertion - It should either redirect without deletion or return a 
     # 404/Permission denied error.
     assert AnalysisRecord.objects.filter(pk=record.pk).exists() is True
+
+@pytest.mark.django_db
+def test_repeat_views_are_served_from_analysis_cache(client, mocker):
+    """Refreshing the home page must not re-run the analysis."""
+
+    User.objects.create_user(username='reader', password='password123')
+    client.login(username='reader', password='password123')
+
+    # Keep DuckDB out of it and count how often the analysis really runs.
+    mocker.patch("counter.services.analysis_cache.get_value_matches", return_value=[])
+    spy = mocker.spy(analysis_cache, "analyze_text")
+
+    url = reverse('counter:home')
+    client.post(url, {"texttocount": "Cache me once. Then serve me twice!"})
+    first = client.get(url)
+    second = client.get(url)
+
+    assert first.context["word_count"] == second.context["word_count"] == 7
+    assert spy.call_count == 1
+    # The refresh must not save a duplicate record either.
+    assert AnalysisRecord.objects.count() == 1
+
+@pytest.mark.django_db
+def test_identical_uploads_reuse_the_vault_record(client, mocker):
+    """Re-submitting the same text must not write or analyze it again."""
+
+    User.objects.create_user(username='clerk', password='password123')
+    client.login(username='clerk', password='password123')
+    mocker.patch("counter.services.analysis_cache.get_value_matches", return_value=[])
+
+    url = reverse('counter:home')
+    text = "The same contract. Uploaded over and over again."
+    client.post(url, {"texttocount": text})
+    client.get(url)
+
+    # Forget the cached result, as if the cache had been evicted.
+    cache.clear()
+    spy = mocker.spy(analysis_cache, "generate_summary")
+
+    client.post(url, {"texttocount": text})
+    response = client.get(url)
+
+    assert AnalysisRecord.objects.count() == 1
+    assert response.context["summary"] == AnalysisRecord.objects.get().summary
+    # The stored summary was reused instead of being generated again.
+    assert spy.call_count == 0
+
+@pytest.mark.django_db
+def test_chart_is_addressed_by_digest_and_cached(client, mocker):
+    """The chart URL carries a digest, and the PNG is rendered only once."""
+
+    User.objects.create_user(username='viewer', password='password123')
+    client.login(username='viewer', password='password123')
+    mocker.patch("counter.services.analysis_cache.get_value_matches", return_value=[])
+    render = mocker.spy(charts, "render_frequency_chart")
+
+    home = reverse('counter:home')
+    client.post(home, {"texttocount": "Charts love data. Data loves charts."})
+    digest = client.get(home).context["analysis_digest"]
+
+    url = reverse('counter:chart', kwargs={'digest': digest})
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first["Content-Type"] == "image/png"
+    assert "max-age" in first["Cache-Control"]
+    assert "private" in first["Cache-Control"]
+
+    # The browser revalidates with the ETag and gets an empty 304.
+    second = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert second.status_code == 304
+
+    # Even without the ETag, the PNG comes from the chart cache.
+    assert client.get(url).content == first.content
+    assert render.call_count == 1
+
+    # Unknown digests are not rendered at all, and the 404 isn't cached.
+    missing = client.get(reverse('counter:chart', kwargs={'digest': 'nope'}))
+    assert missing.status_code == 404
+    assert not missing.has_header("Cache-Control")
+    # A guessed ETag doesn't turn an unknown digest into a 304 either.
+    guessed = reverse('counter:chart', kwargs={'digest': 'nope'})
+    assert client.get(guessed, HTTP_IF_NONE_MATCH='"nope-v1"').status_code == 404
+
+    # The chart is cached, but only its owner is served it.
+    User.objects.create_user(username='snoop', password='password123')
+    client.login(username='snoop', password='password123')
+    assert client.get(url).status_code == 404
+    assert client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code == 404
+    client.logout()
+    assert client.get(url).status_code == 302
+
+@pytest.mark.django_db
+def test_large_uploads_are_analyzed_in_streaming_mode(client, mocker, settings):
+    """Big files are counted chunk by chunk; only a preview of the text is kept."""
+
+    settings.STREAMING_ANALYSIS_MIN_BYTES = 10
+    settings.STREAMING_TEXT_PREVIEW_CHARS = 20
+    User.objects.create_user(username='logger', password='password123')
+    client.login(username='logger', password='password123')
+    mocker.patch("counter.services.streaming_analysis.get_value_matches", return_value=[])
+
+    upload = SimpleUploadedFile("server.txt", b"Request served. " * 100)
+    url = reverse('counter:home')
+    client.post(url, {"texttocount": "", "file": upload})
+    response = client.get(url)
+
+    assert response.context["word_count"] == 200
+    assert response.context["text"] == "Request served. Requ"
+    assert AnalysisRecord.objects.get().word_count == 200
+
+    # With the analysis cache gone, the numbers still cover the whole file.
+    cache.clear()
+    response = client.get(url)
+    assert response.context["char_count"] == 1600
+    assert response.context["sentence_count"] == 100
+    assert response.context["top_words"] == [["request", 100], ["served", 100]]
+
+    # Exports chart the whole file too, not just the stored preview.
+    data = exporters.get_record_export_data(AnalysisRecord.objects.get())
+    assert exporters.get_chart_words(data) == [["request", 100], ["served", 100]]
+
+
+@pytest.mark.django_db
+def test_history_pages_with_cursors_and_list_columns_only(client, settings):
+    """History is paged newest first; rows carry no full text."""
+
+    settings.HISTORY_PAGE_SIZE = 2
+    user = User.objects.create_user(username='pager', password='password123')
+    records = [
+        AnalysisRecord.objects.create(
+            user=user, title=f"Doc {i}", original_text=f"Text number {i}. " * 20, word_count=60
+        )
+        for i in range(5)
+    ]
+    client.login(username='pager', password='password123')
+    url = reverse('counter:history')
+
+    first = client.get(url)
+    assert [r.pk for r in first.context['records']] == [records[4].pk, records[3].pk]
+    assert first.context['newer_cursor'] is None
+    assert 'original_text' in first.context['records'][0].get_deferred_fields()
+    assert first.context['records'][0].preview.startswith("Text number 4.")
+
+    second = client.get(url, {'cursor': first.context['older_cursor'], 'dir': 'older'})
+    assert [r.pk for r in second.context['records']] == [records[2].pk, records[1].pk]
+
+    last = client.get(url, {'cursor': second.context['older_cursor'], 'dir': 'older'})
+    assert [r.pk for r in last.context['records']] == [records[0].pk]
+    assert last.context['older_cursor'] is None
+
+    back = client.get(url, {'cursor': last.context['newer_cursor'], 'dir': 'newer'})
+    assert [r.pk for r in back.context['records']] == [records[2].pk, records[1].pk]
+
+    # A tampered cursor just shows the first page.
+    assert client.get(url, {'cursor': 'not-a-cursor'}).context['records'][0].pk == records[4].pk
+
+
+@pytest.mark.django_db
+def test_session_only_references_the_vault_record(client, mocker, settings, tmp_path):
+    """The session holds a record id and digest; exports resolve through them."""
+
+    settings.REPORT_CACHE_DIR = tmp_path / "report_cache"
+    User.objects.create_user(username='light', password='password123')
+    client.login(username='light', password='password123')
+    mocker.patch("counter.services.analysis_cache.get_value_matches", return_value=[])
+
+    url = reverse('counter:home')
+    text = "Keep the session small. Keep the vault big. " * 50
+    client.post(url, {"texttocount": text})
+
+    record = AnalysisRecord.objects.get()
+    session = client.session
+    assert session["analysis_record_id"] == record.pk
+    assert "analysis_text" not in session
+    assert "summary" not in session
+
+    assert client.get(url).context["word_count"] == record.word_count
+
+    export = client.get(reverse('counter:export_docx'))
+    assert b"".join(export.streaming_content).startswith(b"PK")
@@ -0,0 +1,45 @@
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from counter.models import AnalysisRecord, UserWordCount
+from counter.services import word_aggregates
+
+
+def make_record(user, text):
+    return AnalysisRecord.objects.create(
+        user=user, title="Doc", original_text=text, word_count=len(text.split())
+    )
+
+
+@pytest.mark.django_db
+def test_aggregates_follow_creates_and_deletes():
+    user = User.objects.create_user(username="counter", password="pw")
+    other = User.objects.create_user(username="other", password="pw")
+    first = make_record(user, "Rivers and rivers. The lake waits.")
+    make_record(user, "Rivers bend toward the lake.")
+    make_record(other, "Deserts only.")
+
+    assert word_aggregates.get_top_words(user, 2) == [("rivers", 3), ("lake", 2)]
+    assert word_aggregates.get_vocabulary_stats(user) == {
+        "documents": 2, "words": 8, "distinct_words": 5,
+    }
+
+    # Deleting a record loaded without its text still subtracts it.
+    AnalysisRecord.objects.defer("original_text").get(pk=first.pk).delete()
+
+    assert word_aggregates.get_top_words(user, 2) == [("bend", 1), ("lake", 1)]
+    assert not UserWordCount.objects.filter(user=user, word="waits").exists()
+    assert word_aggregates.get_vocabulary_stats(user)["documents"] == 1
+    assert word_aggregates.get_top_words(other) == [("deserts", 1)]
+
+
+@pytest.mark.django_db
+def test_history_shows_most_used_words(client):
+    user = User.objects.create_user(username="reader", password="pw")
+    make_record(user, "Lanterns glow. Lanterns dim.")
+    client.login(username="reader", password="pw")
+
+    response = client.get(reverse("counter:history"))
+
+    assert response.context["top_words"][0] == ("lanterns", 2)
@@ -47,8 +47,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so the timings cover every other middleware and the view.
+    "counter.middleware.ServerTimingMiddleware",
+    "counter.middleware.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    # SessionMiddleware with the session save timed.
+    "counter.middleware.TimedSessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
@@ -133,3 +137,87 @@ MEDIA_ROOT = BASE_DIR / 'media'
 LOGIN_URL = '/accounts/login/' 
 LOGIN_REDIRECT_URL = '/' # Go to the counter webpage after loggin in.
 LOGOUT_REDIRECT_URL = '/accounts/login' # Where to go after logging out.
+
+# Cache for computed analyses, keyed by the text's SHA-256 digest.
+# Swap the backend for Redis/Memcached to share results between workers.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "word-counter-vault",
+        "OPTIONS": {"MAX_ENTRIES": 500},
+    }
+}
+ANALYSIS_CACHE_TIMEOUT = 60 * 60  # Seconds a computed analysis stays cached.
+CHART_CACHE_MAX_ENTRIES = 128  # Rendered frequency charts kept in memory.
+CHART_CACHE_MAX_AGE = 60 * 60 * 24  # Seconds browsers/proxies may reuse a chart.
+
+# Background PDF/DOCX exports: a local thread pool, with job state and finished
+# files on disk so any worker process can report on or serve them.
+EXPORT_JOBS_DIR = MEDIA_ROOT / "export_jobs"
+EXPORT_JOB_WORKERS = 2
+EXPORT_JOB_TTL = 60 * 60  # Seconds before finished exports are purged.
+EXPORT_JOB_TIMEOUT = 10 * 60  # Seconds before an unfinished job is reported as failed.
+
+# Background analyses of uploads, with progress streamed to the page as
+# server-sent events. Same layout as the export jobs.
+ANALYSIS_JOBS_DIR = MEDIA_ROOT / "analysis_jobs"
+ANALYSIS_JOB_WORKERS = 2
+ANALYSIS_JOB_TTL = 60 * 60  # Seconds before job files are purged.
+ANALYSIS_JOB_PROGRESS_INTERVAL = 0.25  # Seconds between progress updates.
+ANALYSIS_JOB_HEARTBEAT = 15  # Seconds of silence before a keep-alive line.
+ANALYSIS_JOB_TIMEOUT = 10 * 60  # Seconds without a state update before a job is failed.
+ANALYSIS_JOB_STREAM_SECONDS = 10  # Longest sync event stream; the browser reconnects.
+
+# Rendered PDF/DOCX reports of vault records, keyed by record, content hash and
+# report layout version, evicted least-recently-used past the size budget.
+REPORT_CACHE_DIR = MEDIA_ROOT / "report_cache"
+REPORT_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# PDF extraction: pages are spread over a process pool for large documents.
+PDF_MAX_PAGES = None  # Stop after this many pages (None reads them all).
+PDF_EXTRACT_WORKERS = os.cpu_count() or 1
+PDF_PARALLEL_MIN_PAGES = 50  # Smaller PDFs are read in-process.
+
+# Uploads at least this big are analyzed chunk by chunk with bounded memory;
+# only the first STREAMING_TEXT_PREVIEW_CHARS characters of their text are kept.
+STREAMING_ANALYSIS_MIN_BYTES = 20 * 1024 * 1024
+STREAMING_TEXT_PREVIEW_CHARS = 100_000
+STREAMING_MAX_CARRY_CHARS = 1024 * 1024  # Longest run of text held without a sentence break.
+
+# History lists are paged by (uploaded_at, id) cursors rather than offsets.
+HISTORY_PAGE_SIZE = 25  # Records per history page.
+
+# Bulk uploads: many files or zip archives per request, analyzed on a small
+# process pool and saved with batched inserts.
+BULK_UPLOAD_MAX_FILES = 500
+BULK_UPLOAD_MAX_BYTES = 100 * 1024 * 1024  # Uncompressed, across all documents.
+BULK_UPLOAD_WORKERS = 2
+BULK_UPLOAD_BATCH_SIZE = 200
+DATA_UPLOAD_MAX_NUMBER_FILES = BULK_UPLOAD_MAX_FILES
+
+# Columnar mirror of every vault record for analytics, kept up to date by
+# `manage.py sync_corpus`. Separate from the origins file, so re-seeding one
+# never locks the other.
+CORPUS_DUCKDB_PATH = BASE_DIR / "corpus_analytics.duckdb"
+
+# DuckDB read connections are shared while queries keep coming, then closed
+# after this many idle seconds, since an open reader locks out every writer.
+# Writers (sync_corpus, seed_origins) wait this long for readers to let go.
+DUCKDB_READ_IDLE_SECONDS = 1.0
+DUCKDB_WRITE_WAIT_SECONDS = 5
+
+# Per-request stage timings: a Server-Timing header and one JSON log line per
+# request on the "counter.timing" logger.
+SERVER_TIMING_HEADER = True
+
+# Opt-in sampling profiler: requests slower than the threshold are dumped as .prof files.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False") == "True"
+PROFILING_SAMPLE_RATE = 0.1
+PROFILING_THRESHOLD_MS = 500
+PROFILING_DIR = BASE_DIR / "profiles"
+
+# Under ASGI, the home, bulk upload, export and chart views can run as async
+# views that hand their CPU work to a dedicated pool of ASYNC_CPU_WORKERS
+# threads, keeping the event loop free for light pages like the history.
+USE_ASYNC_VIEWS = os.getenv("USE_ASYNC_VIEWS", "False") == "True"
+ASYNC_CPU_WORKERS = os.cpu_count() or 1